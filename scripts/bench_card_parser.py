@@ -0,0 +1,161 @@
+"""
+Microbenchmark: incremental card parser vs the old rescanning loop.
+
+Replays a synthetic card-model response (``{"cards": [...]}``) split into
+token-sized chunks through both parsers and reports the parse time per
+response and the worst single chunk, which is what the event loop (shared
+with audio) actually feels. Cards contain braces, quotes and escapes inside
+strings, and larger cards show the old loop's quadratic cost. Both parsers
+must return the same cards; the run fails otherwise.
+
+Usage:
+    python -m scripts.bench_card_parser
+    python -m scripts.bench_card_parser --cards 6 --value-chars 2000 --chunk-chars 3
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.llm.stream_parser import CardStreamParser
+
+
+def legacy_parse(chunks: list[str]) -> tuple[list[dict], list[float]]:
+    """The loop query_process_stream used before CardStreamParser (normalization left out)."""
+    cards, timings = [], []
+    buffer = ""
+    state = 0
+    for content in chunks:
+        started = time.perf_counter()
+        buffer += content
+        if state == 0:
+            match = re.search(r'"cards"\s*:\s*\[', buffer)
+            if match:
+                buffer = buffer[match.end() :]
+                state = 1
+        if state == 1:
+            while True:
+                start_idx = buffer.find("{")
+                if start_idx == -1:
+                    break
+                depth = 0
+                end_idx = -1
+                in_str = False
+                esc = False
+                for k in range(start_idx, len(buffer)):
+                    c = buffer[k]
+                    if in_str:
+                        if esc:
+                            esc = False
+                        elif c == "\\":
+                            esc = True
+                        elif c == '"':
+                            in_str = False
+                        continue
+                    if c == '"':
+                        in_str = True
+                    elif c == "{":
+                        depth += 1
+                    elif c == "}":
+                        depth -= 1
+                        if depth == 0:
+                            end_idx = k
+                            break
+                if end_idx != -1:
+                    try:
+                        cards.append(json.loads(buffer[start_idx : end_idx + 1]))
+                    except Exception:
+                        pass
+                    buffer = buffer[end_idx + 1 :]
+                else:
+                    break
+        timings.append(time.perf_counter() - started)
+    return cards, timings
+
+
+def incremental_parse(chunks: list[str]) -> tuple[list[dict], list[float]]:
+    parser = CardStreamParser()
+    cards, timings = [], []
+    for content in chunks:
+        started = time.perf_counter()
+        cards.extend(parser.feed(content))
+        timings.append(time.perf_counter() - started)
+    return cards, timings
+
+
+def synthetic_response(card_count: int, value_chars: int) -> str:
+    """A card response shaped like the model's, with JSON-hostile text in strings."""
+    filler = 'Cloud {migration} & "modernisation" \\ AI-led delivery; ' * (value_chars // 56 + 1)
+    cards = []
+    for i in range(card_count):
+        if i % 2:
+            cards.append(
+                {
+                    "type": "infographic",
+                    "title": f"Capability {i}",
+                    "hero": {"kicker": "Indus Net", "headline": filler[:80]},
+                    "sections": [
+                        {"type": "stats", "items": [{"label": "Clients", "value": "500+"}]},
+                        {"type": "icon_bullets", "items": [{"icon": "cloud", "text": filler[:value_chars]}]},
+                    ],
+                }
+            )
+        else:
+            cards.append(
+                {
+                    "type": "flashcard",
+                    "title": f"Service {i}",
+                    "value": filler[:value_chars],
+                    "visual_intent": "neutral",
+                    "media": {"source": "web_search", "query": "cloud migration team"},
+                }
+            )
+    return json.dumps({"cards": cards}, indent=2)
+
+
+def chunked(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def main(args: argparse.Namespace) -> int:
+    response = synthetic_response(args.cards, args.value_chars)
+    chunks = chunked(response, args.chunk_chars)
+    expected = json.loads(response)["cards"]
+
+    results = {}
+    for name, parse in (("legacy", legacy_parse), ("incremental", incremental_parse)):
+        totals, worst = [], []
+        for _ in range(args.repeat):
+            cards, timings = parse(chunks)
+            if cards != expected:
+                print(f"ERROR: {name} parser returned {len(cards)} cards that differ from the input")
+                return 1
+            totals.append(sum(timings) * 1000)
+            worst.append(max(timings) * 1000)
+        results[name] = (statistics.median(totals), statistics.median(worst))
+
+    print(
+        f"\n{len(response)} chars | {len(chunks)} chunks of {args.chunk_chars} | "
+        f"{args.cards} cards | {args.repeat} runs (median)\n"
+    )
+    print(f"{'parser':<12} {'total ms':>9} {'worst chunk ms':>15}")
+    for name, (total, worst) in results.items():
+        print(f"{name:<12} {total:>9.2f} {worst:>15.3f}")
+    speedup = results["legacy"][0] / max(results["incremental"][0], 1e-9)
+    print(f"\nincremental is {speedup:.1f}x faster per response")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming card parsers")
+    parser.add_argument("--cards", type=int, default=4)
+    parser.add_argument("--value-chars", type=int, default=600, help="Length of each card's long text")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="Characters per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=20)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,279 @@
+"""
+Retrieval benchmark for VectorStoreService against a golden query set.
+
+Runs fully offline: the KB text is copied into a temporary collection and
+embedded with a deterministic hashing embedder, so numbers are reproducible
+and no OpenAI call is made. Absolute quality is lower than with the real
+embedding model, so compare runs with each other, not with production.
+
+For each backend (chroma, numpy, mmap, hybrid) every golden query is run
+twice: a cold pass on a fresh service (empty embedding cache; the first
+query starts loading the indexes on a background thread and Chroma answers
+until they are ready, as on a worker that was not prewarmed) and a warm pass
+on the same service. Reports recall@k, MRR@k and p50/p95/p99 latency per pass.
+
+Usage:
+    python -m scripts.bench_retrieval
+    python -m scripts.bench_retrieval --snapshot ./site_snapshot --k 5
+    python -m scripts.bench_retrieval --embed-latency-ms 150 --json bench.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.core.config import settings
+from src.services.vectordb.bm25 import tokenize
+from src.services.vectordb.corpus import load_corpus
+from src.services.vectordb.embedding_cache import EmbeddingCache
+from src.services.vectordb.ingest import chunk_page, iter_snapshot_files, read_page, write_version
+from src.services.vectordb.quantized_index import export_quantized_index
+from src.services.vectordb.vectordb_svc import (
+    BACKEND_CHROMA,
+    BACKEND_MMAP,
+    BACKEND_NUMPY,
+    KB_COLLECTION_NAME,
+    KB_PERSIST_DIRECTORY,
+    VectorStoreService,
+    reset_kb_indexes,
+)
+
+DEFAULT_GOLDEN = os.path.join(settings.ASSETS_DIR, "benchmarks", "kb_golden.json")
+
+# name → (backend, hybrid)
+BACKENDS = {
+    "chroma": (BACKEND_CHROMA, False),
+    "numpy": (BACKEND_NUMPY, False),
+    "mmap": (BACKEND_MMAP, False),
+    "hybrid": (BACKEND_NUMPY, True),
+}
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embedder (signed feature hashing of words and bigrams)."""
+
+    def __init__(self, dim: int = 384, latency_ms: float = 0.0) -> None:
+        self.dim = dim
+        self.latency = latency_ms / 1000.0
+        self.model = f"hashing-stub-{dim}"
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = tokenize(text)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        # Optional simulated API round trip, so cache effects show up in latency
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+
+@dataclass
+class PassResult:
+    backend: str
+    cache: str
+    queries: int
+    recall_at_k: float
+    mrr_at_k: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def _normalize_source(source: str) -> str:
+    return (source or "").strip().rstrip("/").lower()
+
+
+def load_kb_texts(args: argparse.Namespace) -> tuple[list[str], list[dict]]:
+    """Chunk texts + metadata from a site snapshot or the existing collection."""
+    if args.snapshot:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=150)
+        texts, metadatas = [], []
+        for path in iter_snapshot_files(args.snapshot):
+            page = read_page(path, args.snapshot)
+            if page is None:
+                continue
+            for chunk in chunk_page(page, splitter):
+                texts.append(chunk.text)
+                metadatas.append(chunk.metadata)
+        return texts, metadatas
+
+    # PersistentClient would create an empty chroma_db in the source tree
+    if not os.path.isfile(os.path.join(args.persist_directory, "chroma.sqlite3")):
+        raise FileNotFoundError(f"no Chroma KB in {args.persist_directory}")
+    client = chromadb.PersistentClient(path=args.persist_directory)
+    data = client.get_collection(args.collection).get(include=["documents", "metadatas"])
+    return list(data["documents"] or []), [m or {} for m in data["metadatas"] or []]
+
+
+def build_bench_collection(
+    texts: list[str], metadatas: list[dict], embeddings: HashingEmbeddings, persist_directory: str
+) -> None:
+    collection = chromadb.PersistentClient(path=persist_directory).get_or_create_collection(
+        KB_COLLECTION_NAME
+    )
+    ids = [f"bench-{i}" for i in range(len(texts))]
+    vectors = embeddings.embed_documents(texts)
+    for i in range(0, len(ids), 512):
+        collection.add(
+            ids=ids[i : i + 512],
+            embeddings=vectors[i : i + 512],
+            documents=texts[i : i + 512],
+            metadatas=metadatas[i : i + 512],
+        )
+    write_version(persist_directory, ids)
+
+
+def score(retrieved: list[str], expected: set[str]) -> tuple[float, float]:
+    """(recall, reciprocal rank) of one query's retrieved sources."""
+    found = expected.intersection(retrieved)
+    recall = len(found) / len(expected) if expected else 0.0
+    reciprocal_rank = next(
+        (1.0 / rank for rank, source in enumerate(retrieved, start=1) if source in expected), 0.0
+    )
+    return recall, reciprocal_rank
+
+
+async def run_pass(
+    name: str, cache: str, service: VectorStoreService, golden: list[dict], k: int, source_key: str
+) -> PassResult:
+    latencies, recalls, reciprocal_ranks = [], [], []
+    for item in golden:
+        started = time.perf_counter()
+        results = await service.search(item["query"], k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        retrieved = []
+        for doc in results:
+            source = _normalize_source(doc.metadata.get(source_key, ""))
+            if source not in retrieved:
+                retrieved.append(source)
+        recall, reciprocal_rank = score(
+            retrieved, {_normalize_source(s) for s in item["expected_sources"]}
+        )
+        recalls.append(recall)
+        reciprocal_ranks.append(reciprocal_rank)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return PassResult(
+        backend=name,
+        cache=cache,
+        queries=len(golden),
+        recall_at_k=float(np.mean(recalls)),
+        mrr_at_k=float(np.mean(reciprocal_ranks)),
+        p50_ms=float(p50),
+        p95_ms=float(p95),
+        p99_ms=float(p99),
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    with open(args.golden, encoding="utf-8") as f:
+        golden = json.load(f)["queries"]
+
+    try:
+        texts, metadatas = load_kb_texts(args)
+    except Exception as e:
+        print(f"ERROR: could not load KB text ({e}); pass --snapshot or build the KB first")
+        return
+    if not texts:
+        print("ERROR: no KB chunks to benchmark")
+        return
+
+    embeddings = HashingEmbeddings(dim=args.dim, latency_ms=args.embed_latency_ms)
+    results: list[PassResult] = []
+    with tempfile.TemporaryDirectory(prefix="kb-bench-") as persist_directory:
+        build_bench_collection(texts, metadatas, embeddings, persist_directory)
+        mmap_directory = os.path.join(persist_directory, "quantized")
+
+        for name in args.backends:
+            backend, hybrid = BACKENDS[name]
+
+            def make_service() -> VectorStoreService:
+                return VectorStoreService(
+                    persist_directory=persist_directory,
+                    embeddings=embeddings,
+                    collection_name=KB_COLLECTION_NAME,
+                    embedding_cache=EmbeddingCache(disk_path=None),
+                    backend=backend,
+                    hybrid=hybrid,
+                    mmap_directory=mmap_directory,
+                )
+
+            if backend == BACKEND_MMAP:
+                probe = make_service()
+                export_quantized_index(
+                    load_corpus(probe.vectorstore), mmap_directory, probe.collection_version()
+                )
+
+            reset_kb_indexes()
+            service = make_service()
+            results.append(await run_pass(name, "cold", service, golden, args.k, args.source_key))
+            results.append(await run_pass(name, "warm", service, golden, args.k, args.source_key))
+        reset_kb_indexes()
+
+    print(f"\n{len(texts)} chunks | {len(golden)} queries | k={args.k} | stub embedder dim={args.dim}\n")
+    print(f"{'backend':<8} {'cache':<5} {'recall@k':>9} {'MRR@k':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(
+            f"{r.backend:<8} {r.cache:<5} {r.recall_at_k:>9.3f} {r.mrr_at_k:>7.3f} "
+            f"{r.p50_ms:>8.2f} {r.p95_ms:>8.2f} {r.p99_ms:>8.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark KB retrieval quality and latency")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN, help="Golden query JSON")
+    parser.add_argument("--snapshot", default=None, help="Build the corpus from a site snapshot instead")
+    parser.add_argument("--persist-directory", default=KB_PERSIST_DIRECTORY)
+    parser.add_argument("--collection", default=KB_COLLECTION_NAME)
+    parser.add_argument("--source-key", default="source", help="Metadata key holding the page URL")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=384, help="Stub embedding dimension")
+    parser.add_argument(
+        "--embed-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated embedding API latency (shows the effect of the embedding cache)",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    parser.add_argument("--json", default=None, help="Also write results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+Export the company_knowledge vectors as a quantized, memory-mapped index.
+
+Agent job processes map the export read-only when KB_SEARCH_BACKEND=mmap, so
+the OS page cache holds one copy of the KB for every concurrent call. Re-run
+after each ingest, before publishing the snapshot; workers ignore an export
+whose version is stale.
+
+Usage:
+    python -m scripts.export_kb_index
+    python -m scripts.export_kb_index --dtype float16 --no-rescore
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.vectordb.corpus import load_corpus
+from src.services.vectordb.quantized_index import (
+    DTYPE_FLOAT16,
+    DTYPE_INT8,
+    export_quantized_index,
+)
+from src.services.vectordb.vectordb_svc import KB_PERSIST_DIRECTORY, VectorStoreService
+
+
+def export_index(
+    out_dir: str | None,
+    dtype: str,
+    with_rescore: bool,
+    persist_directory: str = KB_PERSIST_DIRECTORY,
+) -> None:
+    # Export the build directory, never a published snapshot (those are immutable)
+    service = VectorStoreService(persist_directory=persist_directory)
+    corpus = load_corpus(service.vectorstore)
+    if not len(corpus):
+        print("ERROR: company_knowledge collection is empty")
+        return
+
+    target = out_dir or service.mmap_directory
+    version = service.collection_version()
+    export_quantized_index(corpus, target, version, dtype=dtype, with_rescore=with_rescore)
+    print(f"Exported {len(corpus)} vectors ({dtype}) to {target} — version {version}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the KB as a quantized mmap index")
+    parser.add_argument("--out-dir", default=None, help="Defaults to KB_MMAP_DIR")
+    parser.add_argument(
+        "--persist-directory", default=KB_PERSIST_DIRECTORY, help="KB build directory to export"
+    )
+    parser.add_argument("--dtype", choices=[DTYPE_INT8, DTYPE_FLOAT16], default=DTYPE_INT8)
+    parser.add_argument(
+        "--no-rescore",
+        action="store_true",
+        help="Skip the float32 copy used to re-score the quantized shortlist",
+    )
+    args = parser.parse_args()
+
+    export_index(args.out_dir, args.dtype, not args.no_rescore, args.persist_directory)
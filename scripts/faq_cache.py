@@ -0,0 +1,158 @@
+"""
+Populate and review the FAQ answer cache (Mongo collection faq_answers).
+
+The admin API (/admin/faq) covers single-entry review; this script is for
+bulk work. `import` upserts entries by question from a JSON file:
+
+    [{"question": "...", "variants": ["..."], "answer_text": "...",
+      "cards": [...], "expires_at": "2026-12-31T00:00:00Z"}]
+
+Imported or changed entries are drafts until approved. With
+--generate-cards, entries without cards get them from the UI card model,
+using the KB results for the question as reference, for review before
+approval. Running workers pick up approved entries within
+FAQ_CACHE_REFRESH_SEC.
+
+Usage:
+    python -m scripts.faq_cache import faq.json --generate-cards
+    python -m scripts.faq_cache list --status draft
+    python -m scripts.faq_cache approve <id>
+    python -m scripts.faq_cache expire <id>
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+
+from src.api.models.db_schemas import FAQEntry
+from src.core.database import close_db, get_database
+from src.services.faq.answer_cache import FAQ_COLLECTION, FAQ_STATUS_APPROVED, FAQ_STATUS_DRAFT
+
+# Fields whose change sends an entry back to review
+_REVIEWED_FIELDS = ("variants", "answer_text", "cards")
+
+
+def _stored(value):
+    # Mongo returns naive UTC datetimes; compare them as aware ones
+    if isinstance(value, dt.datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=dt.timezone.utc)
+    return value
+
+
+async def generate_cards(question: str, answer_text: str) -> list[dict]:
+    """Cards for one entry from the UI card model, grounded on the KB results."""
+    from src.services.llm.ui_agent import UIAgentFunctions
+    from src.services.vectordb.vectordb_svc import VectorStoreService
+
+    results = await VectorStoreService().search(question, k=5)
+    db_results = "\n\n---\n\n".join(doc.page_content for doc in results)
+    ui = UIAgentFunctions()
+    cards = []
+    async for payload in ui.query_process_stream(
+        user_input=question, db_results=db_results, agent_response=answer_text
+    ):
+        if payload.get("type") != "error":
+            cards.append(payload)
+    return cards
+
+
+async def import_entries(args: argparse.Namespace) -> None:
+    with open(args.file, encoding="utf-8") as f:
+        items = json.load(f)
+
+    collection = get_database()[FAQ_COLLECTION]
+    created = updated = unchanged = 0
+    for item in items:
+        entry = FAQEntry(**item, status=FAQ_STATUS_APPROVED if args.approve else FAQ_STATUS_DRAFT)
+        existing = await collection.find_one({"question": entry.question})
+        if not entry.cards and existing and existing.get("cards"):
+            # The file has no cards for it: keep the ones already reviewed
+            entry.cards = existing["cards"]
+        elif args.generate_cards and not entry.cards:
+            entry.cards = await generate_cards(entry.question, entry.answer_text)
+            print(f"Generated {len(entry.cards)} card(s) for: {entry.question}")
+
+        if existing is None:
+            await collection.insert_one(entry.model_dump())
+            created += 1
+            continue
+
+        changes = {
+            field: getattr(entry, field)
+            for field in (*_REVIEWED_FIELDS, "expires_at")
+            if _stored(existing.get(field)) != getattr(entry, field)
+        }
+        if not args.approve and any(field in changes for field in _REVIEWED_FIELDS):
+            changes["status"] = FAQ_STATUS_DRAFT
+        elif args.approve:
+            changes["status"] = FAQ_STATUS_APPROVED
+        if changes:
+            changes["updated_at"] = dt.datetime.now(dt.timezone.utc)
+            await collection.update_one({"_id": existing["_id"]}, {"$set": changes})
+            updated += 1
+        else:
+            unchanged += 1
+
+    print(f"{created} created, {updated} updated, {unchanged} unchanged")
+
+
+async def list_entries(args: argparse.Namespace) -> None:
+    query = {"status": args.status} if args.status else {}
+    async for doc in get_database()[FAQ_COLLECTION].find(query).sort("hits", -1):
+        expires = doc.get("expires_at")
+        print(
+            f"{doc['_id']}  {doc['status']:<8} hits={doc.get('hits', 0):<5} "
+            f"cards={len(doc.get('cards') or []):<2} "
+            f"expires={expires.isoformat() if expires else '-':<26} {doc['question']}"
+        )
+
+
+async def set_fields(faq_id: str, changes: dict) -> None:
+    changes["updated_at"] = dt.datetime.now(dt.timezone.utc)
+    result = await get_database()[FAQ_COLLECTION].update_one(
+        {"_id": ObjectId(faq_id)}, {"$set": changes}
+    )
+    print("OK" if result.matched_count else f"ERROR: no FAQ entry {faq_id}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "import":
+            await import_entries(args)
+        elif args.command == "list":
+            await list_entries(args)
+        elif args.command == "approve":
+            await set_fields(args.id, {"status": FAQ_STATUS_APPROVED})
+        elif args.command == "expire":
+            await set_fields(args.id, {"expires_at": dt.datetime.now(dt.timezone.utc)})
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate and review the FAQ answer cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Upsert entries from a JSON file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--approve", action="store_true", help="Approve as imported (skip review)")
+    import_parser.add_argument(
+        "--generate-cards", action="store_true", help="Generate cards for entries that have none"
+    )
+
+    list_parser = commands.add_parser("list", help="List entries, most served first")
+    list_parser.add_argument("--status", choices=[FAQ_STATUS_DRAFT, FAQ_STATUS_APPROVED])
+
+    for name in ("approve", "expire"):
+        commands.add_parser(name).add_argument("id")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Build or refresh the company_knowledge collection from a local site snapshot.
+
+Only chunks whose content hash changed are re-embedded. With --publish the
+result is copied into a new KB snapshot that running workers swap to (see
+scripts/publish_kb_snapshot.py); without it, workers serving chroma_db
+directly notice the new kb_version within KB_SNAPSHOT_POLL_SEC, build its
+indexes in the background and then switch to it.
+
+Usage:
+    python -m scripts.ingest_kb --snapshot ./site_snapshot
+    python -m scripts.ingest_kb --snapshot ./site_snapshot --prune --batch-size 512
+    python -m scripts.ingest_kb --snapshot ./site_snapshot --export-index --publish
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.export_kb_index import export_index
+from scripts.publish_kb_snapshot import publish
+from src.agents.indusnet.constants import SKIPPED_METADATA_KEYS
+from src.core.config import settings
+from src.services.vectordb.embeddings import (
+    EMBEDDING_BACKEND_OPENAI,
+    EMBEDDING_BACKENDS,
+    build_embeddings,
+    collection_for_backend,
+)
+from src.services.vectordb.ingest import ingest_snapshot
+from src.services.vectordb.vectordb_svc import KB_COLLECTION_NAME, KB_PERSIST_DIRECTORY
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.embedding_backend == EMBEDDING_BACKEND_OPENAI and not settings.OPENAI_API_KEY:
+        print("ERROR: OPENAI_API_KEY is not configured")
+        return
+
+    embeddings = build_embeddings(args.embedding_backend)
+    report = await ingest_snapshot(
+        snapshot_dir=args.snapshot,
+        persist_directory=args.persist_directory,
+        embeddings=embeddings,
+        collection_name=args.collection
+        or collection_for_backend(KB_COLLECTION_NAME, args.embedding_backend),
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        prune=args.prune,
+        skipped_metadata_keys=SKIPPED_METADATA_KEYS,
+    )
+    print(
+        f"Pages: {report.pages} | Chunks: {report.chunks} | Embedded: {report.embedded} | "
+        f"Unchanged: {report.unchanged} | Deleted: {report.deleted} | "
+        f"Re-rendered: {report.rerendered} | Version: {report.version}"
+    )
+    for path in report.skipped_files:
+        print(f"Skipped (no text): {path}")
+
+    if args.export_index:
+        export_index(
+            out_dir=None, dtype="int8", with_rescore=True, persist_directory=args.persist_directory
+        )
+    if args.publish:
+        publish(args.persist_directory, settings.KB_SNAPSHOT_DIR, settings.KB_SNAPSHOT_KEEP)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a site snapshot into the KB")
+    parser.add_argument("--snapshot", required=True, help="Directory of fetched HTML/markdown pages")
+    parser.add_argument("--persist-directory", default=KB_PERSIST_DIRECTORY)
+    parser.add_argument(
+        "--embedding-backend",
+        choices=EMBEDDING_BACKENDS,
+        default=settings.KB_EMBEDDING_BACKEND,
+        help="Defaults to KB_EMBEDDING_BACKEND",
+    )
+    parser.add_argument(
+        "--collection", default=None, help="Defaults to the embedding backend's collection"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1200)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per embedding request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Also delete chunks whose page is no longer in the snapshot",
+    )
+    parser.add_argument(
+        "--export-index",
+        action="store_true",
+        help="Refresh the quantized mmap export (KB_SEARCH_BACKEND=mmap) afterwards",
+    )
+    parser.add_argument(
+        "--publish",
+        action="store_true",
+        help="Publish the result as a new KB snapshot for running workers",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
@@ -0,0 +1,107 @@
+"""
+Import the flashcard decks saved by Mem0 into the card history store.
+
+Mem0 kept each deck in the ui_flashcard_memory collection(s) of
+chroma_db_mem0, with the cards as JSON in the record's metadata (older
+records only in the memory text, after "| cards: "). This reads those records
+directly with chromadb, no LLM involved, re-embeds question + card titles
+with CARD_HISTORY_EMBEDDING_BACKEND and writes them to CARD_HISTORY_PATH with
+their original timestamps. Records already imported are skipped, so it is
+safe to run again.
+
+Usage:
+    python -m scripts.migrate_card_history
+    python -m scripts.migrate_card_history --source path/to/chroma_db_mem0 --dry-run
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+
+from src.core.config import settings
+from src.services.llm.card_history import CardHistoryStore, get_card_history
+
+MEM0_PATH = f"{settings.BASE_DIR}/src/services/vectordb/chroma_db_mem0"
+MEM0_COLLECTION = "ui_flashcard_memory"
+
+
+def _timestamp(value: str | None) -> float:
+    try:
+        return dt.datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _cards(metadata: dict, document: str | None) -> list[dict] | None:
+    raw = metadata.get("cards")
+    if raw is None:
+        text = metadata.get("data") or document or ""
+        if "| cards: " not in text:
+            return None
+        raw = text.split("| cards: ", 1)[1]
+    try:
+        cards = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return cards if isinstance(cards, list) and cards else None
+
+
+def read_mem0_decks(path: str) -> list[tuple[str, str, list[dict], float]]:
+    """(user_id, query, cards, created_at) for every deck in the Mem0 collections, oldest first."""
+    client = chromadb.PersistentClient(path=path)
+    decks: dict[str, tuple[str, str, list[dict], float]] = {}
+    for collection in client.list_collections():
+        name = collection if isinstance(collection, str) else collection.name
+        # One collection per embedding backend; they hold the same records
+        if not name.startswith(MEM0_COLLECTION):
+            continue
+        data = client.get_collection(name).get(include=["documents", "metadatas"])
+        documents = data["documents"] or [None] * len(data["ids"])
+        for record_id, metadata, document in zip(data["ids"], data["metadatas"], documents):
+            metadata = metadata or {}
+            user_id = metadata.get("user_id")
+            cards = _cards(metadata, document)
+            if not user_id or cards is None or record_id in decks:
+                continue
+            query = metadata.get("user_query") or metadata.get("data") or ""
+            created_at = _timestamp(metadata.get("created_at"))
+            decks[record_id] = (user_id, query, cards, created_at)
+    return sorted(decks.values(), key=lambda deck: deck[3])
+
+
+async def migrate(
+    decks: list[tuple[str, str, list[dict], float]], store: CardHistoryStore, batch_size: int = 64
+) -> int:
+    """Embed and insert the decks not already in the store; returns how many were written."""
+    new = [deck for deck in decks if not store.contains(deck[0], deck[1], deck[3])]
+    return await store.save_many(new, batch_size)
+
+
+async def main(args: argparse.Namespace) -> None:
+    decks = read_mem0_decks(args.source)
+    users = len({deck[0] for deck in decks})
+    print(f"{len(decks)} decks for {users} users in {args.source}")
+    if args.dry_run or not decks:
+        return
+    store = get_card_history()
+    written = await migrate(decks, store, args.batch_size)
+    print(f"{written} imported, {len(decks) - written} already present → {store.path} ({store.count()} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import Mem0 flashcard decks into the card history")
+    parser.add_argument("--source", default=MEM0_PATH, help="Mem0 Chroma directory")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the decks to import")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
@@ -0,0 +1,66 @@
+"""
+One-time migration: store pre-rendered markdown on the existing KB collection.
+
+Collections built before rendering moved to ingest time have no
+rendered_markdown field, so every search renders metadata on the fly. This
+rewrites chunk metadata only (no re-embedding) and bumps kb_version so running
+workers drop cached results. Also re-run it after changing
+SKIPPED_METADATA_KEYS; chunks already rendered with the current skip list are
+left alone.
+
+Usage:
+    python -m scripts.prerender_kb
+    python -m scripts.prerender_kb --export-index
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+
+from scripts.export_kb_index import export_index
+from src.agents.indusnet.constants import SKIPPED_METADATA_KEYS
+from src.services.vectordb.ingest import refresh_renderings, write_version
+from src.core.config import settings
+from src.services.vectordb.embeddings import collection_for_backend
+from src.services.vectordb.rendering import render_signature
+from src.services.vectordb.vectordb_svc import KB_COLLECTION_NAME, KB_PERSIST_DIRECTORY
+
+
+def main(args: argparse.Namespace) -> None:
+    client = chromadb.PersistentClient(path=args.persist_directory)
+    try:
+        collection = client.get_collection(args.collection)
+    except Exception as e:
+        print(f"ERROR: collection {args.collection!r} not found: {e}")
+        return
+
+    updated = refresh_renderings(collection, SKIPPED_METADATA_KEYS)
+    version = write_version(
+        args.persist_directory,
+        collection.get(include=[])["ids"],
+        salt=render_signature(SKIPPED_METADATA_KEYS),
+        collection_name=args.collection,
+    )
+    print(f"Re-rendered {updated} of {collection.count()} chunks — version {version}")
+
+    if args.export_index:
+        export_index(out_dir=None, dtype="int8", with_rescore=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render markdown for an existing KB collection")
+    parser.add_argument("--persist-directory", default=KB_PERSIST_DIRECTORY)
+    parser.add_argument(
+        "--collection",
+        default=collection_for_backend(KB_COLLECTION_NAME, settings.KB_EMBEDDING_BACKEND),
+    )
+    parser.add_argument(
+        "--export-index",
+        action="store_true",
+        help="Refresh the quantized mmap export (KB_SEARCH_BACKEND=mmap) afterwards",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,84 @@
+"""
+Publish a built KB as a new versioned snapshot, or roll back to an older one.
+
+The build directory (chroma_db, including its quantized export) is copied to
+KB_SNAPSHOT_DIR/<timestamp>-<kb_version> and CURRENT is switched to it.
+Running agent workers notice within KB_SNAPSHOT_POLL_SEC, load the snapshot
+in the background and swap to it between searches, so live calls are not
+dropped. The newest KB_SNAPSHOT_KEEP snapshots are kept for rollback.
+
+Usage:
+    python -m scripts.publish_kb_snapshot
+    python -m scripts.publish_kb_snapshot --list
+    python -m scripts.publish_kb_snapshot --activate 20260101T120000Z-3f2a9c1e0b7d4a65
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.services.vectordb.embeddings import collection_for_backend
+from src.services.vectordb.snapshots import (
+    activate_snapshot,
+    current_snapshot,
+    list_snapshots,
+    publish_snapshot,
+)
+from src.services.vectordb.vectordb_svc import (
+    KB_COLLECTION_NAME,
+    KB_PERSIST_DIRECTORY,
+    version_file_name,
+)
+
+
+def publish(source_dir: str, root: str, keep: int) -> str | None:
+    collection = collection_for_backend(KB_COLLECTION_NAME, settings.KB_EMBEDDING_BACKEND)
+    marker = os.path.join(source_dir, version_file_name(collection))
+    try:
+        with open(marker, encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        print(f"ERROR: {marker} not found; build the KB with scripts.ingest_kb first")
+        return None
+
+    name = publish_snapshot(source_dir, root, version, keep=keep)
+    print(f"Published KB snapshot {name} to {root}")
+    return name
+
+
+def show(root: str) -> None:
+    current = current_snapshot(root)
+    names = list_snapshots(root)
+    if not names:
+        print(f"No KB snapshots in {root}")
+    for name in names:
+        print(f"{'*' if name == current else ' '} {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish or roll back a versioned KB snapshot")
+    parser.add_argument("--source", default=KB_PERSIST_DIRECTORY, help="Built KB directory to publish")
+    parser.add_argument("--root", default=settings.KB_SNAPSHOT_DIR, help="Defaults to KB_SNAPSHOT_DIR")
+    parser.add_argument("--keep", type=int, default=settings.KB_SNAPSHOT_KEEP)
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--list", action="store_true", help="List snapshots (* = live)")
+    action.add_argument("--activate", metavar="NAME", help="Make an existing snapshot live again")
+    args = parser.parse_args()
+
+    if not args.root:
+        print("ERROR: KB_SNAPSHOT_DIR is disabled")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.list:
+        show(args.root)
+    elif args.activate:
+        activate_snapshot(args.root, args.activate)
+        print(f"KB snapshot {args.activate} is live")
+    else:
+        publish(args.source, args.root, args.keep)
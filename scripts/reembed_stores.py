@@ -0,0 +1,151 @@
+"""
+Re-embed the KB collection and/or the card history for another embedding backend.
+
+Each embedding backend keeps its own KB collection (vector sizes differ), so
+switching KB_EMBEDDING_BACKEND needs the target collection populated first.
+This copies every record (ids, text, metadata) from the source backend's
+collection and embeds it with the target backend; records no longer in the
+source are removed from the target. Card history rows are re-embedded in
+place (recall only matches rows of the configured model). Run it, then flip
+the env vars and restart the workers.
+
+Usage:
+    python -m scripts.reembed_stores --to local
+    python -m scripts.reembed_stores --to local --stores kb --export-index
+    python -m scripts.reembed_stores --from local --to openai
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+from langchain_core.embeddings import Embeddings
+
+from scripts.export_kb_index import export_index
+from src.agents.indusnet.constants import SKIPPED_METADATA_KEYS
+from src.core.config import settings
+from src.services.llm.card_history import CardHistoryStore
+from src.services.vectordb.embeddings import (
+    EMBEDDING_BACKEND_LOCAL,
+    EMBEDDING_BACKEND_OPENAI,
+    EMBEDDING_BACKENDS,
+    build_embeddings,
+    collection_for_backend,
+)
+from src.services.vectordb.ingest import Chunk, embed_chunks, write_version
+from src.services.vectordb.rendering import render_signature
+from src.services.vectordb.vectordb_svc import KB_COLLECTION_NAME, KB_PERSIST_DIRECTORY
+
+STORE_KB = "kb"
+STORE_CARD_HISTORY = "cards"
+
+
+async def reembed_collection(
+    persist_directory: str,
+    source_name: str,
+    target_name: str,
+    embeddings: Embeddings,
+    text_of,
+    batch_size: int,
+    concurrency: int,
+) -> list[str]:
+    """Mirror source_name into target_name with fresh vectors; returns the target ids."""
+    client = chromadb.PersistentClient(path=persist_directory)
+    try:
+        source = client.get_collection(source_name)
+    except Exception as e:
+        print(f"Skipping {source_name}: {e}")
+        return []
+    target = client.get_or_create_collection(target_name)
+
+    data = source.get(include=["documents", "metadatas"])
+    ids = data["ids"]
+    documents = dict(zip(ids, data["documents"] or [None] * len(ids)))
+    chunks = []
+    for doc_id, metadata in zip(ids, data["metadatas"] or [{}] * len(ids)):
+        text = text_of(documents[doc_id], metadata or {})
+        if text:
+            chunks.append(Chunk(id=doc_id, text=text, metadata=metadata or {}))
+
+    vectors = await embed_chunks(chunks, embeddings, batch_size, concurrency)
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i : i + batch_size]
+        target.upsert(
+            ids=[c.id for c in batch],
+            embeddings=vectors[i : i + batch_size],
+            # Copy documents as-is
+            documents=[documents[c.id] for c in batch],
+            metadatas=[c.metadata for c in batch],
+        )
+
+    keep = {c.id for c in chunks}
+    stale = [doc_id for doc_id in target.get(include=[])["ids"] if doc_id not in keep]
+    if stale:
+        target.delete(ids=stale)
+    print(f"{source_name} → {target_name}: {len(chunks)} re-embedded, {len(stale)} removed")
+    return sorted(keep)
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.source == args.target:
+        print("ERROR: --from and --to must differ")
+        return
+    if EMBEDDING_BACKEND_OPENAI == args.target and not settings.OPENAI_API_KEY:
+        print("ERROR: OPENAI_API_KEY is not configured")
+        return
+    embeddings = build_embeddings(args.target)
+
+    if STORE_KB in args.stores:
+        target_name = collection_for_backend(KB_COLLECTION_NAME, args.target)
+        ids = await reembed_collection(
+            KB_PERSIST_DIRECTORY,
+            collection_for_backend(KB_COLLECTION_NAME, args.source),
+            target_name,
+            embeddings,
+            text_of=lambda document, metadata: document,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        )
+        if ids:
+            version = write_version(
+                KB_PERSIST_DIRECTORY,
+                ids,
+                salt=render_signature(SKIPPED_METADATA_KEYS),
+                collection_name=target_name,
+            )
+            print(f"KB version {version}")
+            if args.export_index and args.target == settings.KB_EMBEDDING_BACKEND:
+                export_index(out_dir=None, dtype="int8", with_rescore=True)
+
+    if STORE_CARD_HISTORY in args.stores:
+        store = CardHistoryStore(
+            settings.CARD_HISTORY_PATH, embeddings, max_per_user=settings.CARD_HISTORY_MAX_PER_USER
+        )
+        count = await store.reembed(batch_size=args.batch_size)
+        print(f"card history → {store.model}: {count} re-embedded")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed the KB / card history for another backend")
+    parser.add_argument("--from", dest="source", choices=EMBEDDING_BACKENDS, default=EMBEDDING_BACKEND_OPENAI)
+    parser.add_argument("--to", dest="target", choices=EMBEDDING_BACKENDS, default=EMBEDDING_BACKEND_LOCAL)
+    parser.add_argument(
+        "--stores", nargs="+", choices=[STORE_KB, STORE_CARD_HISTORY], default=[STORE_KB, STORE_CARD_HISTORY]
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--export-index",
+        action="store_true",
+        help="Refresh the quantized mmap export if --to is the configured KB backend",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
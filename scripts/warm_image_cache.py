@@ -0,0 +1,55 @@
+"""
+Pre-fill the flashcard image-search cache from a list of common queries.
+
+The cache is a SQLite file shared by every agent worker on the host
+(IMAGE_SEARCH_CACHE_PATH), so warming it once means those card images
+resolve without a SearXNG request. Queries already cached are skipped unless
+--refresh is given. Run it after deploys or from cron, ahead of the TTL.
+
+Usage:
+    python -m scripts.warm_image_cache
+    python -m scripts.warm_image_cache --file my_queries.txt --refresh
+    python -m scripts.warm_image_cache "cloud infrastructure" "AI analytics dashboard"
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.services.search.searxng_svc import SearXNGService
+
+DEFAULT_QUERIES = os.path.join(settings.ASSETS_DIR, "data", "image_queries.txt")
+
+
+def read_queries(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+async def main(args: argparse.Namespace) -> None:
+    queries = args.queries or read_queries(args.file)
+    service = SearXNGService()
+    try:
+        counts = await service.warm_image_cache(
+            queries, concurrency=args.concurrency, refresh=args.refresh
+        )
+    finally:
+        await service.close()
+    print(
+        f"{len(queries)} queries | fetched {counts['fetched']} | already cached {counts['cached']} | "
+        f"no images {counts['empty']} | failed {counts['failed']}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the flashcard image-search cache")
+    parser.add_argument("queries", nargs="*", help="Queries to warm (default: --file)")
+    parser.add_argument("--file", default=DEFAULT_QUERIES, help="One query per line; # for comments")
+    parser.add_argument("--concurrency", type=int, default=4, help="SearXNG requests in flight")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch queries already cached")
+    asyncio.run(main(parser.parse_args()))
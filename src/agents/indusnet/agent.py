@@ -1,17 +1,25 @@
+from typing import Optional
+
 from src.agents.base import BaseAgent
+from src.agents.registry import ServiceRegistry
 from src.agents.indusnet.prompts import INDUSNET_AGENT_PROMPT
 # from src.agents.prompts.humanization import TTS_HUMANIFICATION_CARTESIA 
 from src.services.llm.ui_agent import UIAgentFunctions
-from src.services.vectordb.vectordb_svc import VectorStoreService
-from src.services.map.googlemap.services import GoogleMapService
-from src.services.search.searxng_svc import SearXNGService
+from src.core.config import settings
+from src.services.faq.answer_cache import FAQAnswerCache, get_faq_cache
+from src.services.vectordb.context_assembler import ContextAssembler
+from src.services.vectordb.entity_index import EntityIndex, get_entity_index
+from src.services.vectordb.result_cache import get_result_cache
 
 # ── Helpers ────────────────────────────────────────────────────────────────
+from src.agents.indusnet.helpers.card_speculation import CardSpeculationController
 from src.agents.indusnet.helpers.packet import PacketHelperMixin
+from src.agents.indusnet.helpers.prefetch import KBPrefetchController
 from src.agents.indusnet.helpers.vector_search import VectorSearchHelperMixin
 
 # ── Handlers ───────────────────────────────────────────────────────────────
 from src.agents.indusnet.handlers.data_handler import DataHandlerMixin
+from src.agents.indusnet.handlers.faq_handler import FAQHandlerMixin
 
 # ── Tools ──────────────────────────────────────────────────────────────────
 from src.agents.indusnet.tools.knowledge import KnowledgeToolsMixin
@@ -37,6 +45,7 @@ class IndusNetAgent(
     VectorSearchHelperMixin,
     # ── Data Handler ───────────────────────────────────────────────
     DataHandlerMixin,
+    FAQHandlerMixin,
     # ── Tools (registered as @function_tool by LiveKit) ────────────
     KnowledgeToolsMixin,
     UIPublisherToolsMixin,
@@ -55,7 +64,7 @@ class IndusNetAgent(
     Agent for handling Indus Net Technologies inquiries with UI integration.
 
     This class is intentionally thin — it only wires together:
-      - Service clients (VectorStore, UIAgentFunctions, GoogleMapService)
+      - Service clients (injected from the process-wide ServiceRegistry)
       - State initialisation (via AgentState mixin)
       - Instruction rebuilding (_update_instructions)
 
@@ -63,15 +72,56 @@ class IndusNetAgent(
     all data-event handling in handlers/, and all constants in constants.py.
     """
 
-    def __init__(self, room) -> None:
+    def __init__(self, room, services: ServiceRegistry) -> None:
         self._base_instruction = INDUSNET_AGENT_PROMPT
         super().__init__(room=room, instructions=self._base_instruction)
 
         # ── Service Clients ────────────────────────────────────────
-        self.ui_agent_functions = UIAgentFunctions()
-        self.vector_store = VectorStoreService()
-        self.search_service = SearXNGService()
-        self.google_map_service = GoogleMapService()
+        # Shared, already-warm clients from prewarm(); the registry owns and
+        # closes them, so the agent never builds its own
+        self.services = services
+        self.ui_agent_functions = UIAgentFunctions(
+            openai_client=services.openai_client,
+            search_service=services.search_service,
+            card_history=services.card_history,
+        )
+        self.vector_store = services.vector_store
+        self.kb_result_cache = get_result_cache()
+        self.kb_context_assembler = ContextAssembler(
+            token_budget=settings.KB_CONTEXT_TOKEN_BUDGET,
+            mmr_lambda=settings.KB_CONTEXT_MMR_LAMBDA,
+            dedup_threshold=settings.KB_CONTEXT_DEDUP_THRESHOLD,
+            encoding_name=settings.KB_CONTEXT_TOKENIZER,
+        )
+        self.entity_index: Optional[EntityIndex] = (
+            get_entity_index(settings.ENTITY_DATA_PATH, settings.KB_ENTITY_MIN_CONFIDENCE)
+            if settings.KB_ENTITY_FAST_PATH_ENABLED
+            else None
+        )
+        self.faq_cache: Optional[FAQAnswerCache] = (
+            get_faq_cache() if settings.FAQ_CACHE_ENABLED else None
+        )
+        self.kb_prefetch: Optional[KBPrefetchController] = (
+            KBPrefetchController(
+                fetch=self._prefetch_kb_context,
+                logger=self.logger,
+                debounce_sec=settings.KB_PREFETCH_DEBOUNCE_SEC,
+                match_threshold=settings.KB_PREFETCH_MATCH_THRESHOLD,
+            )
+            if settings.KB_PREFETCH_ENABLED
+            else None
+        )
+        self.card_speculation: Optional[CardSpeculationController] = (
+            CardSpeculationController(
+                generate=self._speculative_cards,
+                logger=self.logger,
+                ttl_sec=settings.UI_CARD_SPECULATION_TTL_SEC,
+            )
+            if settings.UI_CARD_SPECULATION_ENABLED
+            else None
+        )
+        self.search_service = services.search_service
+        self.google_map_service = services.google_map_service
 
         # ── Runtime State (all fields defined in AgentState) ───────
         self._init_state()
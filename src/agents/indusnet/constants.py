@@ -18,4 +18,4 @@ TOPIC_UI_INFOGRAPHIC = "ui.infographic"  # backend → frontend: composed text i
 
 
 # Metadata keys to skip when formatting vector DB results
-SKIPPED_METADATA_KEYS = ["source_content_focus"]
+SKIPPED_METADATA_KEYS = ["source_content_focus", "content_hash"]
@@ -0,0 +1,83 @@
+import asyncio
+import uuid
+
+from livekit.agents import StopResponse, llm
+
+from src.agents.indusnet.constants import TOPIC_UI_FLASHCARD
+from src.core.config import settings
+from src.services.faq.answer_cache import FAQMatch, record_hit
+
+
+class FAQHandlerMixin:
+    """Serves approved FAQ answers before the LLM runs (see services/faq/answer_cache.py)."""
+
+    def warm_faq_lookup(self, transcript: str) -> None:
+        """Embed a final transcript early so the turn-end lookup is a cache hit."""
+        if self.faq_cache is None or not len(self.faq_cache):
+            return
+        if len(transcript.split()) < settings.FAQ_CACHE_MIN_WORDS:
+            return
+        asyncio.create_task(self.vector_store.embed_query(transcript.strip()))
+
+    async def on_user_turn_completed(
+        self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage
+    ) -> None:
+        """Answer top questions from the FAQ cache and skip the LLM turn."""
+        if self.faq_cache is None:
+            return
+        text = (new_message.text_content or "").strip()
+        if len(text.split()) < settings.FAQ_CACHE_MIN_WORDS:
+            return
+
+        try:
+            match = await asyncio.wait_for(
+                self.faq_cache.match(text, self.vector_store),
+                timeout=settings.FAQ_CACHE_LOOKUP_TIMEOUT,
+            )
+        except (asyncio.TimeoutError, Exception) as e:
+            # Never hold up the normal reply for the cache
+            self.logger.warning(f"FAQ cache lookup skipped: {e!r}")
+            return
+        if match is None:
+            return
+
+        self.logger.info(
+            f"✅ FAQ cache hit ({match.similarity:.3f}) for {text!r} → {match.matched_question!r}"
+        )
+        await self._serve_faq_answer(new_message, match)
+        raise StopResponse()
+
+    async def _serve_faq_answer(self, new_message: llm.ChatMessage, match: FAQMatch) -> None:
+        """Speak the approved answer, publish its cards and keep the chat history whole."""
+        answer = match.answer
+
+        # StopResponse drops the user message from the history; add it back so
+        # later LLM turns see the question before the spoken answer
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.items.append(new_message)
+        await self.update_chat_ctx(chat_ctx)
+        self.session.say(answer.answer_text, allow_interruptions=True)
+
+        if answer.cards:
+            asyncio.create_task(self._publish_faq_cards(match))
+        asyncio.create_task(record_hit(answer.id))
+
+    async def _publish_faq_cards(self, match: FAQMatch) -> None:
+        answer = match.answer
+        stream_id = str(uuid.uuid4())
+        for card_index, card in enumerate(answer.cards):
+            payload = {**card, "stream_id": stream_id, "card_index": card_index}
+            await self._publish_data_packet(payload, TOPIC_UI_FLASHCARD)
+        await self._publish_data_packet(
+            {"type": "end_of_stream", "stream_id": stream_id, "card_count": len(answer.cards)},
+            TOPIC_UI_FLASHCARD,
+        )
+
+        self._set_last_ui_snapshot(
+            snapshot_type="flashcard_stream",
+            title="Knowledge summary",
+            summary=answer.answer_text,
+            details={"user_input": answer.question, "faq_id": answer.id},
+            source_tool="faq_answer_cache",
+            email_context=self._build_knowledge_email_context(answer.question, answer.answer_text),
+        )
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+CARD_TTFC_BUDGET_SEC = 3.0
+CARD_TOTAL_BUDGET_SEC = 15.0
+
+
+class CardStreamDeadline:
+    """Time budgets for one UI card stream, and its TTFC / TTLC metrics.
+
+    The card generator can take up to its 20 s request timeout to produce a
+    first card, or nothing at all. paced() re-yields the generator's payloads
+    and calls `on_first_card_due` once if nothing has been shown within
+    `ttfc_budget` seconds, so the publisher can put the fallback card on
+    screen while generation continues. After `total_budget` seconds the
+    generator is cancelled and closed; cards published so far stay (and
+    query_process_stream still saves them to the card history).
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        ttfc_budget: float = CARD_TTFC_BUDGET_SEC,
+        total_budget: float = CARD_TOTAL_BUDGET_SEC,
+    ) -> None:
+        self._logger = logger
+        self.started_at = time.monotonic()
+        self.first_card_deadline = self.started_at + ttfc_budget
+        self.total_deadline = self.started_at + max(ttfc_budget, total_budget)
+        self.first_card_at: Optional[float] = None
+        self.last_card_at: Optional[float] = None
+        self.fallback_at: Optional[float] = None
+        self.timed_out = False
+        self._ttfc_checked = False
+
+    # ── Bookkeeping (called by the publisher) ──────────────────────────────
+
+    def card_shown(self) -> None:
+        """Something from the deck is on screen (a card_begin skeleton or a whole card)."""
+        if self.first_card_at is None:
+            self.first_card_at = time.monotonic()
+
+    def card_published(self) -> None:
+        """A complete deck card was published."""
+        self.card_shown()
+        self.last_card_at = time.monotonic()
+
+    def fallback_published(self) -> None:
+        self.fallback_at = time.monotonic()
+
+    def _ms(self, at: Optional[float]) -> Optional[int]:
+        return None if at is None else round((at - self.started_at) * 1000)
+
+    def metrics(self) -> dict[str, Any]:
+        """TTFC / TTLC / fallback time in ms since the stream started (None if it never happened)."""
+        return {
+            "ttfc_ms": self._ms(self.first_card_at),
+            "ttlc_ms": self._ms(self.last_card_at),
+            "fallback_ms": self._ms(self.fallback_at),
+            "timed_out": self.timed_out,
+        }
+
+    # ── Pacing ─────────────────────────────────────────────────────────────
+
+    def _first_card_pending(self) -> bool:
+        return self.first_card_at is None and not self._ttfc_checked
+
+    async def paced(
+        self,
+        payloads: AsyncIterator[dict[str, Any]],
+        on_first_card_due: Callable[[], Awaitable[None]],
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield from `payloads` until it ends or the total budget runs out."""
+        iterator = payloads.__aiter__()
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                deadline = (
+                    self.first_card_deadline if self._first_card_pending() else self.total_deadline
+                )
+                # The pending __anext__ is never cancelled on the TTFC deadline:
+                # cancelling it would kill the generator mid-card.
+                done, _ = await asyncio.wait({pending}, timeout=max(0.0, deadline - time.monotonic()))
+                if done:
+                    try:
+                        payload = pending.result()
+                    except StopAsyncIteration:
+                        return
+                    pending = None
+                    yield payload
+                elif self._first_card_pending():
+                    self._logger.info(
+                        "[cards] no card after %.1fs; showing the fallback meanwhile",
+                        self.first_card_deadline - self.started_at,
+                    )
+                    self._ttfc_checked = True
+                    await on_first_card_due()
+                else:
+                    self.timed_out = True
+                    self._logger.warning(
+                        "[cards] stream over its %.1fs budget; stopping generation",
+                        self.total_deadline - self.started_at,
+                    )
+                    return
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                await asyncio.wait({pending})
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Final, Optional
+
+CARD_SPECULATION_TTL_SEC: Final[float] = 30.0
+
+
+class CardSpeculation:
+    """One speculative card stream: the cards produced so far, replayable while it runs."""
+
+    def __init__(self, question: str, db_results: str) -> None:
+        self.question = question
+        self.db_results = db_results
+        self.started_at = time.monotonic()
+        self.payloads: list[dict[str, Any]] = []
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self._progress = asyncio.Event()
+
+    def _push(self, payload: dict[str, Any]) -> None:
+        self.payloads.append(payload)
+        self._progress.set()
+
+    def _finish(self) -> None:
+        self.finished = True
+        self._progress.set()
+
+    async def replay(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield the payloads produced so far, then each new one until the stream ends."""
+        index = 0
+        while True:
+            while index < len(self.payloads):
+                yield self.payloads[index]
+                index += 1
+            if self.finished:
+                return
+            self._progress.clear()
+            await self._progress.wait()
+
+
+class CardSpeculationController:
+    """Starts UI card generation as soon as KB results exist, before publish_ui_stream.
+
+    The card model only needs the user's question and the KB context, both
+    known when the KB tool returns, so the deck is generated while the agent
+    LLM is still writing (and TTS speaking) its reply. publish_ui_stream then
+    take()s the speculation when it was built from the same KB context and
+    publishes its cards, including ones still streaming. Any other visual
+    replacing the screen, a newer KB search, or the TTL running out discards
+    it and cancels the generation.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], AsyncIterator[dict[str, Any]]],
+        logger: logging.Logger,
+        ttl_sec: float = CARD_SPECULATION_TTL_SEC,
+    ) -> None:
+        self._generate = generate
+        self._logger = logger
+        self._ttl_sec = ttl_sec
+        self._current: Optional[CardSpeculation] = None
+
+    def start(self, question: str, db_results: str) -> None:
+        """Speculatively generate cards for a KB result; replaces any earlier speculation."""
+        self.cancel()
+        if not db_results:
+            return
+        speculation = CardSpeculation(question, db_results)
+        speculation.task = asyncio.create_task(self._run(speculation))
+        self._current = speculation
+        self._logger.debug("[cards] speculative card generation for: %s", question)
+
+    def take(self, db_results: str) -> Optional[CardSpeculation]:
+        """The speculation built from `db_results`, handed over to the caller; otherwise None.
+
+        A speculation that does not match is cancelled: the agent is
+        publishing from different KB context.
+        """
+        speculation, self._current = self._current, None
+        if speculation is None:
+            return None
+        if (
+            speculation.db_results != db_results
+            or time.monotonic() - speculation.started_at > self._ttl_sec
+            or (speculation.task is not None and speculation.task.cancelled())
+        ):
+            self._cancel(speculation)
+            return None
+        self._logger.info(
+            "[cards] reusing speculative deck (%d card(s) ready)", len(speculation.payloads)
+        )
+        return speculation
+
+    def cancel(self) -> None:
+        """Discard the pending speculation (a different visual was chosen)."""
+        speculation, self._current = self._current, None
+        if speculation is not None:
+            self._cancel(speculation)
+
+    def stop(self) -> None:
+        self.cancel()
+
+    def _cancel(self, speculation: CardSpeculation) -> None:
+        if speculation.task is not None and not speculation.task.done():
+            speculation.task.cancel()
+            self._logger.debug("[cards] cancelled speculative deck for: %s", speculation.question)
+
+    async def _run(self, speculation: CardSpeculation) -> None:
+        try:
+            async for payload in self._generate(speculation.question, speculation.db_results):
+                speculation._push(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Best-effort: the consumer sees the cards so far, then its fallback
+            self._logger.debug("[cards] speculative generation failed: %s", e)
+        finally:
+            speculation._finish()
@@ -9,11 +9,14 @@ logger = logging.getLogger(__name__)
 _recent_fillers: deque[str] = deque(maxlen=5)
 
 
-async def generate_filler(context: list[dict]) -> str | None:
+async def generate_filler(
+    context: list[dict], client: AsyncOpenAI | None = None
+) -> str | None:
     """Ask a small LLM for a short filler phrase matching the conversation tone.
 
     Uses a standalone client so the agent's main ChatContext is never touched.
     context: recent completed turns as [{"role": "user"|"assistant", "text": "..."}].
+    client: shared AsyncOpenAI (keeps its connection pool warm); one is created if omitted.
     Returns None on any error so callers can safely skip the filler.
     """
     avoid = list(_recent_fillers)
@@ -31,8 +34,8 @@ async def generate_filler(context: list[dict]) -> str | None:
 
     try:
         # Isolated client — never touches the agent's LLM session
-        _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        
+        _client = client or AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
         response = await _client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Final, Optional
+
+from src.services.vectordb.bm25 import tokenize
+
+PREFETCH_DEBOUNCE_SEC: Final[float] = 0.3
+PREFETCH_MIN_TOKENS: Final[int] = 2
+PREFETCH_MATCH_THRESHOLD: Final[float] = 0.6
+PREFETCH_MAX_ENTRIES: Final[int] = 4
+PREFETCH_TTL_SEC: Final[float] = 60.0
+
+
+class KBPrefetchController:
+    """Speculatively runs KB retrieval on the user's transcript while they speak.
+
+    Interim transcripts are debounced; each settled transcript launches a
+    background search and a newer transcript cancels a search still in flight.
+    When the LLM calls the KB tool, take() hands back the speculation whose
+    transcript covers the tool's question, so retrieval overlaps endpointing
+    and LLM time-to-first-token instead of following them. Only the current
+    user turn's speculations are served: speech after a final transcript
+    starts a new turn and drops the earlier ones, which could otherwise cover
+    a follow-up question ("what about retail?") with the previous topic.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[str]],
+        logger: logging.Logger,
+        debounce_sec: float = PREFETCH_DEBOUNCE_SEC,
+        match_threshold: float = PREFETCH_MATCH_THRESHOLD,
+        max_entries: int = PREFETCH_MAX_ENTRIES,
+        ttl_sec: float = PREFETCH_TTL_SEC,
+    ) -> None:
+        self._fetch = fetch
+        self._logger = logger
+        self._debounce_sec = debounce_sec
+        self._match_threshold = match_threshold
+        self._max_entries = max_entries
+        self._ttl_sec = ttl_sec
+
+        self._debounce_task: asyncio.Task | None = None
+        # transcript tokens → (started_at, search task); newest last, current turn only
+        self._speculations: OrderedDict[frozenset, tuple[float, asyncio.Task]] = OrderedDict()
+        self._turn_open = False
+
+    def stop(self) -> None:
+        """Cancels the pending debounce and every running speculation."""
+        self._cancel_debounce_task()
+        self._drop_speculations()
+
+    def on_transcript(self, transcript: str, is_final: bool) -> None:
+        """Debounce interim text; final text is searched immediately."""
+        text = " ".join(transcript.split())
+        if not text:
+            return
+        if not self._turn_open:
+            # First speech after a final transcript: a new user turn
+            self._cancel_debounce_task()
+            self._drop_speculations()
+            self._turn_open = True
+        if is_final:
+            self._turn_open = False
+        if len(tokenize(text)) < PREFETCH_MIN_TOKENS:
+            return
+
+        self._cancel_debounce_task()
+        delay = 0.0 if is_final else self._debounce_sec
+        self._debounce_task = asyncio.create_task(self._debounced_start(text, delay))
+
+    async def take(self, question: str) -> Optional[str]:
+        """Prefetched results for a question, waiting on a matching in-flight search.
+
+        Returns None when no speculation covers the question or it failed.
+        """
+        entry = self._best_match(question)
+        if entry is None:
+            return None
+
+        _, task = entry
+        try:
+            # shield: a cancelled tool call must not kill a search others may reuse
+            results = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            return None
+
+        self._logger.info("[prefetch] serving KB results prefetched from transcript")
+        return results or None
+
+    def _best_match(self, question: str) -> Optional[tuple[frozenset, asyncio.Task]]:
+        self._evict_expired()
+        question_tokens = set(tokenize(question))
+        if not question_tokens:
+            return None
+
+        best, best_score = None, 0.0
+        for key, (_, task) in self._speculations.items():
+            if task.cancelled():
+                continue
+            # Share of the question's terms the user actually said
+            score = len(question_tokens & key) / len(question_tokens)
+            if score >= best_score:
+                best, best_score = (key, task), score
+        if best is None or best_score < self._match_threshold:
+            return None
+        return best
+
+    async def _debounced_start(self, text: str, delay: float) -> None:
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+
+        key = frozenset(tokenize(text))
+        if key in self._speculations:
+            self._speculations.move_to_end(key)
+            return
+
+        # Only the newest transcript is worth finishing
+        for _, task in self._speculations.values():
+            if not task.done():
+                task.cancel()
+
+        self._logger.debug("[prefetch] speculative KB search for: %s", text)
+        self._speculations[key] = (time.monotonic(), asyncio.create_task(self._speculate(text)))
+        while len(self._speculations) > self._max_entries:
+            _, (_, task) = self._speculations.popitem(last=False)
+            if not task.done():
+                task.cancel()
+
+    async def _speculate(self, text: str) -> str:
+        try:
+            return await self._fetch(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Speculation is best-effort; the tool falls back to a normal search
+            self._logger.debug("[prefetch] speculative search failed: %s", e)
+            return ""
+
+    def _drop_speculations(self) -> None:
+        for _, task in self._speculations.values():
+            if not task.done():
+                task.cancel()
+        self._speculations.clear()
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self._ttl_sec
+        for key in [k for k, (started, _) in self._speculations.items() if started < cutoff]:
+            _, task = self._speculations.pop(key)
+            if not task.done():
+                task.cancel()
+
+    def _cancel_debounce_task(self) -> None:
+        debounce_task = self._debounce_task
+        if debounce_task and not debounce_task.done():
+            debounce_task.cancel()
+        self._debounce_task = None
@@ -1,62 +1,161 @@
 import asyncio
-import json
 from typing import Optional
 
 from src.agents.indusnet.constants import SKIPPED_METADATA_KEYS
+from src.services.vectordb.bm25 import tokenize
+from src.services.vectordb.entity_index import render_entity
+from src.services.vectordb.rendering import (
+    RENDERED_MARKDOWN_KEY,
+    render_signature,
+    stored_rendering,
+    with_rendering,
+)
 
 # Hard cap on a single vector-store query so a ChromaDB stall never freezes a turn
 _VECTOR_SEARCH_TIMEOUT = 8.0
 
+# Floor for each sub-question's share of the context budget in batched search
+_MIN_BATCH_TOKEN_BUDGET = 400
+
+# Pre-rendered markdown is only reused if it was built with this skip list
+_RENDER_SIGNATURE = render_signature(SKIPPED_METADATA_KEYS)
+
 
 class VectorSearchHelperMixin:
     """Helpers for querying the vector store and formatting results as Markdown."""
 
-    def _format_metadata_value(self, key: str, val: str) -> Optional[str]:
-        """Format a single metadata value, handling JSON strings."""
-        human_key = key.replace("_", " ").title()
-
-        # Check if it's a JSON string (list or dict)
-        if isinstance(val, str) and val.strip().startswith(("[", "{")):
-            try:
-                parsed = json.loads(val)
-                if isinstance(parsed, list):
-                    formatted_val = ", ".join(map(str, parsed))
-                elif isinstance(parsed, dict):
-                    formatted_val = ", ".join(
-                        [
-                            f"{k.replace('_', ' ').title()}: {v}"
-                            for k, v in parsed.items()
-                        ]
-                    )
-                else:
-                    formatted_val = str(parsed)
-                return f"**{human_key}:** {formatted_val}"
-            except json.JSONDecodeError:
-                # Fallback for invalid JSON
-                return f"**{human_key}:** {val}"
-
-        # Regular value
-        return f"**{human_key}:** {val}"
-
-    def _format_metadata(self, metadata: dict) -> list[str]:
-        """Extract and format all metadata dynamically."""
-        details = []
-        for key, val in metadata.items():
-            # Skip internal/empty keys
-            if not val or key in SKIPPED_METADATA_KEYS:
-                continue
-
-            formatted = self._format_metadata_value(key, val)
-            if formatted:
-                details.append(formatted)
-
-        return details
+    def _render_result(self, doc) -> str:
+        """Markdown body of one result, pre-rendered at ingest when available."""
+        body = stored_rendering(doc.metadata, _RENDER_SIGNATURE)
+        if body is None:
+            # Not pre-rendered (or rendered with an older skip list): render
+            # once and keep it on the document, which the in-process indexes reuse
+            doc.metadata = with_rendering(doc.page_content, doc.metadata, SKIPPED_METADATA_KEYS)
+            body = doc.metadata[RENDERED_MARKDOWN_KEY]
+        return body
+
+    def _format_results(self, bodies: list[str]) -> str:
+        """Join rendered result bodies into a single Markdown block."""
+        return "\n\n---\n\n".join(
+            f"### Result {i + 1}\n\n{body}" for i, body in enumerate(bodies)
+        )
+
+    def _entity_facts(self, query: str) -> Optional[str]:
+        """Canonical facts from the entity store when it answers the query confidently."""
+        if self.entity_index is None:
+            return None
+        match = self.entity_index.match(query)
+        if match is None:
+            return None
+        self.logger.info(
+            f"✅ KB answered from entity store: {[e.id for e in match.entities]} "
+            f"(alias {match.alias!r}, confidence {match.confidence:.2f})"
+        )
+        return self._format_results([render_entity(e) for e in match.entities])
+
+    def _assemble_results(
+        self, results: list, embedding: list[float], token_budget: Optional[int] = None
+    ) -> str:
+        """Dedupe, MMR-order and token-budget the candidates, then format them."""
+        bodies = [self._render_result(doc) for doc in results]
+        context = self.kb_context_assembler.assemble(
+            bodies,
+            query_vector=embedding,
+            vectors=self.vector_store.document_vectors(results),
+            token_budget=token_budget,
+        )
+        self.logger.info(
+            f"KB context: {len(context.texts)}/{len(results)} chunks, {context.tokens} tokens "
+            f"({context.dropped_duplicates} duplicate, {context.dropped_for_budget} over budget)"
+        )
+        return self._format_results(context.texts)
+
+    async def _retrieve_kb_context(self, query: str) -> str:
+        """Entity store first; else embed, consult the semantic result cache, search and assemble."""
+        facts = self._entity_facts(query)
+        if facts is not None:
+            return facts
+
+        k = self.db_fetch_size
+        embedding = await self.vector_store.embed_query(query)
+        version = self.vector_store.collection_version()
+        # Hybrid results depend on the literal terms, not just the embedding
+        terms = frozenset(tokenize(query)) if self.vector_store.hybrid else None
+
+        cached = self.kb_result_cache.lookup(embedding, k, version, terms)
+        if cached is not None:
+            self.logger.info("✅ KB results served from semantic cache")
+            return cached
+
+        results = await self.vector_store.search(query, k=k, embedding=embedding)
+        formatted = self._assemble_results(results, embedding)
+        if formatted:
+            self.kb_result_cache.store(embedding, k, version, formatted, terms)
+        return formatted
+
+    async def _retrieve_kb_context_batch(self, questions: list[str]) -> str:
+        """One batched embedding call and concurrent searches for several sub-questions.
+
+        Each chunk is shown once, under the first question that retrieved it,
+        and the token budget is split evenly between the questions. Questions
+        the entity store answers skip embedding and search entirely.
+        """
+        k = self.db_fetch_size
+        answers = {question: self._entity_facts(question) for question in questions}
+        pending = [question for question in questions if answers[question] is None]
+
+        embeddings = await self.vector_store.embed_queries(pending) if pending else []
+        result_sets = await asyncio.gather(
+            *(
+                self.vector_store.search(question, k=k, embedding=embedding)
+                for question, embedding in zip(pending, embeddings)
+            )
+        )
+
+        budget = max(
+            self.kb_context_assembler.token_budget // len(questions), _MIN_BATCH_TOKEN_BUDGET
+        )
+        seen: set[str] = set()
+        for question, embedding, results in zip(pending, embeddings, result_sets):
+            unique = []
+            for doc in results:
+                key = doc.id or doc.page_content
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(doc)
+            answers[question] = self._assemble_results(unique, embedding, token_budget=budget)
+
+        return "\n\n===\n\n".join(
+            f"## {question}\n\n{answers[question] or '_No new knowledge base results for this question._'}"
+            for question in questions
+        )
+
+    async def _prefetch_kb_context(self, query: str) -> str:
+        """Speculative retrieval for KBPrefetchController; leaves db_results untouched."""
+        return await asyncio.wait_for(
+            self._retrieve_kb_context(query), timeout=_VECTOR_SEARCH_TIMEOUT
+        )
+
+    async def _vector_db_search_batch(self, questions: list[str]) -> str:
+        """Batched counterpart of _vector_db_search; sets db_results to the grouped block."""
+        try:
+            self.db_results = await asyncio.wait_for(
+                self._retrieve_kb_context_batch(questions),
+                timeout=_VECTOR_SEARCH_TIMEOUT,
+            )
+        except (asyncio.TimeoutError, Exception) as e:
+            self.logger.error(f"❌ Batched vector DB search failed/timed out: {e}")
+            self.db_results = ""
+            return self.db_results
+
+        self.logger.info(f"✅ DB results for {len(questions)} questions converted to markdown")
+        return self.db_results
 
     async def _vector_db_search(self, query: str) -> str:
         """Search the vector database for relevant information."""
         try:
-            results = await asyncio.wait_for(
-                self.vector_store.search(query, k=self.db_fetch_size),
+            self.db_results = await asyncio.wait_for(
+                self._retrieve_kb_context(query),
                 timeout=_VECTOR_SEARCH_TIMEOUT,
             )
         except (asyncio.TimeoutError, Exception) as e:
@@ -66,18 +165,5 @@ class VectorSearchHelperMixin:
             self.db_results = ""
             return self.db_results
 
-        formatted_results = []
-        for i, doc in enumerate(results):
-            content = doc.page_content.strip()
-            md_chunk = f"### Result {i + 1}\n\n{content}\n"
-
-            # Format metadata
-            details = self._format_metadata(doc.metadata)
-            if details:
-                md_chunk += "\n" + "\n".join([f"- {d}" for d in details])
-
-            formatted_results.append(md_chunk)
-
-        self.db_results = "\n\n---\n\n".join(formatted_results)
         self.logger.info(f"✅ DB results converted to markdown")
         return self.db_results
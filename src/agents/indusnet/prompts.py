@@ -1,3 +1,6 @@
+from src.core.config import settings
+from src.services.vectordb.entity_index import get_entity_index
+
 INDUSNET_AGENT_PROMPT = """
 
 # ===================================================================
@@ -107,6 +110,10 @@ Available_tool:
   name: "search_indus_net_knowledge_base"
   description: "Internal data retrieval tool. Use this to search the official Indus Net Knowledge Base using your UPGRADED, context-aware query. This tool ONLY retrieves raw text for you to read. It DOES NOT update the user's screen. You MUST synthesize these results before calling 'publish_ui_stream'."
 
+Available_tool_1b:
+  name: "search_indus_net_knowledge_base_batch"
+  description: "Batched variant of 'search_indus_net_knowledge_base' for COMPOUND questions (e.g. 'what do you do in cloud and AI, and where are your offices?'). Split the ask into 2-5 upgraded, self-contained sub-questions and pass them together as 'questions' — ONE call instead of several sequential searches. Results come back grouped under each sub-question. Same rules as the single search: raw text for you to synthesize, it does NOT update the screen."
+
 Available_tool_2:
   name: "publish_ui_stream"
   description: "UI image-card DECK tool. Use for render_image_flashcards topics (§2b): case studies/portfolio, team & CEO profiles, services/capability showcase, company background/about/milestones — topics with strong supporting imagery. It generates a dynamic-count deck (as many cards as the answer needs, typically 1-6) that is normally image cards but MAY include a text-only card where an image adds nothing. For a purely text answer with no image-worthy content, use 'publish_infographic' instead. Arguments: user_input (the user's original query), agent_response (a high-impact, polished summary of the results). NEVER pass raw search data here; always pass your own curated consultant-level summary. IMPORTANT: Calling this tool REPLACES everything currently on the user's screen."
@@ -189,11 +196,11 @@ Available_tool_15:
 
 Available_tool_17:
   name: "send_context_email"
-  description: "Send a polished summary email of on-screen context. Arguments: recipient_email (optional), screens_back (optional int, default 0). If user says 'go back then email' or 'send the previous screen', pass screens_back=1. Falls back to Mem0 recall if session history is empty."
+  description: "Send a polished summary email of on-screen context. Arguments: recipient_email (optional), screens_back (optional int, default 0). If user says 'go back then email' or 'send the previous screen', pass screens_back=1. Falls back to the last deck in the user's card history if session history is empty."
 
 Available_tool_18:
   name: "send_context_whatsapp"
-  description: "Send a summary via WhatsApp. Arguments: recipient_phone (required - WhatsApp phone number with 10-15 digits, e.g., 918697421450), screens_back (optional int, default 0). Falls back to Mem0 recall if session history is empty."
+  description: "Send a summary via WhatsApp. Arguments: recipient_phone (required - WhatsApp phone number with 10-15 digits, e.g., 918697421450), screens_back (optional int, default 0). Falls back to the last deck in the user's card history if session history is empty."
 
 Available_tool_19:
   name: "get_ui_history"
@@ -436,48 +443,7 @@ Behavior:
 # ===================================================================
 # Use these details when calling 'publish_nearby_offices' or 'calculate_distance_to_destination'.
 OFFICE_DATA:
-  - id: "kolkata-newtown"
-    name: "Kolkata Newtown (Ecospace) — Headquarters"
-    address: "4th Floor, Block-2b, ECOSPACE BUSINESS PARK, AA II, Newtown, Chakpachuria, West Bengal 700160"
-    lat: 22.5810
-    lng: 88.4838
-    image_url: "https://intglobal.com/wp-content/uploads/2025/06/image-134.webp"
-  - id: "kolkata-sector-5"
-    name: "Kolkata Sector 5 (SDF Building)"
-    address: "4th Floor, SDF Building Saltlake Electronic Complex, Kolkata, West Bengal 700091"
-    lat: 22.5726
-    lng: 88.4312
-    image_url: "https://blogger.googleusercontent.com/img/b/R29vZ2xl/AVvXsEgBP_TLtUJMWc8xyC8r2b1pTCbaOP4kALPPdr7x44Ts12WNfv4XPtmkDsUmSeJ9M4HOnf6ApIn_CZE4Gs7I3zCpL2m0fbPoaKAt8UcBwT2zoAGWuD0gqp4GebqFvfuCwvzTae-v13u3KhU/s1600/DSCN0274.JPG"
-  - id: "usa-boise"
-    name: "USA Office"
-    address: "1310 S Vista Ave Ste 28, Boise, Idaho – 83705"
-    lat: 43.5977
-    lng: -116.2106
-    image_url: "https://media.licdn.com/dms/image/v2/D5622AQEXFMOWHG9UEQ/feedshare-shrink_800/B56Zoqi1FHG4Ag-/0/1761650367301?e=2147483647&v=beta&t=exXz0i4LcAqW6E3yIHlA7mggZvz4pE2X3OWWq4Eecmw"
-  - id: "canada-toronto"
-    name: "Canada Office"
-    address: "120 Adelaide Street West, Suite 2500, M5H 1T1"
-    lat: 43.6494
-    lng: -79.3844
-    image_url: "https://media.licdn.com/dms/image/v2/D5622AQEXFMOWHG9UEQ/feedshare-shrink_800/B56Zoqi1FHG4Ag-/0/1761650367301?e=2147483647&v=beta&t=exXz0i4LcAqW6E3yIHlA7mggZvz4pE2X3OWWq4Eecmw"
-  - id: "uk-london"
-    name: "UK Office"
-    address: "13 More London Riverside, London SE1 2RE"
-    lat: 51.5049
-    lng: -0.0810
-    image_url: "https://media.licdn.com/dms/image/v2/D5622AQEXFMOWHG9UEQ/feedshare-shrink_800/B56Zoqi1FHG4Ag-/0/1761650367301?e=2147483647&v=beta&t=exXz0i4LcAqW6E3yIHlA7mggZvz4pE2X3OWWq4Eecmw"
-  - id: "poland-warsaw"
-    name: "Poland Office"
-    address: "BARTYCKA 22B M21A, 00-716 WARSZAWA"
-    lat: 52.1935
-    lng: 21.0295
-    image_url: "https://media.licdn.com/dms/image/v2/D5622AQEXFMOWHG9UEQ/feedshare-shrink_800/B56Zoqi1FHG4Ag-/0/1761650367301?e=2147483647&v=beta&t=exXz0i4LcAqW6E3yIHlA7mggZvz4pE2X3OWWq4Eecmw"
-  - id: "singapore"
-    name: "Singapore Office"
-    address: "Indus Net Technologies PTE Ltd., 60 Paya Lebar Road, #09-43 Paya Lebar Square – 409051"
-    lat: 1.3180
-    lng: 103.8930
-    image_url: "https://media.licdn.com/dms/image/v2/D5622AQEXFMOWHG9UEQ/feedshare-shrink_800/B56Zoqi1FHG4Ag-/0/1761650367301?e=2147483647&v=beta&t=exXz0i4LcAqW6E3yIHlA7mggZvz4pE2X3OWWq4Eecmw"
+__OFFICE_DATA__
 
 # ===================================================================
 # 10. Global Presence (Reference)
@@ -619,3 +585,22 @@ back_navigation_flow:
     - "If get_ui_history returns only 1 entry or 'No screen history', tell the user there is nothing to go back to."
 
 """
+
+
+def _office_data_yaml() -> str:
+    """OFFICE_DATA entries from the entity store, the single source of office facts."""
+    index = get_entity_index(settings.ENTITY_DATA_PATH, settings.KB_ENTITY_MIN_CONFIDENCE)
+    lines = []
+    for office in index.office_records():
+        lines += [
+            f"  - id: \"{office['id']}\"",
+            f"    name: \"{office['name']}\"",
+            f"    address: \"{office['address']}\"",
+            f"    lat: {office['lat']:.4f}",
+            f"    lng: {office['lng']:.4f}",
+            f"    image_url: \"{office['image_url']}\"",
+        ]
+    return "\n".join(lines)
+
+
+INDUSNET_AGENT_PROMPT = INDUSNET_AGENT_PROMPT.replace("__OFFICE_DATA__", _office_data_yaml())
@@ -2,6 +2,8 @@ import asyncio
 import datetime as dt
 from typing import Optional
 
+from src.core.config import settings
+
 # Maximum number of screen snapshots kept per session.
 _UI_SNAPSHOT_MAX_HISTORY = 10
 
@@ -18,7 +20,7 @@ class AgentState:
         """Initialise all state fields. Call this from IndusNetAgent.__init__."""
 
         # ── Vector DB ──────────────────────────────────────────────
-        self.db_fetch_size: int = 10
+        self.db_fetch_size: int = settings.KB_CONTEXT_FETCH_SIZE
         self.db_results: str = ""
 
         # ── User Context ───────────────────────────────────────────
@@ -89,6 +91,9 @@ class AgentState:
             "email_context": email_context or {},
             "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
         }
+        # The screen now shows something else; a pending speculative deck is moot
+        if self.card_speculation is not None:
+            self.card_speculation.cancel()
         self._ui_snapshot_history.append(snapshot)
         if len(self._ui_snapshot_history) > _UI_SNAPSHOT_MAX_HISTORY:
             self._ui_snapshot_history.pop(0)
@@ -13,6 +13,10 @@ _FLUFF_PATTERN = re.compile(
 )
 
 
+# Upper bound on sub-questions per batched KB search
+_MAX_BATCH_QUESTIONS = 5
+
+
 def _enrich_query(raw_query: str) -> str:
     """Strip conversational fluff and ensure query has enough context for a search engine."""
     q = raw_query.strip()
@@ -31,9 +35,45 @@ class KnowledgeToolsMixin:
     async def search_indus_net_knowledge_base(self, context: RunContext, question: str):
         """Search the official Indus Net Knowledge Base for information about the company."""
         self.logger.info(f"Searching knowledge base for: {question}")
+        if self.kb_prefetch is not None:
+            prefetched = await self.kb_prefetch.take(question)
+            if prefetched is not None:
+                self.db_results = prefetched
+                self._speculate_cards(question)
+                return self.db_results
         await self._vector_db_search(question)
+        self._speculate_cards(question)
+        return self.db_results
+
+    @function_tool
+    async def search_indus_net_knowledge_base_batch(
+        self, context: RunContext, questions: list[str]
+    ):
+        """Search the Indus Net Knowledge Base for several sub-questions in one call.
+
+        Use for compound questions (e.g. services in cloud and AI, plus office
+        locations) instead of calling search_indus_net_knowledge_base repeatedly.
+        Results are grouped under each question.
+
+        Args:
+            questions: 2-5 concise, self-contained search questions.
+        """
+        questions = [q.strip() for q in questions if q and q.strip()][:_MAX_BATCH_QUESTIONS]
+        if not questions:
+            return "No questions provided."
+        if len(questions) == 1:
+            return await self.search_indus_net_knowledge_base(context, questions[0])
+
+        self.logger.info(f"Searching knowledge base for {len(questions)} questions: {questions}")
+        await self._vector_db_search_batch(questions)
+        self._speculate_cards("; ".join(questions))
         return self.db_results
 
+    def _speculate_cards(self, question: str) -> None:
+        """Start generating the card deck for these KB results while the agent replies."""
+        if self.card_speculation is not None:
+            self.card_speculation.start(question, self.db_results)
+
     @function_tool
     async def search_internet_knowledge(self, context: RunContext, question: str):
         """Search the internet using SearXNG and return cleaned snippets for LLM use."""
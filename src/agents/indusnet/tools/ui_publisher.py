@@ -1,10 +1,15 @@
 import asyncio
 import re
 import uuid
+from typing import Optional
 
 from livekit.agents import function_tool, RunContext
 from pydantic import BaseModel
 
+from src.agents.indusnet.helpers.card_deadline import CardStreamDeadline
+from src.agents.indusnet.helpers.card_speculation import CardSpeculation
+from src.core.config import settings
+from src.services.vectordb.entity_index import get_entity_index
 from src.agents.indusnet.constants import (
     TOPIC_UI_FLASHCARD,
     TOPIC_GLOBAL_PRESENCE,
@@ -57,6 +62,10 @@ class UIPublisherToolsMixin:
     ) -> str:
         """Tool used to publish the UI stream to the frontend."""
         self.logger.info(f"Publishing UI stream for: {user_input}")
+        # Before the snapshot below, which discards any speculation still pending
+        speculation = (
+            self.card_speculation.take(self.db_results) if self.card_speculation else None
+        )
 
         self._set_last_ui_snapshot(
             snapshot_type="flashcard_stream",
@@ -72,7 +81,7 @@ class UIPublisherToolsMixin:
         # This runs in the background to ensure the voice response isn't delayed
         asyncio.create_task(
             self._publish_ui_stream(
-                user_input, self.db_results, agent_response, self.user_id,
+                user_input, self.db_results, agent_response, self.user_id, speculation,
             )
         )
         return "UI stream published."
@@ -149,19 +158,9 @@ class UIPublisherToolsMixin:
 
         payload = {
             "type": "global_presence",
-            "data": {
-                "regions": {
-                    "USA": "1310 S Vista Ave Ste 28, Boise, Idaho – 83705",
-                    "Canada": "120 Adelaide Street West, Suite 2500, M5H 1T1",
-                    "UK": "13 More London Riverside, London SE1 2RE",
-                    "Poland": "BARTYCKA 22B M21A, 00-716 WARSZAWA",
-                    "Singapore": "Indus Net Technologies PTE Ltd., 60 Paya Lebar Road, #09-43 Paya Lebar Square – 409051",
-                },
-                "headquarters": {
-                    "Kolkata Newtown (Headquarters)": "4th Floor, Block-2b, ECOSPACE BUSINESS PARK, AA II, Newtown, Chakpachuria, West Bengal 700160",
-                    "Kolkata Sector 5": "4th Floor, SDF Building Saltlake Electronic Complex, Kolkata, West Bengal 700091",
-                },
-            },
+            "data": get_entity_index(
+                settings.ENTITY_DATA_PATH, settings.KB_ENTITY_MIN_CONFIDENCE
+            ).global_presence(),
         }
 
         await self._publish_data_packet(payload, TOPIC_GLOBAL_PRESENCE)
@@ -275,70 +274,237 @@ class UIPublisherToolsMixin:
             return "No screen history yet this session."
         return "\n".join(titles)
 
+    def _speculative_cards(self, question: str, db_results: str):
+        """Card stream for CardSpeculationController.
+
+        No user_id: a speculative deck only enters the card history once
+        _publish_ui_stream has actually shown it.
+        """
+        return self.ui_agent_functions.query_process_stream(
+            user_input=question,
+            db_results=db_results,
+            on_media=self._publish_card_media,
+            progressive=settings.UI_CARD_PROGRESSIVE_ENABLED,
+        )
+
     async def _publish_ui_stream(
-        self, user_input: str, db_results: str, agent_response: str, user_id: str,
+        self,
+        user_input: str,
+        db_results: str,
+        agent_response: str,
+        user_id: str,
+        speculation: Optional[CardSpeculation] = None,
     ) -> None:
         """Generate and publish UI cards, filtering out already-visible content.
 
+        With a `speculation`, its cards (already generated or still streaming)
+        are published instead of starting a new generation.
+
+        With UI_CARD_PROGRESSIVE_ENABLED each card is sent in phases:
+        ``card_begin`` (skeleton), ``card_patch`` per section block, then
+        ``card_commit`` with the full card, or ``card_abort`` if it turned out
+        invalid (its card_index is then reused by the next card). Cards
+        replayed from the cache arrive as a bare ``card_commit``.
+
         Always ships at least one card + an end-of-stream marker, even if card
         generation errors or yields nothing — so the agent's "I'm showing you
         the details" promise is never broken and the frontend never hangs.
+        If no card is on screen within UI_CARD_TTFC_BUDGET_SEC the fallback is
+        published at card_index 0 straight away and the first real card
+        replaces it; generation is cut off after UI_CARD_TOTAL_BUDGET_SEC.
         """
         stream_id = str(uuid.uuid4())
         card_index = 0
+        published: list[dict] = []
+        progressive = settings.UI_CARD_PROGRESSIVE_ENABLED
+        open_index: Optional[int] = None  # card_index of a begun, uncommitted card
+        deadline = CardStreamDeadline(
+            self.logger,
+            ttfc_budget=settings.UI_CARD_TTFC_BUDGET_SEC,
+            total_budget=settings.UI_CARD_TOTAL_BUDGET_SEC,
+        )
 
-        try:
-            async for payload in self.ui_agent_functions.query_process_stream(
+        async def publish_early_fallback() -> None:
+            if agent_response and await self._publish_fallback_card(
+                stream_id, agent_response, progressive
+            ):
+                deadline.fallback_published()
+
+        if speculation is not None:
+            payloads = speculation.replay()
+        else:
+            payloads = self.ui_agent_functions.query_process_stream(
                 user_input=user_input,
                 db_results=db_results,
                 agent_response=agent_response,
                 user_id=user_id,
-            ):
+                on_media=self._publish_card_media,
+                progressive=progressive,
+            )
+
+        stream = deadline.paced(payloads, publish_early_fallback)
+        try:
+            async for payload in stream:
                 # The generator signals failure with an error payload — don't
                 # publish it as a card; fall through to the fallback below.
-                if payload.get("type") == "error":
+                kind = payload.get("type")
+                if kind == "error":
                     self.logger.error("UI stream generator error: %s", payload.get("content"))
                     continue
 
+                if kind == "card_begin":
+                    open_index, card_index = card_index, card_index + 1
+                    if await self._publish_data_packet(
+                        {
+                            "type": "card_begin",
+                            "stream_id": stream_id,
+                            "card_index": open_index,
+                            "card": payload["card"],
+                        },
+                        TOPIC_UI_FLASHCARD,
+                    ):
+                        deadline.card_shown()
+                    continue
+                if kind == "card_patch":
+                    if open_index is not None:
+                        await self._publish_data_packet(
+                            {
+                                "type": "card_patch",
+                                "stream_id": stream_id,
+                                "card_index": open_index,
+                                "section_index": payload["section_index"],
+                                "section": payload["section"],
+                            },
+                            TOPIC_UI_FLASHCARD,
+                        )
+                    continue
+                if kind == "card_abort":
+                    if open_index is not None:
+                        await self._abort_card(stream_id, open_index)
+                        # Always the newest card begun; the next card takes its index
+                        card_index, open_index = open_index, None
+                    continue
+
                 title = payload.get("title", "")
 
                 # Inject grouping info
                 payload["stream_id"] = stream_id
-                payload["card_index"] = card_index
-
-                if await self._publish_data_packet(payload, TOPIC_UI_FLASHCARD):
+                if open_index is not None:
+                    payload["card_index"], open_index = open_index, None
+                else:
+                    payload["card_index"], card_index = card_index, card_index + 1
+
+                packet = (
+                    {
+                        "type": "card_commit",
+                        "stream_id": stream_id,
+                        "card_index": payload["card_index"],
+                        "card": payload,
+                    }
+                    if progressive
+                    else payload
+                )
+                if await self._publish_data_packet(packet, TOPIC_UI_FLASHCARD):
+                    deadline.card_published()
                     self.logger.info(
                         "✅ Data packet sent successfully: %s (Stream: %s, Index: %s)",
                         title,
                         stream_id,
-                        card_index,
+                        payload["card_index"],
                     )
 
-                card_index += 1
+                published.append(payload)
         except Exception as e:
             self.logger.error("❌ UI stream generation failed: %s", e)
+        finally:
+            await stream.aclose()
+
+        if deadline.timed_out and speculation is not None and speculation.task is not None:
+            speculation.task.cancel()
+
+        # A card begun but never completed (stream cut off mid-card)
+        if open_index is not None:
+            await self._abort_card(stream_id, open_index)
+            card_index = open_index
+
+        if speculation is not None:
+            self.ui_agent_functions.remember_cards(user_input, published, user_id)
 
         # Fallback: if nothing was produced, ship one card built from the spoken
         # response so the user always sees the details the agent promised.
+        # An early fallback still on screen (no real card took card_index 0) counts.
         if card_index == 0 and agent_response:
-            fallback = {
-                "type": "flashcard",
-                "title": "Summary",
-                "value": agent_response,
-                "stream_id": stream_id,
-                "card_index": 0,
-                "fallback": True,
-            }
-            if await self._publish_data_packet(fallback, TOPIC_UI_FLASHCARD):
+            fallback_visible = deadline.fallback_at is not None and deadline.first_card_at is None
+            if fallback_visible or await self._publish_fallback_card(
+                stream_id, agent_response, progressive
+            ):
                 card_index = 1
-                self.logger.info("⚠️ Published fallback flashcard from spoken response")
+
+        metrics = deadline.metrics()
+        self.logger.info(
+            "[cards] stream %s: %d card(s), ttfc=%sms ttlc=%sms fallback=%sms timed_out=%s",
+            stream_id,
+            len(published),
+            metrics["ttfc_ms"],
+            metrics["ttlc_ms"],
+            metrics["fallback_ms"],
+            metrics["timed_out"],
+        )
 
         # Send end-of-stream marker
         end_of_stream_payload = {
             "type": "end_of_stream",
             "stream_id": stream_id,
             "card_count": card_index,
+            "metrics": metrics,
         }
 
         if await self._publish_data_packet(end_of_stream_payload, TOPIC_UI_FLASHCARD):
             self.logger.info(f"✅ End-of-stream marker sent for stream: {stream_id}")
+
+    async def _publish_fallback_card(
+        self, stream_id: str, agent_response: str, progressive: bool
+    ) -> bool:
+        """Publish the spoken response as card 0 of the stream; a real card 0 replaces it."""
+        fallback = {
+            "type": "flashcard",
+            "title": "Summary",
+            "value": agent_response,
+            "stream_id": stream_id,
+            "card_index": 0,
+            "fallback": True,
+        }
+        packet = (
+            {"type": "card_commit", "stream_id": stream_id, "card_index": 0, "card": fallback}
+            if progressive
+            else fallback
+        )
+        if not await self._publish_data_packet(packet, TOPIC_UI_FLASHCARD):
+            return False
+        self.logger.info("⚠️ Published fallback flashcard from spoken response")
+        return True
+
+    async def _abort_card(self, stream_id: str, card_index: int) -> None:
+        """Withdraw a card announced by card_begin that never became valid."""
+        await self._publish_data_packet(
+            {"type": "card_abort", "stream_id": stream_id, "card_index": card_index},
+            TOPIC_UI_FLASHCARD,
+        )
+
+    async def _publish_card_media(self, card: dict, media: dict) -> None:
+        """Patch an already-published card with the images found for it.
+
+        Image searches finish after the card (and possibly after end_of_stream);
+        the frontend swaps the placeholder of card `card_index` in `stream_id`.
+        """
+        if "stream_id" not in card:
+            return
+        await self._publish_data_packet(
+            {
+                "type": "card_media_update",
+                "stream_id": card["stream_id"],
+                "card_index": card["card_index"],
+                "media": media,
+            },
+            TOPIC_UI_FLASHCARD,
+        )
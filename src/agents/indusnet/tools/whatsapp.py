@@ -15,30 +15,27 @@ class WhatsAppToolsMixin:
 
         Priority:
         1. Session history at pointer offset (fast, exact, current session).
-        2. Mem0 vector recall (cross-session fallback when session is empty).
+        2. Latest deck in the card history (cross-session fallback when session is empty).
         """
         snapshot = self._get_snapshot_at_offset(-screens_back)
         if snapshot:
             return snapshot
 
         if self.user_id:
-            self.logger.info("📭 Session snapshot empty — falling back to Mem0 recall")
+            self.logger.info("📭 Session snapshot empty — falling back to card history")
             try:
-                cards = await self.ui_agent_functions.recall_ui_content(
-                    agent_response="most recent content shown to user",
-                    user_id=self.user_id,
-                )
+                cards = await self.ui_agent_functions.recall_latest_ui_content(self.user_id)
                 if cards:
                     combined_summary = " ".join(
                         c.get("value") or c.get("content") or c.get("title", "")
                         for c in cards[:3]
                     )[:600]
                     return {
-                        "type": "mem0_recall",
+                        "type": "card_history_recall",
                         "title": cards[0].get("title", "Recalled content"),
                         "summary": combined_summary,
-                        "details": {"card_count": len(cards), "source": "Mem0"},
-                        "source_tool": "mem0_recall",
+                        "details": {"card_count": len(cards), "source": "card_history"},
+                        "source_tool": "card_history_recall",
                         "email_context": {
                             "heading": cards[0].get("title", "Recalled content"),
                             "context_line": "A concise recap of previously shared information.",
@@ -48,7 +45,7 @@ class WhatsAppToolsMixin:
                         "timestamp": dt.datetime.utcnow().isoformat(),
                     }
             except Exception as exc:
-                self.logger.warning("Mem0 recall fallback failed: %s", exc)
+                self.logger.warning("Card history fallback failed: %s", exc)
 
         return None
 
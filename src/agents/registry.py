@@ -0,0 +1,90 @@
+"""
+Process-scoped service singletons for the agent worker.
+
+prewarm() builds one ServiceRegistry per job process before any call arrives,
+so IndusNetAgent only wires existing clients together instead of opening HTTP
+pools, the card history store and the vector store for every session. LiveKit
+runs one job per process, so the registry is closed by the job's shutdown
+callback. Only objects that need no job context belong here: the turn
+detector's MultilingualModel looks up the running job, so the entrypoint
+creates it per job.
+"""
+
+import logging
+from typing import Any
+
+from livekit.plugins import silero
+from openai import AsyncOpenAI
+
+from src.core.config import settings
+from src.services.llm.card_history import CardHistoryStore, get_card_history
+from src.services.map.googlemap.services import GoogleMapService
+from src.services.search.searxng_svc import SearXNGService
+from src.services.vectordb.context_assembler import get_tokenizer
+from src.services.vectordb.entity_index import get_entity_index
+from src.services.vectordb.vectordb_svc import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Owns every long-lived client the agent needs and their shutdown."""
+
+    def __init__(
+        self,
+        vad: Any,
+        openai_client: AsyncOpenAI,
+        search_service: SearXNGService,
+        google_map_service: GoogleMapService,
+        vector_store: VectorStoreService,
+        card_history: CardHistoryStore,
+    ) -> None:
+        self.vad = vad
+        self.openai_client = openai_client
+        self.search_service = search_service
+        self.google_map_service = google_map_service
+        self.vector_store = vector_store
+        self.card_history = card_history
+        self._closed = False
+
+    @classmethod
+    def build(cls) -> "ServiceRegistry":
+        """Create every service once. Called from the worker's prewarm()."""
+        vector_store = VectorStoreService()
+        vector_store.prewarm()
+        vector_store.watch_snapshots(settings.KB_SNAPSHOT_POLL_SEC)
+        # Load the BPE ranks now rather than on the first KB search
+        get_tokenizer(settings.KB_CONTEXT_TOKENIZER)
+        get_entity_index(settings.ENTITY_DATA_PATH, settings.KB_ENTITY_MIN_CONFIDENCE)
+
+        registry = cls(
+            vad=silero.VAD.load(),
+            openai_client=AsyncOpenAI(api_key=settings.OPENAI_API_KEY),
+            search_service=SearXNGService(),
+            google_map_service=GoogleMapService(),
+            vector_store=vector_store,
+            card_history=get_card_history(),
+        )
+        logger.info("Service registry ready")
+        return registry
+
+    async def aclose(self) -> None:
+        """Close network clients. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self.vector_store.stop_watching()
+
+        for name, close in (
+            ("search_service", self.search_service.close),
+            ("google_map_service", self.google_map_service.close),
+            ("openai_client", self.openai_client.close),
+        ):
+            try:
+                await close()
+            except Exception as e:
+                logger.warning(f"Failed to close {name}: {e}")
+        logger.info(
+            f"Service registry closed | KB embedding cache: {self.vector_store.cache_stats()} "
+            f"| image search cache: {self.search_service.image_cache.stats()}"
+        )
@@ -13,12 +13,13 @@ from livekit.agents import (
     AudioConfig,
     room_io,
 )
-from livekit.plugins import sarvam, silero, openai
+from livekit.plugins import sarvam, openai
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 from src.core.config import settings
 from src.core.logger import setup_logging
 from src.agents.indusnet.agent import IndusNetAgent
+from src.agents.registry import ServiceRegistry
 from src.agents.indusnet.helpers.filler import generate_filler
 from src.agents.indusnet.helpers.silence import (
     AgentIdleShutdownController,
@@ -30,8 +31,8 @@ logger = logging.getLogger(__name__)
 
 
 def prewarm(proc):
-    """Load Silero VAD once per worker process and reuse across jobs."""
-    proc.userdata["vad"] = silero.VAD.load()
+    """Build the process-wide service registry (VAD, clients, KB index)."""
+    proc.userdata["services"] = ServiceRegistry.build()
 
 
 # Sarvam STT `prompt` (saaras:v3): per Sarvam docs, a "domain-specific prompt +
@@ -50,6 +51,9 @@ STT_PROMPT = (
 
 
 async def entrypoint(ctx: JobContext):
+    services: ServiceRegistry = ctx.proc.userdata["services"]
+    ctx.add_shutdown_callback(services.aclose)
+
     session = AgentSession(
         # Speech-to-text: Sarvam saaras:v3, codemix mode for mixed-language speech
         stt=sarvam.STT(
@@ -89,7 +93,8 @@ async def entrypoint(ctx: JobContext):
             pace=1.0,
         ),
         # Silence detection + semantic end-of-utterance turn detection
-        vad=ctx.proc.userdata["vad"],
+        vad=services.vad,
+        # Needs the job context, so it can't be prewarmed with the registry
         turn_detection=MultilingualModel(),
         preemptive_generation=True,
         use_tts_aligned_transcript=True,
@@ -123,7 +128,9 @@ async def entrypoint(ctx: JobContext):
         thinking_sound=AudioConfig(typing_path, volume=0.5),
     )
 
-    agent_instance = IndusNetAgent(room=ctx.room)
+    agent_instance = IndusNetAgent(room=ctx.room, services=services)
+    # For jobs shut down before the keep-alive loop below returns; a second flush is a no-op
+    ctx.add_shutdown_callback(agent_instance.ui_agent_functions.flush_history)
 
     # Recent completed turns — passed to filler LLM for emotional context
     _context_turns: deque = deque(maxlen=4)
@@ -139,6 +146,10 @@ async def entrypoint(ctx: JobContext):
 
     await session.start(agent=agent_instance, room=ctx.room, room_options=room_options)
 
+    # Load approved FAQ answers while the greeting plays
+    if agent_instance.faq_cache is not None and agent_instance.faq_cache.stale:
+        agent_instance.faq_cache.refresh_in_background(services.vector_store)
+
     silence_watchdog = SilenceWatchdogController(session=session, logger=logger)
     agent_idle_shutdown = AgentIdleShutdownController(session=session, logger=logger)
     user_is_speaking = False
@@ -155,6 +166,14 @@ async def entrypoint(ctx: JobContext):
         if ev.new_state == "listening":
             silence_watchdog.on_agent_finished_speaking()
 
+    @session.on("user_input_transcribed")
+    def on_user_input_transcribed(ev):
+        """Start speculative KB retrieval while the user is still talking."""
+        if agent_instance.kb_prefetch is not None:
+            agent_instance.kb_prefetch.on_transcript(ev.transcript, ev.is_final)
+        if ev.is_final:
+            agent_instance.warm_faq_lookup(ev.transcript)
+
     @session.on("conversation_item_added")
     def on_conversation_item_added(ev):
         """Store turn context and update silence tracking."""
@@ -176,7 +195,7 @@ async def entrypoint(ctx: JobContext):
         """Fire fillers while the user speaks: first at 2-3s, then every 5-8s."""
         await asyncio.sleep(random.uniform(2.0, 3.0))
         while True:
-            text = await generate_filler(list(_context_turns))
+            text = await generate_filler(list(_context_turns), client=services.openai_client)
             if text:
                 logger.debug(f"[filler] saying: {text!r}")
                 await session.say(text, allow_interruptions=True)
@@ -249,6 +268,12 @@ async def entrypoint(ctx: JobContext):
 
     agent_idle_shutdown.stop()
     silence_watchdog.stop()
+    if agent_instance.kb_prefetch is not None:
+        agent_instance.kb_prefetch.stop()
+    if agent_instance.card_speculation is not None:
+        agent_instance.card_speculation.stop()
+    # Write the session's card history now the call is over
+    await agent_instance.ui_agent_functions.flush_history()
 
 
 if __name__ == "__main__":
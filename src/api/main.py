@@ -3,7 +3,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from src.api.routes import token, health, auth
+from src.api.routes import token, health, auth, faq
 from src.core.database import init_db
 from src.core.logger import setup_logging
 
@@ -29,6 +29,7 @@ app.add_middleware(
 app.include_router(token.router, prefix="/api")
 app.include_router(health.router)
 app.include_router(auth.router)
+app.include_router(faq.router)
 
 # Serve built MkDocs static site at /documentation (run `mkdocs build` first)
 _DOCS_SITE = os.path.join(os.path.dirname(__file__), "..", "..", "site")
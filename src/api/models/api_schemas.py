@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 
 
 class LoginRequest(BaseModel):
@@ -24,3 +25,44 @@ class TokenResponse(BaseModel):
 
 class LogoutResponse(BaseModel):
     success: bool
+
+
+class FAQCreateRequest(BaseModel):
+    question: str
+    variants: list[str] = []
+    answer_text: str
+    cards: list[dict] = []
+    expires_at: datetime | None = None
+
+
+class FAQUpdateRequest(BaseModel):
+    """Partial update: omitted fields are kept. Only expires_at may be set to null."""
+
+    question: str | None = None
+    variants: list[str] | None = None
+    answer_text: str | None = None
+    cards: list[dict] | None = None
+    expires_at: datetime | None = None
+
+    @field_validator("question", "variants", "answer_text", "cards")
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class FAQResponse(BaseModel):
+    id: str
+    question: str
+    variants: list[str]
+    answer_text: str
+    cards: list[dict]
+    status: Literal["draft", "approved"]
+    expires_at: datetime | None
+    created_by: str | None
+    reviewed_by: str | None
+    created_at: datetime
+    updated_at: datetime
+    hits: int
+    last_hit_at: datetime | None
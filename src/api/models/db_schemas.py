@@ -9,3 +9,20 @@ class User(BaseModel):
     google_id: str | None = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     first_login_at: datetime | None = None
+
+
+class FAQEntry(BaseModel):
+    """Approved answer served by the FAQ answer cache (collection: faq_answers)."""
+
+    question: str
+    variants: list[str] = Field(default_factory=list)
+    answer_text: str
+    cards: list[dict] = Field(default_factory=list)
+    status: str = "draft"
+    expires_at: datetime | None = None
+    created_by: str | None = None
+    reviewed_by: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    hits: int = 0
+    last_hit_at: datetime | None = None
@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime, timezone
+from typing import Annotated, Literal
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pymongo import ReturnDocument
+
+from src.api.models.api_schemas import FAQCreateRequest, FAQResponse, FAQUpdateRequest
+from src.api.models.db_schemas import FAQEntry
+from src.auth.dependencies import require_admin
+from src.core.database import get_database
+from src.services.faq.answer_cache import (
+    FAQ_COLLECTION,
+    FAQ_STATUS_APPROVED,
+    FAQ_STATUS_DRAFT,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin/faq", tags=["faq"])
+
+# Card types the frontend renders on the ui.flashcard topic
+_CARD_TYPES = {"flashcard", "infographic"}
+
+# Editing any of these sends the entry back to review
+_REVIEWED_FIELDS = ("question", "variants", "answer_text", "cards")
+
+
+def _object_id(faq_id: str) -> ObjectId:
+    try:
+        return ObjectId(faq_id)
+    except InvalidId as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="FAQ entry not found") from exc
+
+
+def _check_cards(cards: list[dict] | None) -> None:
+    for card in cards or []:
+        if card.get("type") not in _CARD_TYPES or not card.get("title"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Each card needs a title and a type of 'flashcard' or 'infographic'",
+            )
+
+
+def _to_response(doc: dict) -> FAQResponse:
+    return FAQResponse(id=str(doc.pop("_id")), **doc)
+
+
+async def _update(faq_id: str, changes: dict) -> FAQResponse:
+    changes["updated_at"] = datetime.now(timezone.utc)
+    doc = await get_database()[FAQ_COLLECTION].find_one_and_update(
+        {"_id": _object_id(faq_id)}, {"$set": changes}, return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="FAQ entry not found")
+    return _to_response(doc)
+
+
+@router.get("", response_model=list[FAQResponse])
+async def list_faq_entries(
+    _: Annotated[dict, Depends(require_admin)],
+    entry_status: Annotated[Literal["draft", "approved"] | None, Query(alias="status")] = None,
+    include_expired: bool = False,
+) -> list[FAQResponse]:
+    """Entries for review, most served first."""
+    query: dict = {}
+    if entry_status:
+        query["status"] = entry_status
+    if not include_expired:
+        query["$or"] = [{"expires_at": None}, {"expires_at": {"$gt": datetime.now(timezone.utc)}}]
+    docs = await get_database()[FAQ_COLLECTION].find(query).sort("hits", -1).to_list(length=None)
+    return [_to_response(doc) for doc in docs]
+
+
+@router.post("", response_model=FAQResponse, status_code=status.HTTP_201_CREATED)
+async def create_faq_entry(
+    body: FAQCreateRequest, admin: Annotated[dict, Depends(require_admin)]
+) -> FAQResponse:
+    """Add a draft entry; it is not served until approved."""
+    _check_cards(body.cards)
+    entry = FAQEntry(**body.model_dump(), status=FAQ_STATUS_DRAFT, created_by=admin.get("sub"))
+    doc = entry.model_dump()
+    result = await get_database()[FAQ_COLLECTION].insert_one(doc)
+    doc["_id"] = result.inserted_id
+    logger.info("FAQ entry created | id=%s by=%s", result.inserted_id, admin.get("sub"))
+    return _to_response(doc)
+
+
+@router.patch("/{faq_id}", response_model=FAQResponse)
+async def update_faq_entry(
+    faq_id: str, body: FAQUpdateRequest, _: Annotated[dict, Depends(require_admin)]
+) -> FAQResponse:
+    changes = body.model_dump(exclude_unset=True)
+    _check_cards(changes.get("cards"))
+    if any(field in changes for field in _REVIEWED_FIELDS):
+        changes["status"] = FAQ_STATUS_DRAFT
+        changes["reviewed_by"] = None
+    return await _update(faq_id, changes)
+
+
+@router.post("/{faq_id}/approve", response_model=FAQResponse)
+async def approve_faq_entry(
+    faq_id: str, admin: Annotated[dict, Depends(require_admin)]
+) -> FAQResponse:
+    """Start serving the entry; workers pick it up on their next refresh."""
+    logger.info("FAQ entry approved | id=%s by=%s", faq_id, admin.get("sub"))
+    return await _update(faq_id, {"status": FAQ_STATUS_APPROVED, "reviewed_by": admin.get("sub")})
+
+
+@router.post("/{faq_id}/expire", response_model=FAQResponse)
+async def expire_faq_entry(
+    faq_id: str, admin: Annotated[dict, Depends(require_admin)]
+) -> FAQResponse:
+    """Stop serving the entry now, keeping it for reference."""
+    logger.info("FAQ entry expired | id=%s by=%s", faq_id, admin.get("sub"))
+    return await _update(faq_id, {"expires_at": datetime.now(timezone.utc)})
+
+
+@router.delete("/{faq_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_faq_entry(faq_id: str, admin: Annotated[dict, Depends(require_admin)]) -> None:
+    result = await get_database()[FAQ_COLLECTION].delete_one({"_id": _object_id(faq_id)})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="FAQ entry not found")
+    logger.info("FAQ entry deleted | id=%s by=%s", faq_id, admin.get("sub"))
@@ -0,0 +1,187 @@
+"""
+Small process-local caches shared by the services layer.
+
+TTLCache is an in-memory LRU with per-entry expiry; SQLiteCache is an optional
+disk tier (BLOB values) that survives restarts and can be shared by every
+worker process on the host. Both are thread-safe because callers reach them
+from the event loop and from asyncio.to_thread workers alike.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCache:
+    """Disk-backed key/BLOB cache with TTL and LRU trimming.
+
+    WAL mode lets several worker processes read and write the same file; a
+    short busy timeout means a locked database degrades to a cache miss
+    instead of blocking the caller. Hits are read-only (WAL readers never wait
+    on writers): their last_access times are kept in memory and written with
+    the next set(), so a lookup on the event loop never takes the write lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 50_000,
+        ttl: float = 7 * 24 * 3600.0,
+        table: str = "cache",
+    ) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+        # key → last hit time, not yet written to last_access
+        self._touched: dict[str, float] = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=0.05, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_last_access "
+                f"ON {table}(last_access)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                # Expired rows are left for the next trim
+                if row is None or row[1] < now:
+                    return None
+                self._touched[key] = now
+                return row[0]
+        except sqlite3.Error:
+            return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    "(key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+                self._touched.pop(key, None)
+                self._flush_touched_locked()
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 100:
+                    self._trim_locked(now)
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _flush_touched_locked(self) -> None:
+        """Write the buffered hit times; part of the caller's transaction."""
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self._conn.executemany(
+            f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+            [(at, key) for key, at in touched.items()],
+        )
+
+    def _trim_locked(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows over the cap."""
+        self._writes_since_trim = 0
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY last_access DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush_touched_locked()
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
@@ -17,6 +17,28 @@ class Settings:
     # newer mini, e.g. FLASHCARD_MODEL=gpt-5.1-mini. NOTE: if the chosen model
     # rejects custom temperature or json_object mode, revert to gpt-4o-mini.
     FLASHCARD_MODEL = os.getenv("FLASHCARD_MODEL", "gpt-4o-mini")
+    # Flashcard images: cards are published without waiting for image search;
+    # at most UI_CARD_MEDIA_CONCURRENCY lookups run per stream and each card is
+    # patched with a card_media_update packet if its lookup finishes within
+    # UI_CARD_MEDIA_DEADLINE_SEC of the card being published.
+    UI_CARD_MEDIA_CONCURRENCY = int(os.getenv("UI_CARD_MEDIA_CONCURRENCY", "3"))
+    UI_CARD_MEDIA_DEADLINE_SEC = float(os.getenv("UI_CARD_MEDIA_DEADLINE_SEC", "6.0"))
+    # Speculative cards: generation starts from the user's question and KB
+    # results as soon as a KB search returns; publish_ui_stream reuses the deck
+    # if it is called with the same KB results within UI_CARD_SPECULATION_TTL_SEC.
+    # Costs card-model tokens on turns that end up showing another visual.
+    UI_CARD_SPECULATION_ENABLED = os.getenv("UI_CARD_SPECULATION_ENABLED", "true").lower() == "true"
+    UI_CARD_SPECULATION_TTL_SEC = float(os.getenv("UI_CARD_SPECULATION_TTL_SEC", "30"))
+    # Progressive cards: each deck card is sent as card_begin (id/type/title/
+    # icon) → card_patch per section block → card_commit. Needs a frontend that
+    # understands these packets; off sends each card once, complete.
+    UI_CARD_PROGRESSIVE_ENABLED = os.getenv("UI_CARD_PROGRESSIVE_ENABLED", "false").lower() == "true"
+    # Card stream deadlines: if no card is on screen UI_CARD_TTFC_BUDGET_SEC
+    # after publish_ui_stream, the spoken-response fallback card is shown at
+    # once (the first real card replaces it); generation is stopped after
+    # UI_CARD_TOTAL_BUDGET_SEC. TTFC/TTLC are logged and sent in end_of_stream.
+    UI_CARD_TTFC_BUDGET_SEC = float(os.getenv("UI_CARD_TTFC_BUDGET_SEC", "3.0"))
+    UI_CARD_TOTAL_BUDGET_SEC = float(os.getenv("UI_CARD_TOTAL_BUDGET_SEC", "15.0"))
 
     # SARVAM
     SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
@@ -30,6 +52,104 @@ class Settings:
     )
     ASSETS_DIR = os.path.join(BASE_DIR, "assets")
     AUDIO_DIR = os.path.join(ASSETS_DIR, "audio")
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+    # Embedding backends: "openai" (text-embedding-3-small) or "local"
+    # (all-MiniLM-L6-v2 on ONNX Runtime, CPU, no network once downloaded).
+    # Each backend reads its own collection; migrate with scripts/reembed_stores.py.
+    KB_EMBEDDING_BACKEND = os.getenv("KB_EMBEDDING_BACKEND", "openai").lower()
+    # MEM0_EMBEDDING_BACKEND is the name this had before card history replaced Mem0
+    CARD_HISTORY_EMBEDDING_BACKEND = os.getenv(
+        "CARD_HISTORY_EMBEDDING_BACKEND", os.getenv("MEM0_EMBEDDING_BACKEND", KB_EMBEDDING_BACKEND)
+    ).lower()
+    LOCAL_EMBEDDING_MODEL_DIR = os.getenv(
+        "LOCAL_EMBEDDING_MODEL_DIR", os.path.join(CACHE_DIR, "models", "all-MiniLM-L6-v2")
+    )
+    LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "1"))
+
+    # Knowledge base (vector store)
+    # Search backend: "numpy" (exact in-process index, loaded at prewarm),
+    # "mmap" (quantized export mapped read-only and shared by all job processes;
+    # build it with scripts/export_kb_index.py) or "chroma" (LangChain Chroma
+    # search). numpy/mmap fall back to chroma on failure.
+    KB_SEARCH_BACKEND = os.getenv("KB_SEARCH_BACKEND", "numpy").lower()
+    KB_MMAP_DIR = os.getenv("KB_MMAP_DIR", "")  # default: <KB directory>/quantized
+    KB_MMAP_RESCORE = os.getenv("KB_MMAP_RESCORE", "true").lower() == "true"
+    # Hybrid retrieval: fuse vector results with an in-memory BM25 index by
+    # reciprocal rank fusion. A weight of 0 drops that ranking from the fusion.
+    KB_HYBRID_ENABLED = os.getenv("KB_HYBRID_ENABLED", "true").lower() == "true"
+    KB_HYBRID_VECTOR_WEIGHT = float(os.getenv("KB_HYBRID_VECTOR_WEIGHT", "1.0"))
+    KB_HYBRID_BM25_WEIGHT = float(os.getenv("KB_HYBRID_BM25_WEIGHT", "0.8"))
+    KB_HYBRID_RRF_K = int(os.getenv("KB_HYBRID_RRF_K", "60"))
+    KB_HYBRID_FETCH_MULTIPLIER = int(os.getenv("KB_HYBRID_FETCH_MULTIPLIER", "3"))
+    # Versioned KB snapshots (scripts/publish_kb_snapshot.py): workers serve
+    # <KB_SNAPSHOT_DIR>/CURRENT, poll it every KB_SNAPSHOT_POLL_SEC and swap to
+    # a newly published snapshot without a restart. Until the first publish
+    # they serve chroma_db. Set KB_SNAPSHOT_DIR="" to always serve chroma_db.
+    # The same poll notices a chroma_db rebuilt in place (new kb_version).
+    KB_SNAPSHOT_DIR = os.getenv(
+        "KB_SNAPSHOT_DIR", os.path.join(BASE_DIR, "src", "services", "vectordb", "kb_snapshots")
+    )
+    KB_SNAPSHOT_POLL_SEC = float(os.getenv("KB_SNAPSHOT_POLL_SEC", "30"))
+    KB_SNAPSHOT_KEEP = int(os.getenv("KB_SNAPSHOT_KEEP", "3"))
+    # Query-embedding cache: in-memory LRU+TTL, plus an optional SQLite tier
+    # shared by all worker processes. Set KB_EMBED_CACHE_PATH="" to disable disk.
+    KB_EMBED_CACHE_SIZE = int(os.getenv("KB_EMBED_CACHE_SIZE", "2048"))
+    KB_EMBED_CACHE_TTL = float(os.getenv("KB_EMBED_CACHE_TTL", "86400"))
+    KB_EMBED_CACHE_PATH = os.getenv(
+        "KB_EMBED_CACHE_PATH", os.path.join(CACHE_DIR, "kb_embeddings.sqlite3")
+    )
+    # Semantic result cache: reuse formatted KB results for paraphrased queries
+    # whose embeddings are within this cosine distance of a cached query.
+    KB_RESULT_CACHE_SIZE = int(os.getenv("KB_RESULT_CACHE_SIZE", "256"))
+    KB_RESULT_CACHE_TTL = float(os.getenv("KB_RESULT_CACHE_TTL", "3600"))
+    KB_RESULT_CACHE_MAX_DISTANCE = float(os.getenv("KB_RESULT_CACHE_MAX_DISTANCE", "0.08"))
+    # Context assembly: fetch KB_CONTEXT_FETCH_SIZE candidates, drop
+    # near-duplicates, order by MMR (lambda 1.0 = relevance only) and keep
+    # chunks until KB_CONTEXT_TOKEN_BUDGET tokens. The same text feeds the main
+    # turn and the UI card prompt, so the budget is paid twice.
+    KB_CONTEXT_FETCH_SIZE = int(os.getenv("KB_CONTEXT_FETCH_SIZE", "10"))
+    KB_CONTEXT_TOKEN_BUDGET = int(os.getenv("KB_CONTEXT_TOKEN_BUDGET", "1500"))
+    KB_CONTEXT_MMR_LAMBDA = float(os.getenv("KB_CONTEXT_MMR_LAMBDA", "0.7"))
+    KB_CONTEXT_DEDUP_THRESHOLD = float(os.getenv("KB_CONTEXT_DEDUP_THRESHOLD", "0.8"))
+    KB_CONTEXT_TOKENIZER = os.getenv("KB_CONTEXT_TOKENIZER", "o200k_base")
+    # Speculative KB prefetch from interim STT transcripts (see helpers/prefetch.py)
+    KB_PREFETCH_ENABLED = os.getenv("KB_PREFETCH_ENABLED", "true").lower() == "true"
+    KB_PREFETCH_DEBOUNCE_SEC = float(os.getenv("KB_PREFETCH_DEBOUNCE_SEC", "0.3"))
+    KB_PREFETCH_MATCH_THRESHOLD = float(os.getenv("KB_PREFETCH_MATCH_THRESHOLD", "0.6"))
+    # Typed entity store (offices, leadership, products, media) answered ahead
+    # of vector search when an alias matches and the query's other terms are
+    # at least KB_ENTITY_MIN_CONFIDENCE explained by it (see entity_index.py)
+    ENTITY_DATA_PATH = os.getenv("ENTITY_DATA_PATH", os.path.join(ASSETS_DIR, "data", "entities.json"))
+    KB_ENTITY_FAST_PATH_ENABLED = os.getenv("KB_ENTITY_FAST_PATH_ENABLED", "true").lower() == "true"
+    KB_ENTITY_MIN_CONFIDENCE = float(os.getenv("KB_ENTITY_MIN_CONFIDENCE", "0.8"))
+    # FAQ answer cache: approved spoken answers + cards served without the LLM
+    # when a user turn is at least FAQ_CACHE_MIN_SIMILARITY (cosine) to a
+    # canonical question. The lookup is abandoned after FAQ_CACHE_LOOKUP_TIMEOUT
+    # seconds so a slow embedding never delays the normal reply.
+    FAQ_CACHE_ENABLED = os.getenv("FAQ_CACHE_ENABLED", "true").lower() == "true"
+    FAQ_CACHE_MIN_SIMILARITY = float(os.getenv("FAQ_CACHE_MIN_SIMILARITY", "0.93"))
+    FAQ_CACHE_REFRESH_SEC = float(os.getenv("FAQ_CACHE_REFRESH_SEC", "60"))
+    FAQ_CACHE_LOOKUP_TIMEOUT = float(os.getenv("FAQ_CACHE_LOOKUP_TIMEOUT", "0.3"))
+    FAQ_CACHE_MIN_WORDS = int(os.getenv("FAQ_CACHE_MIN_WORDS", "3"))
+    # Card batch cache: a deck generated for the same normalized question and
+    # KB context is replayed without a model call, from memory or a SQLite
+    # file shared by all worker processes. UI_CARD_CACHE_ENABLED=false bypasses it.
+    UI_CARD_CACHE_ENABLED = os.getenv("UI_CARD_CACHE_ENABLED", "true").lower() == "true"
+    UI_CARD_CACHE_SIZE = int(os.getenv("UI_CARD_CACHE_SIZE", "256"))
+    UI_CARD_CACHE_DISK_SIZE = int(os.getenv("UI_CARD_CACHE_DISK_SIZE", "5000"))
+    UI_CARD_CACHE_TTL = float(os.getenv("UI_CARD_CACHE_TTL", "21600"))
+    UI_CARD_CACHE_PATH = os.getenv("UI_CARD_CACHE_PATH", os.path.join(CACHE_DIR, "ui_cards.sqlite3"))
+    # Card history: every deck shown to a signed-in user, one SQLite row with
+    # an embedding of the question and card titles, for cross-session recall
+    # (see card_history.py). Oldest rows beyond CARD_HISTORY_MAX_PER_USER are dropped.
+    CARD_HISTORY_PATH = os.getenv(
+        "CARD_HISTORY_PATH", os.path.join(BASE_DIR, "src", "services", "vectordb", "card_history.sqlite3")
+    )
+    CARD_HISTORY_MAX_PER_USER = int(os.getenv("CARD_HISTORY_MAX_PER_USER", "200"))
+    # Decks are buffered per session and written in one batch when it ends;
+    # beyond this many the oldest buffered deck is dropped
+    CARD_HISTORY_BUFFER_SIZE = int(os.getenv("CARD_HISTORY_BUFFER_SIZE", "50"))
 
     # Email config
     SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -44,6 +164,15 @@ class Settings:
 
     # SearXNG config
     SEARXNG_BASE_URL = os.getenv("SEARXNG_BASE_URL", "http://13.126.71.22:4000/")
+    # Flashcard image-search cache: SearXNG image results per normalized query,
+    # in memory and in a SQLite file shared by all worker processes.
+    # Warm it with scripts/warm_image_cache.py. Set IMAGE_SEARCH_CACHE_PATH=""
+    # for memory only.
+    IMAGE_SEARCH_CACHE_SIZE = int(os.getenv("IMAGE_SEARCH_CACHE_SIZE", "1024"))
+    IMAGE_SEARCH_CACHE_TTL = float(os.getenv("IMAGE_SEARCH_CACHE_TTL", "604800"))
+    IMAGE_SEARCH_CACHE_PATH = os.getenv(
+        "IMAGE_SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "image_search.sqlite3")
+    )
 
     # MongoDB
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
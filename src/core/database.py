@@ -18,6 +18,7 @@ def get_database() -> AsyncIOMotorDatabase:
 async def init_db() -> None:
     db = get_database()
     await db["users"].create_index("email", unique=True)
+    await db["faq_answers"].create_index("status")
 
 
 async def close_db() -> None:
@@ -0,0 +1,194 @@
+"""
+Semantic FAQ answer cache: approved answers that bypass the LLM.
+
+A handful of questions dominate traffic. Admins store an approved spoken
+answer plus the card payloads for each canonical question (and paraphrase
+variants) in the ``faq_answers`` Mongo collection; see src/api/routes/faq.py
+and scripts/faq_cache.py. Each worker loads the approved, unexpired entries
+into an embedding matrix and serves a user turn straight from it when its
+cosine similarity to a canonical question clears a strict threshold.
+
+Entries are reloaded every ``refresh_interval`` seconds, so review and expiry
+done through the admin API reach running workers without a restart.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+
+from src.core.config import settings
+from src.core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+FAQ_COLLECTION = "faq_answers"
+
+FAQ_STATUS_DRAFT = "draft"
+FAQ_STATUS_APPROVED = "approved"
+
+
+@dataclass
+class CachedAnswer:
+    id: str
+    question: str
+    answer_text: str
+    cards: list[dict] = field(default_factory=list)
+    expires_at: Optional[dt.datetime] = None
+
+    def expired(self, now: dt.datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+
+@dataclass
+class FAQMatch:
+    answer: CachedAnswer
+    similarity: float
+    matched_question: str
+
+
+def _utc(value: Optional[dt.datetime]) -> Optional[dt.datetime]:
+    # Mongo hands back naive datetimes that are UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=dt.timezone.utc)
+    return value
+
+
+def active_filter(now: dt.datetime) -> dict:
+    """Mongo filter for entries that may be served."""
+    return {
+        "status": FAQ_STATUS_APPROVED,
+        "$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}],
+    }
+
+
+class FAQAnswerCache:
+    """Approved FAQ answers matched by embedding similarity to their questions."""
+
+    def __init__(
+        self,
+        min_similarity: float = 0.93,
+        refresh_interval: float = 60.0,
+    ) -> None:
+        self.min_similarity = min_similarity
+        self.refresh_interval = refresh_interval
+        self._answers: list[CachedAnswer] = []
+        # One row per canonical question or variant; _row_answer[i] indexes _answers
+        self._matrix: Optional[np.ndarray] = None
+        self._row_answer: list[int] = []
+        self._row_text: list[str] = []
+        self._loaded_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    async def refresh(self, vector_store) -> None:
+        """Reload approved entries and embed their questions (one batched call)."""
+        async with self._refresh_lock:
+            now = dt.datetime.now(dt.timezone.utc)
+            docs = await get_database()[FAQ_COLLECTION].find(active_filter(now)).to_list(length=None)
+
+            answers, texts, row_answer = [], [], []
+            for doc in docs:
+                answers.append(
+                    CachedAnswer(
+                        id=str(doc["_id"]),
+                        question=doc["question"],
+                        answer_text=doc["answer_text"],
+                        cards=doc.get("cards") or [],
+                        expires_at=_utc(doc.get("expires_at")),
+                    )
+                )
+                for text in [doc["question"], *(doc.get("variants") or [])]:
+                    if text and text.strip():
+                        texts.append(text.strip())
+                        row_answer.append(len(answers) - 1)
+
+            matrix = None
+            if texts:
+                matrix = np.asarray(await vector_store.embed_queries(texts), dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+            self._answers, self._matrix = answers, matrix
+            self._row_answer, self._row_text = row_answer, texts
+            self._loaded_at = time.monotonic()
+            logger.info(f"FAQ answer cache loaded: {len(answers)} answers, {len(texts)} questions")
+
+    def refresh_in_background(self, vector_store) -> None:
+        """Start a refresh unless one is already running; failures keep the old entries."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def _run() -> None:
+            try:
+                await self.refresh(vector_store)
+            except Exception as e:
+                logger.warning(f"FAQ answer cache refresh failed: {e}")
+                # Don't retry on every turn while Mongo is down
+                self._loaded_at = time.monotonic()
+
+        self._refresh_task = asyncio.create_task(_run())
+
+    async def match(self, text: str, vector_store) -> Optional[FAQMatch]:
+        """Best approved answer for `text`, or None below min_similarity."""
+        if self.stale:
+            self.refresh_in_background(vector_store)
+        if self._matrix is None or not text.strip():
+            return None
+
+        query = np.asarray(await vector_store.embed_query(text.strip()), dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm:
+            query = query / norm
+        similarities = self._matrix @ query
+        row = int(np.argmax(similarities))
+        similarity = float(similarities[row])
+
+        answer = self._answers[self._row_answer[row]]
+        if similarity < self.min_similarity or answer.expired(dt.datetime.now(dt.timezone.utc)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return FAQMatch(answer=answer, similarity=similarity, matched_question=self._row_text[row])
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._answers), "hits": self.hits, "misses": self.misses}
+
+
+async def record_hit(answer_id: str) -> None:
+    """Bump the hit counter shown in the admin review list."""
+    try:
+        await get_database()[FAQ_COLLECTION].update_one(
+            {"_id": ObjectId(answer_id)},
+            {"$inc": {"hits": 1}, "$set": {"last_hit_at": dt.datetime.now(dt.timezone.utc)}},
+        )
+    except Exception as e:
+        logger.warning(f"FAQ hit not recorded for {answer_id}: {e}")
+
+
+_faq_cache: Optional[FAQAnswerCache] = None
+
+
+def get_faq_cache() -> FAQAnswerCache:
+    """Return the singleton FAQAnswerCache for this process."""
+    global _faq_cache
+    if _faq_cache is None:
+        _faq_cache = FAQAnswerCache(
+            min_similarity=settings.FAQ_CACHE_MIN_SIMILARITY,
+            refresh_interval=settings.FAQ_CACHE_REFRESH_SEC,
+        )
+    return _faq_cache
@@ -0,0 +1,100 @@
+"""
+Cache of generated UI card batches.
+
+When two callers ask the same question and the KB returns the same context,
+the card model would produce the same deck again. Finished batches (with
+their resolved images) are stored under the normalized question plus a hash
+of the retrieved context and the card model, in memory and in a SQLite file
+shared by every worker process. query_process_stream replays a hit as its
+stream, so _publish_ui_stream publishes it under a fresh stream_id.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from src.core.cache import SQLiteCache, TTLCache
+from src.core.config import settings
+from src.services.vectordb.embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Per-publish fields that must not be replayed
+_TRANSIENT_FIELDS = frozenset({"stream_id", "card_index", "media_pending", "recalled", "fallback"})
+
+
+def card_cache_key(user_input: str, db_results: str, model: str) -> str:
+    context_hash = hashlib.sha256((db_results or "").encode("utf-8")).hexdigest()
+    payload = f"{model}\n{normalize_query(user_input)}\n{context_hash}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CardBatchCache:
+    """Two-tier cache of normalized card batches, stored as JSON."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 6 * 3600.0,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 5000,
+    ) -> None:
+        self._memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._disk: Optional[SQLiteCache] = None
+        if disk_path:
+            try:
+                self._disk = SQLiteCache(
+                    disk_path, max_entries=disk_max_entries, ttl=ttl, table="card_batches"
+                )
+            except Exception as e:
+                logger.warning("Card cache disk tier disabled (%s): %s", disk_path, e)
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[list[dict]]:
+        """A fresh copy of the cached batch, or None."""
+        blob = self._memory.get(key)
+        if blob is None and self._disk is not None:
+            blob = self._disk.get(key)
+            if blob is not None:
+                self._memory.set(key, blob)
+                self.disk_hits += 1
+        return json.loads(blob) if blob is not None else None
+
+    def set(self, key: str, cards: list[dict]) -> None:
+        if not cards:
+            return
+        cleaned = [
+            {field: value for field, value in card.items() if field not in _TRANSIENT_FIELDS}
+            for card in cards
+        ]
+        blob = json.dumps(cleaned).encode("utf-8")
+        self._memory.set(key, blob)
+        if self._disk is not None:
+            self._disk.set(key, blob)
+
+    def stats(self) -> dict[str, int]:
+        memory = self._memory.stats()
+        return {
+            "size": memory["size"],
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": memory["misses"] - self.disk_hits,
+            "evictions": memory["evictions"],
+        }
+
+
+_card_cache: Optional[CardBatchCache] = None
+
+
+def get_card_cache() -> CardBatchCache:
+    """Return the singleton CardBatchCache for this process."""
+    global _card_cache
+    if _card_cache is None:
+        _card_cache = CardBatchCache(
+            max_entries=settings.UI_CARD_CACHE_SIZE,
+            ttl=settings.UI_CARD_CACHE_TTL,
+            disk_path=settings.UI_CARD_CACHE_PATH or None,
+            disk_max_entries=settings.UI_CARD_CACHE_DISK_SIZE,
+        )
+    return _card_cache
@@ -0,0 +1,318 @@
+"""
+Per-user history of the flashcard decks shown, for recall in later sessions.
+
+Replaces the Mem0 store, which ran an LLM extraction and an embedding call on
+every save only to keep the deck as a JSON blob in metadata. Each deck is now
+one SQLite row: user, question, cards JSON and an embedding of the question
+plus card titles. Saving costs one embedding; recall is an indexed lookup of
+the user's rows and a cosine scan over them. The file is shared by every
+worker process on the host. scripts/migrate_card_history.py imports the old
+chroma_db_mem0 data.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+from src.services.vectordb.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.services.vectordb.embeddings import build_embeddings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CardHistoryEntry:
+    id: int
+    user_id: str
+    query: str
+    cards: list[dict]
+    created_at: float
+    similarity: float = 0.0
+
+
+def embedding_text(query: str, cards: list[dict]) -> str:
+    """What a deck is recalled by: the question and its card titles."""
+    titles = [card.get("title", "") for card in cards if card.get("title")]
+    return "\n".join([query, *titles]).strip()
+
+
+def _model_name(embeddings: Embeddings) -> str:
+    return getattr(embeddings, "model", type(embeddings).__name__)
+
+
+class CardHistoryStore:
+    """SQLite table of shown decks with a float32 embedding per row."""
+
+    def __init__(
+        self,
+        path: str,
+        embeddings: Embeddings,
+        max_per_user: int = 200,
+        embedding_cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self.path = path
+        self.embeddings = embeddings
+        self.model = _model_name(embeddings)
+        self.max_per_user = max(1, max_per_user)
+        self.embedding_cache = embedding_cache
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=2.0, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS card_history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, "
+                "query TEXT NOT NULL, cards TEXT NOT NULL, "
+                "model TEXT NOT NULL, embedding BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS card_history_user "
+                "ON card_history(user_id, model, created_at)"
+            )
+            self._conn.commit()
+
+    async def _embed(self, text: str) -> list[float]:
+        if self.embedding_cache is not None:
+            vector = self.embedding_cache.get(self.model, text)
+            if vector is not None:
+                return vector
+        vector = await self.embeddings.aembed_query(text)
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(self.model, text, vector)
+        return vector
+
+    # ── Writes ─────────────────────────────────────────────────────────────
+
+    async def save(self, user_id: str, query: str, cards: list[dict]) -> None:
+        """Store one deck for a user."""
+        vector = await self._embed(embedding_text(query, cards))
+        await asyncio.to_thread(
+            self.insert_many, [(user_id, query, cards, vector, time.time())]
+        )
+
+    async def save_many(
+        self, decks: list[tuple[str, str, list[dict], float]], batch_size: int = 64
+    ) -> int:
+        """Store (user_id, query, cards, created_at) decks with one embedding call per batch.
+
+        All or nothing: every batch is embedded before the rows are inserted
+        in one transaction, so a failure leaves no deck half-saved.
+        """
+        vectors: list[list[float]] = []
+        for start in range(0, len(decks), batch_size):
+            batch = decks[start : start + batch_size]
+            vectors.extend(
+                await self.embeddings.aembed_documents(
+                    [embedding_text(query, cards) for _, query, cards, _ in batch]
+                )
+            )
+        return await asyncio.to_thread(
+            self.insert_many,
+            [
+                (user_id, query, cards, vector, created_at)
+                for (user_id, query, cards, created_at), vector in zip(decks, vectors)
+            ],
+        )
+
+    def insert_many(
+        self, rows: Iterable[tuple[str, str, list[dict], list[float], float]]
+    ) -> int:
+        """Insert (user_id, query, cards, embedding, created_at) rows; trims each user to the cap."""
+        records = [
+            (user_id, query, json.dumps(cards), self.model,
+             np.asarray(vector, dtype=np.float32).tobytes(), created_at)
+            for user_id, query, cards, vector, created_at in rows
+        ]
+        if not records:
+            return 0
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT INTO card_history (user_id, query, cards, model, embedding, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    records,
+                )
+                for user_id in {record[0] for record in records}:
+                    self._conn.execute(
+                        "DELETE FROM card_history WHERE user_id = ? AND id NOT IN ("
+                        "SELECT id FROM card_history WHERE user_id = ? "
+                        "ORDER BY created_at DESC LIMIT ?)",
+                        (user_id, user_id, self.max_per_user),
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return len(records)
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+
+    def _rows(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def recall(self, user_id: str, query: str, limit: int = 1) -> list[CardHistoryEntry]:
+        """The user's decks most similar to `query`, best first."""
+        vector = np.asarray(await self._embed(query), dtype=np.float32)
+        rows = await asyncio.to_thread(
+            self._rows,
+            "SELECT id, query, cards, embedding, created_at FROM card_history "
+            "WHERE user_id = ? AND model = ?",
+            (user_id, self.model),
+        )
+        if not rows:
+            return []
+
+        matrix = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.float32)
+        matrix = matrix.reshape(len(rows), -1)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(vector) or 1.0)
+        scores = (matrix @ vector) / np.where(norms == 0, 1.0, norms)
+        best = np.argsort(-scores)[:limit]
+        return [
+            CardHistoryEntry(
+                id=rows[i][0],
+                user_id=user_id,
+                query=rows[i][1],
+                cards=json.loads(rows[i][2]),
+                created_at=rows[i][4],
+                similarity=float(scores[i]),
+            )
+            for i in best
+        ]
+
+    async def latest(self, user_id: str) -> Optional[CardHistoryEntry]:
+        """The user's most recently shown deck."""
+        rows = await asyncio.to_thread(
+            self._rows,
+            "SELECT id, query, cards, created_at FROM card_history "
+            "WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
+            (user_id,),
+        )
+        if not rows:
+            return None
+        row_id, query, cards, created_at = rows[0]
+        return CardHistoryEntry(
+            id=row_id, user_id=user_id, query=query, cards=json.loads(cards), created_at=created_at
+        )
+
+    # ── Maintenance ────────────────────────────────────────────────────────
+
+    async def reembed(self, batch_size: int = 256) -> int:
+        """Re-embed rows written with another model (after switching backends)."""
+        rows = await asyncio.to_thread(
+            self._rows,
+            "SELECT id, query, cards FROM card_history WHERE model != ?",
+            (self.model,),
+        )
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            vectors = await self.embeddings.aembed_documents(
+                [embedding_text(query, json.loads(cards)) for _, query, cards in batch]
+            )
+            updates = [
+                (self.model, np.asarray(vector, dtype=np.float32).tobytes(), row_id)
+                for (row_id, _, _), vector in zip(batch, vectors)
+            ]
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE card_history SET model = ?, embedding = ? WHERE id = ?", updates
+                )
+                self._conn.commit()
+        return len(rows)
+
+    def contains(self, user_id: str, query: str, created_at: float) -> bool:
+        return bool(
+            self._rows(
+                "SELECT 1 FROM card_history WHERE user_id = ? AND query = ? AND created_at = ? LIMIT 1",
+                (user_id, query, created_at),
+            )
+        )
+
+    def count(self) -> int:
+        return self._rows("SELECT COUNT(*) FROM card_history", ())[0][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CardHistoryBuffer:
+    """Decks shown during one session, written to the store in a single pass.
+
+    Saving as each deck finished meant one embedding call and one SQLite
+    write per stream while the call was live. The buffer holds the decks
+    instead, and flush() embeds them in one batch, normally when the session
+    ends. At most `max_pending` decks are held; past that the oldest is
+    dropped rather than letting a chatty session grow without bound.
+    """
+
+    def __init__(self, store: CardHistoryStore, max_pending: int = 50) -> None:
+        self.store = store
+        self._pending: deque[tuple[str, str, list[dict], float]] = deque(maxlen=max(1, max_pending))
+        self._flush_lock = asyncio.Lock()
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, user_id: str, query: str, cards: list[dict]) -> None:
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+            logger.warning(
+                "Card history buffer full (%d); dropping the oldest deck", self._pending.maxlen
+            )
+        self._pending.append((user_id, query, cards, time.time()))
+
+    def latest(self, user_id: str) -> Optional[CardHistoryEntry]:
+        """The newest buffered deck for a user, not yet in the store."""
+        for pending_user, query, cards, created_at in reversed(self._pending):
+            if pending_user == user_id:
+                return CardHistoryEntry(
+                    id=0, user_id=user_id, query=query, cards=cards, created_at=created_at
+                )
+        return None
+
+    async def flush(self) -> int:
+        """Write every buffered deck to the store; returns how many were written."""
+        async with self._flush_lock:
+            decks = list(self._pending)
+            if not decks:
+                return 0
+            self._pending.clear()
+            try:
+                return await self.store.save_many(decks)
+            except Exception:
+                # Keep them for the next flush, ahead of anything added meanwhile
+                self._pending = deque([*decks, *self._pending], maxlen=self._pending.maxlen)
+                raise
+
+
+_card_history: Optional[CardHistoryStore] = None
+
+
+def get_card_history() -> CardHistoryStore:
+    """Return the singleton CardHistoryStore for this process."""
+    global _card_history
+    if _card_history is None:
+        _card_history = CardHistoryStore(
+            settings.CARD_HISTORY_PATH,
+            build_embeddings(settings.CARD_HISTORY_EMBEDDING_BACKEND),
+            max_per_user=settings.CARD_HISTORY_MAX_PER_USER,
+            embedding_cache=get_embedding_cache(),
+        )
+    return _card_history
@@ -0,0 +1,211 @@
+"""
+Incremental parser for the streamed UI card response.
+
+The card model streams ``{"cards": [{...}, {...}]}`` a few characters at a
+time. CardStreamParser keeps its scanner state (nesting depth, in-string,
+escape, the open card's text) across chunks, so every character is looked at
+once and each card is returned as soon as its closing brace arrives, instead
+of rescanning a growing buffer on every token. Text between structural
+characters is skipped by a regex search rather than a Python loop.
+
+For progressive rendering, feed_events() also reports each key of the open
+card as it starts, the card's scalar `fields` as each value closes and every
+element of its `sections_key` array as soon as that element is complete,
+ahead of the card itself.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Outside strings only these characters change the scanner state
+_STRUCTURAL = re.compile(r'[{}\[\]":,]')
+# Inside a string only the closing quote and escapes matter
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# feed_events() event kinds
+EVENT_KEY = "key"  # (EVENT_KEY, key) when a member of the open card starts
+EVENT_FIELD = "field"  # (EVENT_FIELD, (key, value)) for a requested scalar field of the open card
+EVENT_SECTION = "section"  # (EVENT_SECTION, section) for a completed element of the open card's sections
+EVENT_CARD = "card"  # (EVENT_CARD, card) for a completed card
+
+
+class CardStreamParser:
+    """Emits each object of the top-level ``array_key`` array once it is complete."""
+
+    def __init__(
+        self,
+        array_key: str = "cards",
+        fields: Iterable[str] = (),
+        sections_key: Optional[str] = None,
+    ) -> None:
+        self.array_key = array_key
+        self.fields = frozenset(fields)
+        self.sections_key = sections_key
+        self._progressive = bool(self.fields or sections_key)
+        self._depth = 0  # {} / [] nesting from the document root
+        self._in_string = False
+        self._escape = False
+        # Strings directly inside the root object, so "cards" is found as a key
+        self._capturing = False
+        self._string_parts: list[str] = []
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        # Depth of the cards array once opened; -1 after it has closed
+        self._cards_depth: Optional[int] = None
+        # Text of the card currently open, one slice per chunk
+        self._card_parts: Optional[list[str]] = None
+        # Progressive mode: the open card's current key, whether its value is
+        # next, the depth inside its sections array and the open section's text
+        self._card_key: Optional[str] = None
+        self._card_value_next = False
+        self._sections_depth: Optional[int] = None
+        self._section_parts: Optional[list[str]] = None
+        self.parsed = 0
+        self.malformed = 0
+
+    @property
+    def done(self) -> bool:
+        """The cards array has closed; later text cannot produce cards."""
+        return self._cards_depth == -1
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Scan one streamed chunk; return the cards whose closing brace was in it."""
+        return [value for kind, value in self.feed_events(chunk) if kind == EVENT_CARD]
+
+    def feed_events(self, chunk: str) -> list[tuple[str, Any]]:
+        """Scan one streamed chunk; return its key, field, section and card events in order."""
+        events: list[tuple[str, Any]] = []
+        pos, end = 0, len(chunk)
+        # Where this chunk's slice of an open card / section / captured string begins
+        card_start = section_start = string_start = 0
+        card_level = -2 if self._cards_depth is None else self._cards_depth + 1
+
+        while pos < end:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._capturing:
+                    self._string_parts.append(chunk[string_start : pos - 1])
+                    self._last_string = "".join(self._string_parts)
+                    self._capturing = False
+                    if self._depth == card_level and self._card_value_next:
+                        self._card_value_next = False
+                        if self._card_key in self.fields:
+                            value = self._decode(self._last_string)
+                            if value is not None:
+                                events.append((EVENT_FIELD, (self._card_key, value)))
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 or (
+                    self._progressive and self._depth == card_level and self._card_parts is not None
+                ):
+                    self._capturing = True
+                    self._string_parts = []
+                    string_start = pos
+            elif char == "{" or char == "[":
+                if char == "{" and self._depth == self._cards_depth and self._card_parts is None:
+                    self._card_parts = []
+                    card_start = match.start()
+                elif char == "[" and self._depth == 1 and self._cards_depth is None:
+                    if self._key == self.array_key:
+                        self._cards_depth = 2
+                        card_level = 3
+                elif self._depth == card_level and self._card_parts is not None:
+                    if char == "[" and self._card_value_next and self._card_key == self.sections_key:
+                        self._sections_depth = self._depth + 1
+                    self._card_value_next = False
+                elif (
+                    char == "{"
+                    and self._depth == self._sections_depth
+                    and self._section_parts is None
+                ):
+                    self._section_parts = []
+                    section_start = match.start()
+                self._depth += 1
+            elif char == "}" or char == "]":
+                self._depth -= 1
+                if self._card_parts is not None and self._depth == self._cards_depth:
+                    self._card_parts.append(chunk[card_start:pos])
+                    card = self._parse("".join(self._card_parts))
+                    self._card_parts = None
+                    self._card_key, self._card_value_next = None, False
+                    self._sections_depth = self._section_parts = None
+                    if card is not None:
+                        events.append((EVENT_CARD, card))
+                elif self._section_parts is not None and self._depth == self._sections_depth:
+                    self._section_parts.append(chunk[section_start:pos])
+                    section = self._parse_section("".join(self._section_parts))
+                    self._section_parts = None
+                    if section is not None:
+                        events.append((EVENT_SECTION, section))
+                elif char == "]" and self._depth == card_level and self._sections_depth is not None:
+                    self._sections_depth = None
+                elif char == "]" and self._depth == 1 and self._cards_depth == 2:
+                    self._cards_depth = -1
+            elif self._depth == 1:
+                # ':' makes the last string a key; ',' ends the member
+                self._key = self._last_string if char == ":" else None
+            elif self._depth == card_level and self._card_parts is not None and self._progressive:
+                if char == ":":
+                    self._card_key, self._card_value_next = self._last_string, True
+                    events.append((EVENT_KEY, self._card_key))
+                else:
+                    self._card_key, self._card_value_next = None, False
+
+        # Carry the unfinished card / section / key over to the next chunk
+        if self._card_parts is not None:
+            self._card_parts.append(chunk[card_start:])
+        if self._section_parts is not None:
+            self._section_parts.append(chunk[section_start:])
+        if self._capturing:
+            self._string_parts.append(chunk[string_start:])
+        return events
+
+    @staticmethod
+    def _decode(raw: str) -> Optional[str]:
+        try:
+            return json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return None
+
+    def _parse_section(self, raw: str) -> Optional[dict[str, Any]]:
+        # The card is validated again as a whole when it closes
+        try:
+            section = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return section if isinstance(section, dict) else None
+
+    def _parse(self, raw: str) -> Optional[dict[str, Any]]:
+        try:
+            card = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.malformed += 1
+            logger.warning(f"Skipping malformed card JSON: {e}")
+            return None
+        if not isinstance(card, dict):
+            self.malformed += 1
+            return None
+        self.parsed += 1
+        return card
@@ -1,18 +1,18 @@
 """
-UI Agent for generating flashcard content using OpenAI and Mem0.
+UI Agent for generating flashcard content using OpenAI, with per-user card history.
 """
 
 import asyncio
 import json
 import logging
-import re
-from typing import Any, AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional
 
 import os
-from mem0 import Memory
 from openai import AsyncOpenAI
 
 from src.core.config import settings
+from src.services.llm.card_cache import CardBatchCache, card_cache_key, get_card_cache
+from src.services.llm.card_history import CardHistoryBuffer, CardHistoryStore, get_card_history
 from src.services.llm.infographic import (
     normalize_infographic_payload,
     normalize_sections,
@@ -20,42 +20,56 @@ from src.services.llm.infographic import (
 )
 from src.services.llm.prompts import UI_SYSTEM_INSTRUCTION
 from src.services.llm.media_assets import MEDIA_ASSETS
+from src.services.llm.stream_parser import (
+    EVENT_CARD,
+    EVENT_FIELD,
+    EVENT_KEY,
+    CardStreamParser,
+)
 from src.services.search.searxng_svc import SearXNGService
 
 
+# Card fields sent in a progressive stream's card_begin skeleton
+SKELETON_FIELDS = ("id", "type", "title", "icon")
+
+# Called with a published card and its resolved media when a deferred image
+# lookup finishes (see query_process_stream's on_media)
+MediaCallback = Callable[[dict, dict], Awaitable[None]]
+
+
+def _card_skeleton(fields: dict[str, Any]) -> dict[str, Any]:
+    """The card_begin view of a card, with the type normalized as the full card will be."""
+    skeleton = {key: fields[key] for key in SKELETON_FIELDS if fields.get(key) is not None}
+    card_type = skeleton.get("type") or "flashcard"
+    skeleton["type"] = "infographic" if card_type in ("infographic", "rich_card") else "flashcard"
+    return skeleton
+
+
 class UIAgentFunctions:
-    def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self,
+        openai_client: Optional[AsyncOpenAI] = None,
+        search_service: Optional[SearXNGService] = None,
+        card_history: Optional[CardHistoryStore] = None,
+        card_cache: Optional[CardBatchCache] = None,
+    ):
+        # Clients are injected from the process-wide ServiceRegistry when available;
+        # building them here is the fallback for standalone use.
+        self.openai_client = openai_client or AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.llm_model = settings.FLASHCARD_MODEL
         self.logger = logging.getLogger(__name__)
         self.instructions = UI_SYSTEM_INSTRUCTION
-        self.search_service = SearXNGService()
-
-        mem0_config = {
-            "llm": {
-                "provider": "openai",
-                "config": {
-                    "model": "gpt-4o-mini",
-                    "api_key": os.getenv("OPENAI_API_KEY"),
-                },
-            },
-            "embedder": {
-                "provider": "openai",
-                "config": {
-                    "model": "text-embedding-3-small",
-                    "api_key": os.getenv("OPENAI_API_KEY"),
-                },
-            },
-            "vector_store": {
-                "provider": "chroma",
-                "config": {
-                    "collection_name": "ui_flashcard_memory",
-                    "path": f"{settings.BASE_DIR}/src/services/vectordb/chroma_db_mem0",
-                },
-            },
-        }
-        self.memory = Memory.from_config(mem0_config)
-        self.logger.info("Mem0 memory initialized with ChromaDB backend")
+        self.search_service = search_service or SearXNGService()
+        if card_cache is None and settings.UI_CARD_CACHE_ENABLED:
+            card_cache = get_card_cache()
+        self.card_cache = card_cache
+
+        self.card_history = card_history or get_card_history()
+        # Decks shown this session; written to the store by flush_history()
+        self.history_buffer = CardHistoryBuffer(
+            self.card_history, max_pending=settings.CARD_HISTORY_BUFFER_SIZE
+        )
+        self._finishing: set[asyncio.Task] = set()
 
     async def query_process_stream(
         self,
@@ -63,14 +77,53 @@ class UIAgentFunctions:
         db_results: str,
         agent_response: str | None = None,
         user_id: str | None = None,
+        on_media: MediaCallback | None = None,
+        bypass_cache: bool = False,
+        progressive: bool = False,
     ) -> AsyncGenerator[dict[str, Any], None]:
         """
         Generate flashcard payloads for the given user input and DB results.
-        Automatically saves the full batch to Mem0 after streaming completes.
+        The full batch is buffered for the card history once streaming completes.
+
+        A batch already generated for the same question and DB results is
+        replayed from the card cache without calling the model, unless
+        `bypass_cache` is set.
+
+        With `on_media`, cards that need an image search are yielded at once
+        with ``media_pending`` set; the searches run in the background and
+        `on_media(card, media)` is awaited for each one that finds images
+        before the deadline. Without it, images are resolved before each card
+        is yielded.
+
+        With `progressive`, each generated card is preceded by a
+        ``card_begin`` event (``card``: id/type/title/icon) once its title is
+        parsed and the model has moved on to other fields, and a ``card_patch`` event (``section_index``, ``section``) per
+        section block validated by normalize_sections as it completes; the
+        card itself follows as usual, or ``card_abort`` if it fails
+        validation. Events refer to the last card begun.
+
+        A stream closed or failing part-way still remembers the cards it
+        yielded, but they are not cached: a cut-off deck is not replayed.
         """
-        import asyncio
 
+        generated_cards: list[dict] = []
+        media_tasks: list[asyncio.Task] = []
+        finished = False
         try:
+            cache_key = None
+            if self.card_cache is not None and not bypass_cache:
+                cache_key = card_cache_key(user_input, db_results, self.llm_model)
+                cached = self.card_cache.get(cache_key)
+                if cached:
+                    self.logger.info("✅ Replaying %d UI card(s) from the card cache", len(cached))
+                    for payload in cached:
+                        yield payload
+                    self._spawn_finish(
+                        self._finish_batch(user_input, cached, user_id, pending=[], cache_key=None)
+                    )
+                    finished = True
+                    return
+
             self.logger.info("Starting UI stream generation ...")
 
             effective_agent_response = (
@@ -103,189 +156,238 @@ class UIAgentFunctions:
                 timeout=20.0,  # don't hang the card stream on a stalled API call
             )
 
-            generated_cards: list[dict] = []
+            media_slots = asyncio.Semaphore(max(1, settings.UI_CARD_MEDIA_CONCURRENCY))
 
+            if progressive:
+                parser = CardStreamParser(fields=SKELETON_FIELDS, sections_key="sections")
+            else:
+                parser = CardStreamParser()
+            skeleton: dict[str, Any] = {}
+            begun, section_count = False, 0
             async with stream:
-                buffer = ""
-                state = 0
-
                 async for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        buffer += chunk.choices[0].delta.content
-
-                        if state == 0:
-                            match = re.search(r'"cards"\s*:\s*\[', buffer)
-                            if match:
-                                buffer = buffer[match.end() :]
-                                state = 1
-
-                        if state == 1:
-                            while True:
-                                start_idx = buffer.find("{")
-                                if start_idx == -1:
-                                    break
-
-                                # ponytail: brace depth must ignore { } inside string literals
-                                depth = 0
-                                end_idx = -1
-                                in_str = False
-                                esc = False
-
-                                for k in range(start_idx, len(buffer)):
-                                    c = buffer[k]
-                                    if in_str:
-                                        if esc:
-                                            esc = False
-                                        elif c == "\\":
-                                            esc = True
-                                        elif c == '"':
-                                            in_str = False
-                                        continue
-                                    if c == '"':
-                                        in_str = True
-                                    elif c == "{":
-                                        depth += 1
-                                    elif c == "}":
-                                        depth -= 1
-                                        if depth == 0:
-                                            end_idx = k
-                                            break
-
-                                if end_idx != -1:
-                                    raw_json = buffer[start_idx : end_idx + 1]
-
-                                    try:
-                                        card_obj = json.loads(raw_json)
-                                        payload = await self._normalize_card_payload(
-                                            card_obj,
+                    content = chunk.choices[0].delta.content
+                    if not content:
+                        continue
+                    for kind, value in parser.feed_events(content):
+                        if kind == EVENT_FIELD:
+                            skeleton[value[0]] = value[1]
+                            continue
+                        if kind == EVENT_KEY:
+                            # The skeleton fields come first; the first other key ends them
+                            if not begun and "title" in skeleton and value not in SKELETON_FIELDS:
+                                begun = True
+                                yield {"type": "card_begin", "card": _card_skeleton(skeleton)}
+                            continue
+                        if kind != EVENT_CARD:
+                            sections = normalize_sections([value])
+                            if not sections:
+                                continue
+                            if not begun:
+                                begun = True
+                                yield {"type": "card_begin", "card": _card_skeleton(skeleton)}
+                            yield {
+                                "type": "card_patch",
+                                "section_index": section_count,
+                                "section": sections[0],
+                            }
+                            section_count += 1
+                            continue
+
+                        card_obj = value
+                        was_begun = begun
+                        skeleton, begun, section_count = {}, False, 0
+                        try:
+                            payload = await self._normalize_card_payload(
+                                card_obj,
+                                defer_media=on_media is not None,
+                            )
+                            if payload:
+                                if payload.get("media_pending"):
+                                    media_tasks.append(
+                                        asyncio.create_task(
+                                            self._resolve_deferred_media(
+                                                payload, card_obj["media"]["query"], media_slots, on_media
+                                            )
                                         )
-                                        if payload:
-                                            generated_cards.append(payload)
-                                            yield payload
-                                    except Exception:
-                                        pass
-
-                                    buffer = buffer[end_idx + 1 :]
-                                else:
-                                    break
-
-            asyncio.create_task(
-                self._save_to_memory(
-                    user_query=user_input,
-                    cards=generated_cards,
-                    user_id=user_id,
+                                    )
+                                generated_cards.append(payload)
+                                yield payload
+                                continue
+                        except Exception:
+                            pass
+                        if was_begun:
+                            yield {"type": "card_abort"}
+
+            self._spawn_finish(
+                self._finish_batch(
+                    user_input, generated_cards, user_id, pending=media_tasks, cache_key=cache_key
                 )
             )
+            finished = True
 
         except Exception as e:
             yield {"type": "error", "content": str(e)}
+        finally:
+            # Closed by the publisher's deadline, cancelled, or failed mid-deck:
+            # the cards already on screen still go to the card history
+            if not finished and generated_cards:
+                self._spawn_finish(
+                    self._finish_batch(
+                        user_input, generated_cards, user_id, pending=media_tasks, cache_key=None
+                    )
+                )
 
     async def recall_ui_content(
         self, agent_response: str, user_id: str
     ) -> Optional[list[dict]]:
-        """Search Mem0 for previously shown flashcard batch."""
-        import asyncio
-
+        """Find the previously shown flashcard batch closest to `agent_response`."""
         if not user_id:
             self.logger.warning("recall_ui_content called with no user_id")
             return None
 
         self.logger.info(
-            "Recalling UI content from Mem0 for: '%s' (user: %s)",
+            "Recalling UI content from card history for: '%s' (user: %s)",
             agent_response,
             user_id,
         )
 
         try:
-            results = await asyncio.to_thread(
-                self.memory.search, query=agent_response, user_id=user_id, limit=1
-            )
-
-            if not results or not results.get("results"):
-                self.logger.info("No Mem0 results found for: %s", agent_response)
-                return None
+            # Decks from this session are only searchable once written
+            if self.history_buffer.pending:
+                await self.history_buffer.flush()
+            entries = await self.card_history.recall(user_id, agent_response)
+        except Exception as e:
+            self.logger.error("Card history recall failed: %s", e)
+            return None
 
-            top_result = results["results"][0]
-            metadata = top_result.get("metadata", {})
+        if not entries:
+            self.logger.info("No card history found for: %s", agent_response)
+            return None
 
-            if "cards" in metadata:
-                try:
-                    cards = json.loads(metadata["cards"])
-                    self.logger.info(
-                        "Recalled %d flashcard(s) from Mem0 metadata for user %s",
-                        len(cards),
-                        user_id,
-                    )
-                    return cards
-                except Exception as e:
-                    self.logger.error("Failed to parse cards from Mem0 metadata: %s", e)
-
-            memory_text: str = top_result.get("memory", "")
-            if not memory_text:
-                return None
-
-            if "| cards: " in memory_text:
-                cards_json_str = memory_text.split("| cards: ", 1)[1]
-                cards = json.loads(cards_json_str)
-                self.logger.info(
-                    "Recalled %d flashcard(s) from legacy Mem0 text for user %s",
-                    len(cards),
-                    user_id,
-                )
-                return cards
+        top = entries[0]
+        self.logger.info(
+            "Recalled %d flashcard(s) for user %s (query: '%s', similarity %.3f)",
+            len(top.cards),
+            user_id,
+            top.query,
+            top.similarity,
+        )
+        return top.cards
 
+    async def recall_latest_ui_content(self, user_id: str) -> Optional[list[dict]]:
+        """The flashcard batch most recently shown to the user, in any session."""
+        if not user_id:
             return None
-
+        try:
+            entry = self.history_buffer.latest(user_id) or await self.card_history.latest(user_id)
         except Exception as e:
-            self.logger.error("Mem0 recall failed: %s", e)
+            self.logger.error("Card history lookup failed: %s", e)
             return None
+        return entry.cards if entry else None
 
-    async def _save_to_memory(
+    async def _finish_batch(
         self,
         user_query: str,
         cards: list[dict],
         user_id: str | None,
+        pending: list[asyncio.Task],
+        cache_key: str | None,
     ) -> None:
-        """Persist the flashcard batch to Mem0 for later recall."""
-        import asyncio
+        """Cache and save a streamed batch once its image searches have settled."""
+        # Keep the cards with the images they ended up with
+        resolved = await asyncio.gather(*pending, return_exceptions=True)
+        # A deck with a missing image isn't worth replaying for the whole TTL
+        if cache_key is not None and cards and all(r is True for r in resolved):
+            self.card_cache.set(cache_key, cards)
+        self.remember_cards(user_query=user_query, cards=cards, user_id=user_id)
+
+    def _spawn_finish(self, finish: Awaitable[None]) -> None:
+        task = asyncio.create_task(finish)
+        self._finishing.add(task)
+        task.add_done_callback(self._finishing.discard)
+
+    async def flush_history(self) -> None:
+        """Write this session's buffered decks to the card history in one batch.
+
+        Called when the session ends. Batches still waiting on image searches
+        get until the media deadline to settle first.
+        """
+        if self._finishing:
+            await asyncio.wait(self._finishing, timeout=settings.UI_CARD_MEDIA_DEADLINE_SEC + 1.0)
+        pending = self.history_buffer.pending
+        if not pending:
+            return
+        try:
+            written = await self.history_buffer.flush()
+            self.logger.info(
+                "Saved %d deck(s) to card history (%d dropped this session)",
+                written,
+                self.history_buffer.dropped,
+            )
+        except Exception as e:
+            self.logger.error("Card history flush failed (%d deck(s) kept): %s", pending, e)
 
+    def remember_cards(
+        self,
+        user_query: str,
+        cards: list[dict],
+        user_id: str | None,
+    ) -> None:
+        """Buffer a flashcard batch shown to the user for the card history; see flush_history()."""
         if not user_id:
-            self.logger.info("Skipping Mem0 save — no user_id (guest session)")
+            self.logger.info("Skipping card history save — no user_id (guest session)")
             return
 
         if not cards:
-            self.logger.info("Skipping Mem0 save — no cards generated")
+            self.logger.info("Skipping card history save — no cards generated")
             return
 
-        try:
-            cards_json = json.dumps(cards)
-            memory_content = (
-                f"The user viewed flashcards for the query: '{user_query}'."
-            )
+        self.history_buffer.add(user_id, user_query, cards)
+        self.logger.info(
+            "Buffered %d flashcard(s) for user %s (query: '%s')",
+            len(cards),
+            user_id,
+            user_query,
+        )
 
-            await asyncio.to_thread(
-                self.memory.add,
-                messages=[{"role": "user", "content": memory_content}],
-                user_id=user_id,
-                metadata={
-                    "topic": "ui_flashcard",
-                    "user_query": user_query,
-                    "cards": cards_json,
-                },
-            )
+    async def _resolve_deferred_media(
+        self,
+        payload: dict,
+        query: str,
+        slots: asyncio.Semaphore,
+        on_media: MediaCallback,
+    ) -> bool:
+        """Image search for an already-published card; a miss or timeout keeps the placeholder.
+
+        Returns whether the card got images.
+        """
 
-            self.logger.info(
-                "Saved %d flashcard(s) to Mem0 metadata for user %s (query: '%s')",
-                len(cards),
-                user_id,
-                user_query,
-            )
+        async def _search() -> list[str]:
+            async with slots:
+                return await self.search_service.search_images(query)
+
+        try:
+            urls = await asyncio.wait_for(_search(), timeout=settings.UI_CARD_MEDIA_DEADLINE_SEC)
+        except (asyncio.TimeoutError, Exception) as e:
+            self.logger.info("Card image search gave up for %r: %r", query, e)
+            urls = []
+        finally:
+            payload.pop("media_pending", None)
+        if not urls:
+            return False
+
+        payload["media"] = {"urls": urls}
+        try:
+            await on_media(payload, payload["media"])
         except Exception as e:
-            self.logger.error("Mem0 save failed: %s", e)
+            self.logger.error("Card media update failed: %s", e)
+        return True
 
     async def _normalize_card_payload(
         self,
         card_obj: dict,
+        defer_media: bool = False,
     ) -> dict | None:
         if not isinstance(card_obj, dict):
             return None
@@ -294,7 +396,7 @@ class UIAgentFunctions:
         card_type = card_obj.get("type") or "flashcard"
 
         if card_type in ("infographic", "rich_card"):
-            # "rich_card" is the legacy alias (kept so old Mem0-recalled cards still
+            # "rich_card" is the legacy alias (kept so old recalled cards still
             # render) — normalize it to an infographic so the frontend only ever
             # handles two card types: image "flashcard" and text "infographic".
             return normalize_infographic_payload(card_obj)
@@ -310,25 +412,26 @@ class UIAgentFunctions:
             resolved_media = {}
 
             asset_key = media_data.get("asset_key")
+            search_query = (media_data.get("query") or "").strip()
             if asset_key and asset_key in MEDIA_ASSETS:
                 # Curated asset — always use it
                 asset_info = MEDIA_ASSETS[asset_key]
                 resolved_media["urls"] = asset_info.get("urls", [])
-            else:
+            elif search_query and defer_media:
+                # Searched in the background; the card is patched when it resolves
+                payload["media_pending"] = True
+            elif search_query:
                 # Per-card image search
-                search_query = media_data.get("query", "")
-                if search_query:
-                    try:
-                        image_urls = await asyncio.wait_for(
-                            self.search_service.search_images(search_query),
-                            timeout=6.0,
-                        )
-                        resolved_media["urls"] = image_urls
-                    except (asyncio.TimeoutError, Exception):
-                        # A slow image search must not stall the whole card
-                        resolved_media["urls"] = []
-                else:
+                try:
+                    resolved_media["urls"] = await asyncio.wait_for(
+                        self.search_service.search_images(search_query),
+                        timeout=settings.UI_CARD_MEDIA_DEADLINE_SEC,
+                    )
+                except (asyncio.TimeoutError, Exception):
+                    # A slow image search must not stall the whole card
                     resolved_media["urls"] = []
+            else:
+                resolved_media["urls"] = []
 
             # ponytail: omit media with no urls so the FE never renders a broken image tile
             if resolved_media.get("urls"):
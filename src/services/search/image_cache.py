@@ -0,0 +1,95 @@
+"""
+Cache for SearXNG image-search results used as flashcard media.
+
+The card model asks for the same handful of image queries ("cloud
+infrastructure", "AI analytics dashboard") in every session. Results are kept
+per normalized query in memory (LRU+TTL) and in a SQLite file shared by every
+worker process on the host, so a repeated query resolves without a SearXNG
+round trip. Only successful, non-empty searches are stored; scripts/
+warm_image_cache.py fills the cache from a list of common queries. An entry
+is `complete` when SearXNG had no more images than it holds, so it serves
+any limit; an incomplete one only serves limits it has enough URLs for.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from src.core.cache import SQLiteCache, TTLCache
+from src.core.config import settings
+from src.services.vectordb.embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class ImageSearchCache:
+    """Two-tier cache of image URLs keyed on the normalized search query."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 7 * 24 * 3600.0,
+        disk_path: Optional[str] = None,
+    ) -> None:
+        self._memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._disk: Optional[SQLiteCache] = None
+        if disk_path:
+            try:
+                self._disk = SQLiteCache(disk_path, ttl=ttl, table="image_search")
+            except Exception as e:
+                logger.warning("Image search disk cache disabled (%s): %s", disk_path, e)
+        self.disk_hits = 0
+
+    def get(self, query: str, limit: int = 1) -> Optional[list[str]]:
+        """The cached URLs for `query` if the entry can serve `limit` images, else None."""
+        key = normalize_query(query)
+        entry = self._memory.get(key)
+        if entry is None and self._disk is not None:
+            blob = self._disk.get(key)
+            if blob is not None:
+                data = json.loads(blob)
+                # Entries written before the complete flag are bare lists
+                entry = (
+                    (data, False) if isinstance(data, list) else (data["urls"], data["complete"])
+                )
+                self._memory.set(key, entry)
+                self.disk_hits += 1
+        if entry is None:
+            return None
+        urls, complete = entry
+        return urls if complete or len(urls) >= limit else None
+
+    def set(self, query: str, urls: list[str], complete: bool = False) -> None:
+        if not urls:
+            return
+        key = normalize_query(query)
+        self._memory.set(key, (urls, complete))
+        if self._disk is not None:
+            self._disk.set(
+                key, json.dumps({"urls": urls, "complete": complete}).encode("utf-8")
+            )
+
+    def stats(self) -> dict[str, int]:
+        memory = self._memory.stats()
+        return {
+            "size": memory["size"],
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": memory["misses"] - self.disk_hits,
+            "evictions": memory["evictions"],
+        }
+
+
+_image_search_cache: Optional[ImageSearchCache] = None
+
+
+def get_image_search_cache() -> ImageSearchCache:
+    """Return the singleton ImageSearchCache for this process."""
+    global _image_search_cache
+    if _image_search_cache is None:
+        _image_search_cache = ImageSearchCache(
+            max_entries=settings.IMAGE_SEARCH_CACHE_SIZE,
+            ttl=settings.IMAGE_SEARCH_CACHE_TTL,
+            disk_path=settings.IMAGE_SEARCH_CACHE_PATH or None,
+        )
+    return _image_search_cache
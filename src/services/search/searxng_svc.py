@@ -1,13 +1,19 @@
+import asyncio
 import time
-from typing import Any
+from typing import Any, Iterable, Optional
 
 import httpx
 
 from src.core.config import settings
+from src.services.search.image_cache import ImageSearchCache, get_image_search_cache
+from src.services.vectordb.embedding_cache import normalize_query
 
 DEFAULT_BASE_URL = settings.SEARXNG_BASE_URL
 DEFAULT_LIMIT = 10
 DEFAULT_TIMEOUT = 10.0
+# Image searches fetch and cache this many URLs whatever the caller's limit,
+# so a limit=1 lookup does not leave a one-image entry for later limit=3 ones
+IMAGE_CACHE_FETCH_LIMIT = 10
 
 
 class SearXNGService:
@@ -18,10 +24,12 @@ class SearXNGService:
         base_url: str = DEFAULT_BASE_URL,
         timeout: float = DEFAULT_TIMEOUT,
         default_limit: int = DEFAULT_LIMIT,
+        image_cache: Optional[ImageSearchCache] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.default_limit = default_limit
+        self.image_cache = image_cache if image_cache is not None else get_image_search_cache()
         # Persistent client — reuses TCP connections across calls (avoids per-call TLS handshake)
         self._client = httpx.AsyncClient(timeout=timeout)
 
@@ -105,20 +113,37 @@ class SearXNGService:
         limit: int = 3,
         timeout: float = DEFAULT_TIMEOUT,
     ) -> list[str]:
-        """Search SearXNG for images and return a list of image URLs."""
+        """Search SearXNG for images and return a list of image URLs.
+
+        Served from the image-search cache when the normalized query was
+        found before (by any worker on this host) with enough URLs, or with
+        every image SearXNG had.
+        """
         q = query.strip()
         if not q:
             return []
 
-        call_timeout = timeout or self.timeout
+        cached = self.image_cache.get(q, limit)
+        if cached is not None:
+            return cached[:limit]
+
+        fetch_limit = max(limit, IMAGE_CACHE_FETCH_LIMIT)
+        urls = await self._fetch_images(q, fetch_limit, timeout or self.timeout)
+        if urls is None:
+            return []
+        self.image_cache.set(q, urls, complete=len(urls) < fetch_limit)
+        return urls[:limit]
+
+    async def _fetch_images(self, q: str, limit: int, timeout: float) -> list[str] | None:
+        """Image URLs from SearXNG, or None if the request failed."""
         try:
             data = await self._get_json(
                 f"{self.base_url}/search",
                 {"q": q, "format": "json", "categories": "images"},
-                call_timeout,
+                timeout,
             )
         except (httpx.HTTPError, ValueError):
-            return []
+            return None
 
         # Extract image URLs: prefer img_src, fall back to thumbnail
         urls: list[str] = []
@@ -131,6 +156,34 @@ class SearXNGService:
 
         return urls
 
+    async def warm_image_cache(
+        self,
+        queries: Iterable[str],
+        concurrency: int = 4,
+        refresh: bool = False,
+    ) -> dict[str, int]:
+        """Search each query not already cached (all of them with `refresh`)."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        counts = {"cached": 0, "fetched": 0, "empty": 0, "failed": 0}
+
+        async def _warm(q: str) -> None:
+            if not refresh and self.image_cache.get(q, IMAGE_CACHE_FETCH_LIMIT) is not None:
+                counts["cached"] += 1
+                return
+            async with semaphore:
+                urls = await self._fetch_images(q, IMAGE_CACHE_FETCH_LIMIT, self.timeout)
+            if urls is None:
+                counts["failed"] += 1
+            elif not urls:
+                counts["empty"] += 1
+            else:
+                self.image_cache.set(q, urls, complete=len(urls) < IMAGE_CACHE_FETCH_LIMIT)
+                counts["fetched"] += 1
+
+        unique = {normalize_query(q): q.strip() for q in queries if q.strip()}
+        await asyncio.gather(*(_warm(q) for q in unique.values()))
+        return counts
+
     async def search_map(
         self,
         query: str,
@@ -0,0 +1,93 @@
+"""
+Lexical retrieval for the KB: an in-memory BM25 inverted index plus reciprocal
+rank fusion (RRF) to merge it with the vector ranking.
+
+Embeddings blur exact proper nouns ("Vyom AI", "ECOSPACE", "Sector 5"); BM25
+ranks chunks that literally contain those terms first, and RRF combines both
+rankings without having to calibrate their raw scores against each other.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Function words that only add noise to BM25 scores
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its "
+    "me my of on or our tell that the their this to us was what when where which "
+    "who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: list[Document], k1: float = 1.5, b: float = 0.75) -> None:
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        # term → [(doc index, term frequency)]
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._doc_lengths: list[int] = []
+
+        for i, doc in enumerate(documents):
+            counts = Counter(tokenize(doc.page_content))
+            self._doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings[term].append((i, tf))
+
+        n_docs = len(documents)
+        # 1.0 when no document has any token, so search() never divides by zero
+        self._avg_length = (sum(self._doc_lengths) / n_docs if n_docs else 0.0) or 1.0
+        self._idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, k: int = 5) -> list[Document]:
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[i] / self._avg_length)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [self.documents[i] for i, _ in ranked]
+
+
+def _doc_key(doc: Document) -> str:
+    return doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(
+    rankings: list[tuple[list[Document], float]],
+    k: int = 5,
+    rrf_k: int = 60,
+) -> list[Document]:
+    """Merge weighted rankings: score(d) = Σ weight / (rrf_k + rank(d))."""
+    scores: dict[str, float] = defaultdict(float)
+    docs: dict[str, Document] = {}
+    for ranking, weight in rankings:
+        if weight <= 0:
+            continue
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            scores[key] += weight / (rrf_k + rank)
+            docs.setdefault(key, doc)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [docs[key] for key, _ in ranked]
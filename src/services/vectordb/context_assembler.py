@@ -0,0 +1,192 @@
+"""
+Token-budgeted assembly of KB search results into LLM context.
+
+Search returns a fixed number of candidate chunks; the same text is sent to
+the main turn and again to the UI card prompt, so every redundant chunk is
+paid for twice. The assembler drops near-duplicate chunks, orders the rest by
+maximal marginal relevance (MMR) so the kept chunks cover different facts,
+and stops once a token budget measured with the model's tokenizer is spent.
+"""
+
+import functools
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tokens for the "### Result N" heading and the separator around each chunk
+_CHUNK_OVERHEAD_TOKENS = 10
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@functools.cache
+def get_tokenizer(encoding_name: str):
+    """tiktoken encoding, or None if it can't be loaded (counts are then estimated)."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"Tokenizer {encoding_name!r} unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, encoding_name: str) -> int:
+    tokenizer = get_tokenizer(encoding_name)
+    if tokenizer is None:
+        return max(1, len(text) // 4)
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str) -> str:
+    tokenizer = get_tokenizer(encoding_name)
+    if tokenizer is None:
+        return text[: max_tokens * 4]
+    tokens = tokenizer.encode(text, disallowed_special=())
+    return tokenizer.decode(tokens[:max_tokens])
+
+
+def _shingles(text: str, size: int = 3) -> frozenset:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return frozenset([tuple(words)]) if words else frozenset()
+    return frozenset(tuple(words[i : i + size]) for i in range(len(words) - size + 1))
+
+
+def _containment(a: frozenset, b: frozenset) -> float:
+    """Share of the smaller shingle set found in the other (1.0 = one contains the other)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class AssembledContext:
+    """Chunks chosen for the prompt, in the order they should appear."""
+
+    indices: list[int]
+    texts: list[str]
+    tokens: int
+    dropped_duplicates: int
+    dropped_for_budget: int
+
+
+class ContextAssembler:
+    """Dedup + MMR + token budget over ranked candidate chunks."""
+
+    def __init__(
+        self,
+        token_budget: int,
+        mmr_lambda: float = 0.7,
+        dedup_threshold: float = 0.8,
+        encoding_name: str = "o200k_base",
+    ) -> None:
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.dedup_threshold = dedup_threshold
+        self.encoding_name = encoding_name
+
+    def assemble(
+        self,
+        texts: list[str],
+        query_vector: Optional[list[float]] = None,
+        vectors: Optional[np.ndarray] = None,
+        token_budget: Optional[int] = None,
+    ) -> AssembledContext:
+        """Pick chunks from `texts` (best first).
+
+        With `vectors` (one row per text) and `query_vector`, relevance and
+        redundancy are cosine similarities; otherwise relevance follows the
+        search rank and redundancy is lexical overlap. `token_budget`
+        overrides the instance budget for this call.
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        shingles = [_shingles(t) for t in texts]
+
+        # 1. Drop chunks whose text is (nearly) contained in a better-ranked one
+        kept: list[int] = []
+        for i in range(len(texts)):
+            if any(_containment(shingles[i], shingles[j]) >= self.dedup_threshold for j in kept):
+                continue
+            kept.append(i)
+        dropped_duplicates = len(texts) - len(kept)
+
+        # 2. MMR ordering of the survivors
+        order = self._mmr_order(kept, shingles, query_vector, vectors)
+
+        # 3. Fill the token budget in MMR order
+        indices, chosen, used, dropped_for_budget = [], [], 0, 0
+        for i in order:
+            cost = count_tokens(texts[i], self.encoding_name) + _CHUNK_OVERHEAD_TOKENS
+            if used + cost <= budget:
+                indices.append(i)
+                chosen.append(texts[i])
+                used += cost
+            elif not indices and budget > _CHUNK_OVERHEAD_TOKENS:
+                # Never return nothing: trim the most relevant chunk to fit
+                room = budget - _CHUNK_OVERHEAD_TOKENS
+                indices.append(i)
+                chosen.append(truncate_to_tokens(texts[i], room, self.encoding_name))
+                used = budget
+            else:
+                dropped_for_budget += 1
+
+        return AssembledContext(
+            indices=indices,
+            texts=chosen,
+            tokens=used,
+            dropped_duplicates=dropped_duplicates,
+            dropped_for_budget=dropped_for_budget,
+        )
+
+    def _mmr_order(
+        self,
+        candidates: list[int],
+        shingles: list[frozenset],
+        query_vector: Optional[list[float]],
+        vectors: Optional[np.ndarray],
+    ) -> list[int]:
+        if len(candidates) <= 1:
+            return list(candidates)
+
+        if vectors is not None and query_vector is not None:
+            matrix = np.asarray(vectors, dtype=np.float32)[candidates]
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1.0, norms)
+            query = np.asarray(query_vector, dtype=np.float32)
+            query_norm = float(np.linalg.norm(query))
+            if query_norm:
+                query = query / query_norm
+            relevance = matrix @ query
+            similarity = matrix @ matrix.T
+        else:
+            n = len(candidates)
+            relevance = np.array([1.0 - rank / n for rank in range(n)], dtype=np.float32)
+            similarity = np.array(
+                [[_jaccard(shingles[a], shingles[b]) for b in candidates] for a in candidates],
+                dtype=np.float32,
+            )
+
+        remaining = list(range(len(candidates)))
+        selected: list[int] = []
+        while remaining:
+            if selected:
+                redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+            else:
+                redundancy = np.zeros(len(remaining), dtype=np.float32)
+            scores = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * redundancy
+            best = remaining[int(np.argmax(scores))]
+            selected.append(best)
+            remaining.remove(best)
+        return [candidates[i] for i in selected]
@@ -0,0 +1,51 @@
+"""
+In-memory snapshot of the company_knowledge collection.
+
+The KB is small (a few hundred chunks), so the in-process search backends load
+every id, document, metadata dict and embedding once and work from plain
+Python lists plus one contiguous float32 matrix.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+
+@dataclass
+class KBCorpus:
+    ids: list[str]
+    documents: list[Document]
+    # (n_docs, dim) float32, rows L2-normalized so dot product == cosine similarity
+    embeddings: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def load_corpus(vectorstore: Chroma) -> KBCorpus:
+    """Read the whole collection (ids, documents, metadata, embeddings) from Chroma."""
+    data = vectorstore.get(include=["documents", "metadatas", "embeddings"])
+    ids = list(data.get("ids") or [])
+    texts = data.get("documents") or []
+    metadatas = data.get("metadatas") or []
+    raw_embeddings = data.get("embeddings")
+
+    documents = [
+        Document(id=doc_id, page_content=text or "", metadata=meta or {})
+        for doc_id, text, meta in zip(ids, texts, metadatas)
+    ]
+    if raw_embeddings is None or len(ids) == 0:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+    else:
+        embeddings = normalize_rows(
+            np.ascontiguousarray(np.asarray(raw_embeddings, dtype=np.float32))
+        )
+    return KBCorpus(ids=ids, documents=documents, embeddings=embeddings)
@@ -0,0 +1,104 @@
+"""
+Process-wide cache for knowledge-base query embeddings.
+
+Callers repeat the same handful of questions, so the embedding round trip to
+OpenAI is skipped whenever the normalized query text has been seen before.
+Lookups go memory (LRU+TTL) → optional SQLite disk tier → miss.
+"""
+
+import logging
+import re
+from array import array
+from typing import Optional
+
+from src.core.cache import SQLiteCache, TTLCache
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip(" ?!.,:;")
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed on (embedding model, normalized text)."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 86400.0,
+        disk_path: Optional[str] = None,
+    ) -> None:
+        self._memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._disk: Optional[SQLiteCache] = None
+        if disk_path:
+            try:
+                self._disk = SQLiteCache(disk_path, ttl=ttl, table="embeddings")
+            except Exception as e:
+                # A read-only or missing volume just means memory-only caching
+                logger.warning("Embedding disk cache disabled (%s): %s", disk_path, e)
+        self.disk_hits = 0
+
+    @staticmethod
+    def _key(model: str, text: str) -> str:
+        return f"{model}:{normalize_query(text)}"
+
+    def get(self, model: str, text: str) -> Optional[list[float]]:
+        key = self._key(model, text)
+        vector = self._memory.get(key)
+        if vector is not None:
+            return vector
+        if self._disk is not None:
+            blob = self._disk.get(key)
+            if blob is not None:
+                vector = _unpack(blob)
+                self._memory.set(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def set(self, model: str, text: str, vector: list[float]) -> None:
+        key = self._key(model, text)
+        self._memory.set(key, vector)
+        if self._disk is not None:
+            self._disk.set(key, _pack(vector))
+
+    def stats(self) -> dict[str, int]:
+        memory = self._memory.stats()
+        return {
+            "size": memory["size"],
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            # Every disk hit was first counted as a memory miss
+            "misses": memory["misses"] - self.disk_hits,
+            "evictions": memory["evictions"],
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the singleton EmbeddingCache for this process."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            max_entries=settings.KB_EMBED_CACHE_SIZE,
+            ttl=settings.KB_EMBED_CACHE_TTL,
+            disk_path=settings.KB_EMBED_CACHE_PATH or None,
+        )
+    return _embedding_cache
@@ -0,0 +1,155 @@
+"""
+Embedding backends for the KB and the card history.
+
+"openai" is text-embedding-3-small over the API. "local" runs the
+all-MiniLM-L6-v2 sentence-embedding model through ONNX Runtime on CPU: no
+network after the one-time model download, and a few milliseconds per query.
+
+The two models produce vectors of different sizes (1536 vs 384), so each
+backend has its own collection; scripts/reembed_stores.py migrates the
+existing collections from one backend to the other.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKEND_OPENAI = "openai"
+EMBEDDING_BACKEND_LOCAL = "local"
+EMBEDDING_BACKENDS = (EMBEDDING_BACKEND_OPENAI, EMBEDDING_BACKEND_LOCAL)
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Collections built with a non-default backend get this suffix
+_COLLECTION_SUFFIXES = {
+    EMBEDDING_BACKEND_OPENAI: "",
+    EMBEDDING_BACKEND_LOCAL: "_minilm",
+}
+
+# Files inside the model directory (layout of Chroma's ONNX MiniLM archive)
+_ONNX_SUBDIR = "onnx"
+_MODEL_FILE = "model.onnx"
+_TOKENIZER_FILE = "tokenizer.json"
+
+
+def collection_for_backend(base_name: str, backend: str) -> str:
+    """Collection name holding vectors from the given embedding backend."""
+    if backend not in _COLLECTION_SUFFIXES:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return f"{base_name}{_COLLECTION_SUFFIXES[backend]}"
+
+
+def ensure_local_model(model_dir: str) -> str:
+    """Download the ONNX model into model_dir if it isn't there; return its onnx/ path."""
+    onnx_dir = os.path.join(model_dir, _ONNX_SUBDIR)
+    if os.path.exists(os.path.join(onnx_dir, _MODEL_FILE)):
+        return onnx_dir
+
+    # Reuse Chroma's verified (sha256-checked) download of the same model
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+    logger.info(f"Downloading {LOCAL_EMBEDDING_MODEL} ONNX model to {model_dir}")
+    downloader = ONNXMiniLM_L6_V2()
+    downloader.DOWNLOAD_PATH = Path(model_dir)
+    downloader._download_model_if_not_exists()
+    return onnx_dir
+
+
+class LocalOnnxEmbeddings(Embeddings):
+    """all-MiniLM-L6-v2 on ONNX Runtime (CPU), mean-pooled and L2-normalized."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        threads: int = 1,
+        max_length: int = 256,
+        batch_size: int = 32,
+    ) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model = LOCAL_EMBEDDING_MODEL
+        self.batch_size = batch_size
+
+        onnx_dir = ensure_local_model(model_dir)
+        self._tokenizer = Tokenizer.from_file(os.path.join(onnx_dir, _TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        # Pad to the longest text in the batch, not to max_length: a short
+        # query then runs over a handful of tokens instead of 256
+        self._tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, threads)
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.log_severity_level = 3
+        self._session = ort.InferenceSession(
+            os.path.join(onnx_dir, _MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        batches = []
+        for i in range(0, len(texts), self.batch_size):
+            encoded = self._tokenizer.encode_batch(texts[i : i + self.batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            hidden = self._session.run(
+                None,
+                {
+                    "input_ids": input_ids,
+                    "attention_mask": attention_mask,
+                    "token_type_ids": np.zeros_like(input_ids),
+                },
+            )[0]
+
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.where(norms == 0, 1.0, norms))
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    async def aembed_query(self, text: str) -> list[float]:
+        # A single short query takes a few ms — cheaper inline than a thread hop
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+
+@functools.cache
+def get_local_embeddings() -> LocalOnnxEmbeddings:
+    """The process-wide local model; the ONNX session is created once per process."""
+    return LocalOnnxEmbeddings(
+        model_dir=settings.LOCAL_EMBEDDING_MODEL_DIR,
+        threads=settings.LOCAL_EMBEDDING_THREADS,
+    )
+
+
+def build_embeddings(backend: str) -> Embeddings:
+    """Embeddings client for a backend name ("openai" or "local")."""
+    if backend == EMBEDDING_BACKEND_LOCAL:
+        return get_local_embeddings()
+    if backend == EMBEDDING_BACKEND_OPENAI:
+        return OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY)
+    raise ValueError(f"Unknown embedding backend: {backend}")
@@ -0,0 +1,223 @@
+"""
+Typed entity store: exact answers for entity lookups ahead of vector search.
+
+Offices, leadership, flagship products and media assets are a large share of
+KB questions ("where is the Singapore office", "who is the CEO", "what is
+VYOM"). They live in one data file (assets/data/entities.json) that is loaded
+into an in-memory alias index. A query is answered from the store only when
+an alias matches and almost every remaining query term is an intent word for
+that entity type ("office", "address", "video", ...); anything more specific
+("VYOM pricing", "the CEO's view on GenAI") falls through to vector search.
+
+The same file feeds the global-presence screen and OFFICE_DATA in the prompt,
+so office addresses are maintained in one place.
+"""
+
+import functools
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from src.services.llm.media_assets import MEDIA_ASSETS
+from src.services.vectordb.bm25 import tokenize
+
+logger = logging.getLogger(__name__)
+
+ENTITY_OFFICE = "office"
+ENTITY_PERSON = "person"
+ENTITY_PRODUCT = "product"
+ENTITY_MEDIA = "media"
+
+# Attributes used for wiring, not shown to the model as facts
+_HIDDEN_ATTRIBUTES = frozenset({"short_name", "lat", "lng", "image_asset_key", "video_asset_key", "asset_key"})
+
+
+@dataclass
+class Entity:
+    id: str
+    type: str
+    name: str
+    aliases: list[str]
+    keywords: list[str] = field(default_factory=list)
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def asset_url(self, key: str) -> Optional[str]:
+        """First MEDIA_ASSETS url for the asset named by attribute `key`."""
+        urls = MEDIA_ASSETS.get(self.attributes.get(key) or "", {}).get("urls") or []
+        return urls[0] if urls else None
+
+
+@dataclass
+class EntityMatch:
+    entities: list[Entity]
+    confidence: float
+    alias: str
+
+
+def _phrase_at(tokens: list[str], phrase: tuple[str, ...]) -> Optional[int]:
+    """Start index of `phrase` as a contiguous run in `tokens`, or None."""
+    n = len(phrase)
+    for i in range(len(tokens) - n + 1):
+        if tuple(tokens[i : i + n]) == phrase:
+            return i
+    return None
+
+
+def _render_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return str(value)
+
+
+def render_entity(entity: Entity) -> str:
+    """Markdown facts for one entity, in the shape of a rendered KB result."""
+    lines = [f"**{entity.name}**", ""]
+    for key, value in entity.attributes.items():
+        if key in _HIDDEN_ATTRIBUTES:
+            continue
+        label = key.replace("_", " ").capitalize()
+        if isinstance(value, list):
+            lines.append(f"- **{label}:**")
+            lines.extend(f"  - {item}" for item in value)
+        else:
+            lines.append(f"- **{label}:** {_render_value(value)}")
+
+    if entity.type == ENTITY_OFFICE:
+        lines.append(f"- **Coordinates:** {entity.attributes['lat']}, {entity.attributes['lng']}")
+    for key, label in (("image_asset_key", "Image"), ("video_asset_key", "Video"), ("asset_key", "URL")):
+        url = entity.asset_url(key)
+        if url:
+            lines.append(f"- **{label}:** {url}")
+    return "\n".join(lines) + "\n"
+
+
+class EntityIndex:
+    """Alias + keyword matcher over the typed entities of one data file."""
+
+    def __init__(self, data: dict, min_confidence: float = 0.8) -> None:
+        self.min_confidence = min_confidence
+        self._company_terms = frozenset(data.get("company_terms", []))
+        self.entities = [Entity(**item) for item in data.get("entities", [])]
+
+        # alias tokens → entities carrying that alias
+        self._aliases: dict[tuple[str, ...], list[Entity]] = {}
+        for entity in self.entities:
+            for alias in [entity.name, *entity.aliases]:
+                phrase = tuple(self._tokens(alias))
+                if phrase and entity not in self._aliases.setdefault(phrase, []):
+                    self._aliases[phrase].append(entity)
+
+        self._intent_terms: dict[str, frozenset] = {}
+        self._list_aliases: dict[tuple[str, ...], str] = {}
+        for type_name, spec in data.get("types", {}).items():
+            self._intent_terms[type_name] = frozenset(spec.get("intent_terms", []))
+            for alias in spec.get("list_aliases", []):
+                phrase = tuple(self._tokens(alias))
+                if phrase:
+                    self._list_aliases[phrase] = type_name
+
+    @classmethod
+    def from_file(cls, path: str, min_confidence: float = 0.8) -> "EntityIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), min_confidence=min_confidence)
+
+    def _tokens(self, text: str) -> list[str]:
+        return [t for t in tokenize(text) if t not in self._company_terms]
+
+    def by_type(self, type_name: str) -> list[Entity]:
+        return [e for e in self.entities if e.type == type_name]
+
+    def get(self, entity_id: str) -> Optional[Entity]:
+        return next((e for e in self.entities if e.id == entity_id), None)
+
+    def _coverage(self, tokens: list[str], covered: set[int], entities: list[Entity]) -> float:
+        """Share of query terms explained by the alias, intent words and entity keywords."""
+        allowed = set()
+        for entity in entities:
+            allowed |= self._intent_terms.get(entity.type, frozenset())
+            allowed.update(entity.keywords)
+        explained = sum(1 for i, t in enumerate(tokens) if i in covered or t in allowed)
+        return explained / len(tokens)
+
+    def match(self, query: str) -> Optional[EntityMatch]:
+        """Best entity match for `query`, or None if nothing matches confidently."""
+        tokens = self._tokens(query)
+        if not tokens:
+            return None
+
+        # Longest alias wins ("kolkata sector 5" over "kolkata"); equal-length
+        # hits are all returned ("kolkata" → both Kolkata offices)
+        best: Optional[tuple[int, str, set[int], list[Entity]]] = None
+        for phrase, entities in self._aliases.items():
+            start = _phrase_at(tokens, phrase)
+            if start is None:
+                continue
+            span = set(range(start, start + len(phrase)))
+            if best is None or len(phrase) > best[0]:
+                best = (len(phrase), " ".join(phrase), span, list(entities))
+            elif len(phrase) == best[0]:
+                best[2].update(span)
+                best[3].extend(e for e in entities if e not in best[3])
+
+        if best is None:
+            # No specific entity named: "offices", "global presence" → the whole type
+            for phrase, type_name in self._list_aliases.items():
+                start = _phrase_at(tokens, phrase)
+                if start is not None and (best is None or len(phrase) > best[0]):
+                    span = set(range(start, start + len(phrase)))
+                    best = (len(phrase), " ".join(phrase), span, self.by_type(type_name))
+        if best is None:
+            return None
+
+        _, alias, covered, entities = best
+        # An alias shared across types (e.g. "ceo") is resolved by the query's
+        # other terms: keep the type whose intent words explain the most
+        if len({e.type for e in entities}) > 1:
+            scored = {
+                t: self._coverage(tokens, covered, [e for e in entities if e.type == t])
+                for t in {e.type for e in entities}
+            }
+            keep = max(scored, key=scored.get)
+            entities = [e for e in entities if e.type == keep]
+
+        confidence = self._coverage(tokens, covered, entities)
+        if confidence < self.min_confidence:
+            return None
+        return EntityMatch(entities=entities, confidence=confidence, alias=alias)
+
+    # ── Views used outside KB search ───────────────────────────────────────
+
+    def office_records(self) -> list[dict]:
+        """Offices in the shape of the Office tool argument (OFFICE_DATA entries)."""
+        return [
+            {
+                "id": e.id,
+                "name": e.name,
+                "address": e.attributes["address"],
+                "lat": e.attributes["lat"],
+                "lng": e.attributes["lng"],
+                "image_url": e.asset_url("image_asset_key") or "",
+            }
+            for e in self.by_type(ENTITY_OFFICE)
+        ]
+
+    def global_presence(self) -> dict:
+        """Regions and headquarters for the global-presence screen."""
+        offices = self.by_type(ENTITY_OFFICE)
+        hq_country = next(
+            (e.attributes["country"] for e in offices if e.attributes.get("headquarters")), None
+        )
+        regions, headquarters = {}, {}
+        for e in offices:
+            target = headquarters if e.attributes["country"] == hq_country else regions
+            target[e.attributes["short_name"]] = e.attributes["address"]
+        return {"regions": regions, "headquarters": headquarters}
+
+
+@functools.cache
+def get_entity_index(path: str, min_confidence: float = 0.8) -> EntityIndex:
+    """Process-wide entity index for a data file, loaded on first use."""
+    index = EntityIndex.from_file(path, min_confidence=min_confidence)
+    logger.info(f"Entity index ready: {len(index.entities)} entities from {path}")
+    return index
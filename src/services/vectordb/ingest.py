@@ -0,0 +1,312 @@
+"""
+Offline ingestion for the company_knowledge collection.
+
+Reads a local snapshot of the website (HTML / markdown / text files), chunks
+it, and upserts the chunks into Chroma. Chunk ids are content hashes, so a
+re-run only embeds chunks whose text changed and deletes chunks that no longer
+exist for a re-ingested page. The kb_version marker is rewritten afterwards,
+which is how running workers notice the rebuild and reload their indexes.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+import chromadb
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.services.vectordb.rendering import (
+    render_signature,
+    stored_rendering,
+    with_rendering,
+)
+from src.services.vectordb.vectordb_svc import (
+    KB_COLLECTION_NAME,
+    version_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".html", ".htm", ".md", ".markdown", ".txt")
+
+# Content inside these tags is page chrome, not knowledge
+_SKIPPED_TAGS = {"script", "style", "noscript", "nav", "footer", "header", "svg", "form"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "li", "br", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+class _PageTextParser(HTMLParser):
+    """Extract visible text, the <title> and the canonical URL from an HTML page."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.title = ""
+        self.canonical_url = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "link" and (attributes.get("rel") or "").lower() == "canonical":
+            self.canonical_url = attributes.get("href") or self.canonical_url
+        elif tag == "meta" and attributes.get("property") == "og:url":
+            self.canonical_url = self.canonical_url or attributes.get("content") or ""
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self.parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+@dataclass
+class SourcePage:
+    source: str
+    title: str
+    text: str
+
+
+@dataclass
+class Chunk:
+    id: str
+    text: str
+    metadata: dict
+
+
+@dataclass
+class IngestReport:
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    rerendered: int = 0
+    version: str = ""
+    skipped_files: list[str] = field(default_factory=list)
+
+
+def content_hash(source: str, text: str) -> str:
+    return hashlib.sha256(f"{source}\n{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def read_page(path: str, root: str) -> Optional[SourcePage]:
+    """Load one snapshot file; the source is its canonical URL or relative path."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        raw = f.read()
+
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    if path.lower().endswith((".html", ".htm")):
+        parser = _PageTextParser()
+        parser.feed(raw)
+        text = parser.text()
+        title = " ".join(parser.title.split())
+        source = parser.canonical_url or relative
+    else:
+        text = raw.strip()
+        first_line = text.splitlines()[0] if text else ""
+        title = first_line.lstrip("# ").strip() if first_line.startswith("#") else ""
+        source = relative
+
+    if not text:
+        return None
+    return SourcePage(source=source, title=title, text=text)
+
+
+def iter_snapshot_files(root: str) -> Iterable[str]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def chunk_page(
+    page: SourcePage,
+    splitter: RecursiveCharacterTextSplitter,
+    skipped_metadata_keys: Iterable[str] = (),
+) -> list[Chunk]:
+    chunks = []
+    for text in splitter.split_text(page.text):
+        digest = content_hash(page.source, text)
+        metadata = {"source": page.source, "content_hash": digest}
+        if page.title:
+            metadata["title"] = page.title
+        metadata = with_rendering(text, metadata, skipped_metadata_keys)
+        chunks.append(Chunk(id=digest, text=text, metadata=metadata))
+    return chunks
+
+
+def refresh_renderings(
+    collection: chromadb.Collection,
+    skipped_metadata_keys: Iterable[str],
+    batch_size: int = 256,
+) -> int:
+    """Store rendered markdown on every chunk whose rendering is missing or stale.
+
+    Only metadata is rewritten; embeddings are untouched. Returns the number of
+    chunks updated.
+    """
+    skipped_metadata_keys = list(skipped_metadata_keys)
+    signature = render_signature(skipped_metadata_keys)
+    existing = collection.get(include=["documents", "metadatas"])
+
+    ids, metadatas = [], []
+    for doc_id, text, meta in zip(
+        existing["ids"], existing["documents"] or [], existing["metadatas"] or []
+    ):
+        meta = meta or {}
+        if stored_rendering(meta, signature) is None:
+            ids.append(doc_id)
+            metadatas.append(with_rendering(text or "", meta, skipped_metadata_keys))
+
+    for i in range(0, len(ids), batch_size):
+        collection.update(ids=ids[i : i + batch_size], metadatas=metadatas[i : i + batch_size])
+    return len(ids)
+
+
+async def embed_chunks(
+    chunks: list[Chunk],
+    embeddings: Embeddings,
+    batch_size: int,
+    concurrency: int,
+) -> list[list[float]]:
+    """Embed chunk texts in large batches with at most `concurrency` requests in flight."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    batches = [chunks[i : i + batch_size] for i in range(0, len(chunks), batch_size)]
+
+    async def _embed(batch: list[Chunk]) -> list[list[float]]:
+        async with semaphore:
+            return await embeddings.aembed_documents([c.text for c in batch])
+
+    results = await asyncio.gather(*(_embed(batch) for batch in batches))
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+def write_version(
+    persist_directory: str,
+    ids: Iterable[str],
+    salt: str = "",
+    collection_name: str = KB_COLLECTION_NAME,
+) -> str:
+    """Write the kb_version marker: a hash of every chunk id in the collection.
+
+    `salt` folds in anything else cached results depend on (the rendering
+    signature), so a metadata-only rewrite still invalidates worker caches.
+    """
+    payload = "\n".join(sorted(ids)) + "\n" + salt
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    marker = os.path.join(persist_directory, version_file_name(collection_name))
+    with open(marker, "w", encoding="utf-8") as f:
+        f.write(digest)
+    return digest
+
+
+async def ingest_snapshot(
+    snapshot_dir: str,
+    persist_directory: str,
+    embeddings: Embeddings,
+    collection_name: str = KB_COLLECTION_NAME,
+    chunk_size: int = 1200,
+    chunk_overlap: int = 150,
+    batch_size: int = 256,
+    concurrency: int = 4,
+    prune: bool = False,
+    skipped_metadata_keys: Iterable[str] = (),
+) -> IngestReport:
+    """Chunk every page under snapshot_dir and upsert only new or changed chunks.
+
+    Chunks are stored with their markdown rendering pre-computed (see
+    rendering.py); `skipped_metadata_keys` must match the agent's skip list.
+    """
+    skipped_metadata_keys = list(skipped_metadata_keys)
+    report = IngestReport()
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
+    chunks: dict[str, Chunk] = {}
+    sources: set[str] = set()
+    for path in iter_snapshot_files(snapshot_dir):
+        page = read_page(path, snapshot_dir)
+        if page is None:
+            report.skipped_files.append(path)
+            continue
+        report.pages += 1
+        sources.add(page.source)
+        for chunk in chunk_page(page, splitter, skipped_metadata_keys):
+            chunks[chunk.id] = chunk
+    report.chunks = len(chunks)
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_or_create_collection(collection_name)
+    existing = collection.get(include=["metadatas"])
+    existing_sources = {
+        doc_id: (meta or {}).get("source")
+        for doc_id, meta in zip(existing["ids"], existing["metadatas"] or [])
+    }
+
+    # Chunks that vanished from a re-ingested page (or from the snapshot, with prune)
+    stale_ids = [
+        doc_id
+        for doc_id, source in existing_sources.items()
+        if doc_id not in chunks and (source in sources or prune)
+    ]
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+    report.deleted = len(stale_ids)
+
+    pending = [c for c in chunks.values() if c.id not in existing_sources]
+    report.unchanged = len(chunks) - len(pending)
+    if pending:
+        vectors = await embed_chunks(pending, embeddings, batch_size, concurrency)
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i : i + batch_size]
+            collection.upsert(
+                ids=[c.id for c in batch],
+                embeddings=vectors[i : i + batch_size],
+                documents=[c.text for c in batch],
+                metadatas=[c.metadata for c in batch],
+            )
+    report.embedded = len(pending)
+    # Unchanged chunks keep their vectors but may predate the current skip list
+    report.rerendered = refresh_renderings(collection, skipped_metadata_keys, batch_size)
+
+    report.version = write_version(
+        persist_directory,
+        collection.get(include=[])["ids"],
+        salt=render_signature(skipped_metadata_keys),
+        collection_name=collection_name,
+    )
+    logger.info(
+        "KB ingest: %d pages, %d chunks (%d embedded, %d unchanged, %d deleted, %d re-rendered) → version %s",
+        report.pages,
+        report.chunks,
+        report.embedded,
+        report.unchanged,
+        report.deleted,
+        report.rerendered,
+        report.version,
+    )
+    return report
@@ -0,0 +1,159 @@
+"""
+Quantized, memory-mapped export of the KB vectors.
+
+LiveKit runs each job in its own process. Loading the collection through
+Chroma in every one of them duplicates the index per call; instead the
+vectors are exported once to .npy files that every job process maps
+read-only, so the OS page cache holds a single shared copy and a job's KB is
+ready as soon as the files are mapped.
+
+Layout of an export directory:
+    meta.json          version, dim, dtype, ids, documents, metadatas
+    codes.npy          (n, dim) int8 or float16 vectors scanned for every query
+    scales.npy         (n,) float32 per-row int8 scale (int8 exports only)
+    vectors_f32.npy    (n, dim) float32 originals, optional, for re-scoring
+"""
+
+import json
+import os
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.services.vectordb.corpus import KBCorpus
+from src.services.vectordb.numpy_index import top_k_indices
+
+META_FILE = "meta.json"
+CODES_FILE = "codes.npy"
+SCALES_FILE = "scales.npy"
+RESCORE_FILE = "vectors_f32.npy"
+
+DTYPE_INT8 = "int8"
+DTYPE_FLOAT16 = "float16"
+
+
+def _write_atomic_npy(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def export_quantized_index(
+    corpus: KBCorpus,
+    out_dir: str,
+    version: str,
+    dtype: str = DTYPE_INT8,
+    with_rescore: bool = True,
+) -> None:
+    """Write a corpus (rows already L2-normalized) as a memory-mappable export."""
+    if dtype not in (DTYPE_INT8, DTYPE_FLOAT16):
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    os.makedirs(out_dir, exist_ok=True)
+    vectors = np.ascontiguousarray(corpus.embeddings, dtype=np.float32)
+
+    if dtype == DTYPE_INT8:
+        # Symmetric per-row quantization: x ≈ code * scale, code ∈ [-127, 127]
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        _write_atomic_npy(os.path.join(out_dir, SCALES_FILE), scales.astype(np.float32))
+    else:
+        codes = vectors.astype(np.float16)
+    _write_atomic_npy(os.path.join(out_dir, CODES_FILE), codes)
+
+    rescore_path = os.path.join(out_dir, RESCORE_FILE)
+    if with_rescore:
+        _write_atomic_npy(rescore_path, vectors)
+    elif os.path.exists(rescore_path):
+        os.remove(rescore_path)
+
+    meta = {
+        "version": version,
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "dtype": dtype,
+        "ids": corpus.ids,
+        "documents": [doc.page_content for doc in corpus.documents],
+        "metadatas": [doc.metadata for doc in corpus.documents],
+    }
+    # meta.json goes last: readers treat it as the commit point of the export
+    tmp_meta = os.path.join(out_dir, f"{META_FILE}.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, os.path.join(out_dir, META_FILE))
+
+
+def read_export_version(index_dir: str) -> Optional[str]:
+    """Version recorded in an export, or None if there is no usable export."""
+    try:
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+class QuantizedIndex:
+    """Top-k search over memory-mapped quantized vectors with optional re-scoring."""
+
+    def __init__(self, index_dir: str, rescore: bool = True, rescore_factor: int = 4) -> None:
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.version: str = meta["version"]
+        self.dtype: str = meta["dtype"]
+        self.ids: list[str] = meta["ids"]
+        self.documents = [
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(meta["ids"], meta["documents"], meta["metadatas"])
+        ]
+        # mmap_mode="r": pages are shared through the OS page cache, never copied
+        self._codes = np.load(os.path.join(index_dir, CODES_FILE), mmap_mode="r")
+        self._scales = (
+            np.load(os.path.join(index_dir, SCALES_FILE), mmap_mode="r")
+            if self.dtype == DTYPE_INT8
+            else None
+        )
+        rescore_path = os.path.join(index_dir, RESCORE_FILE)
+        self._rescore_vectors = (
+            np.load(rescore_path, mmap_mode="r")
+            if rescore and os.path.exists(rescore_path)
+            else None
+        )
+        self.rescore_factor = max(1, rescore_factor)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vectors(self, rows: list[int]) -> np.ndarray:
+        """Stored vectors for the given document positions (dequantized if no float32 copy)."""
+        if self._rescore_vectors is not None:
+            return np.asarray(self._rescore_vectors[rows], dtype=np.float32)
+        vectors = np.asarray(self._codes[rows], dtype=np.float32)
+        if self._scales is not None:
+            vectors = vectors * np.asarray(self._scales[rows], dtype=np.float32)[:, None]
+        return vectors
+
+    def scores(self, embedding: list[float]) -> np.ndarray:
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm:
+            query = query / norm
+        approx = self._codes.dot(query)
+        if self._scales is not None:
+            approx = approx * self._scales
+        return approx
+
+    def search(self, embedding: list[float], k: int = 5) -> list[Document]:
+        if not len(self):
+            return []
+        approx = self.scores(embedding)
+        if self._rescore_vectors is None:
+            return [self.documents[i] for i in top_k_indices(approx, k)]
+
+        # Re-rank a wider quantized shortlist with the exact float32 vectors
+        candidates = top_k_indices(approx, k * self.rescore_factor)
+        query = np.asarray(embedding, dtype=np.float32)
+        exact = self._rescore_vectors[candidates].dot(query)
+        order = candidates[np.argsort(-exact)][:k]
+        return [self.documents[i] for i in order]
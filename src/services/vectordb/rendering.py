@@ -0,0 +1,99 @@
+"""
+Markdown rendering of KB documents for the LLM.
+
+Every search used to re-parse JSON-looking metadata strings and title-case
+keys for each result. The body of a result only depends on the document and
+the skipped-key list, so it is rendered once — at ingest time, by the one-off
+migration for existing collections, or on first use in-process — and stored in
+the document's metadata next to a signature of the skip list it was built with.
+"""
+
+import hashlib
+import json
+from typing import Iterable, Optional
+
+RENDERED_MARKDOWN_KEY = "rendered_markdown"
+RENDER_SIGNATURE_KEY = "rendered_signature"
+
+# Bump when the rendered layout changes so stored renderings are rebuilt
+_RENDER_VERSION = "1"
+
+# Our own bookkeeping keys are never rendered as document details
+_INTERNAL_KEYS = frozenset((RENDERED_MARKDOWN_KEY, RENDER_SIGNATURE_KEY))
+
+
+def render_signature(skipped_keys: Iterable[str]) -> str:
+    """Identify the rendering rules; a stored rendering with another signature is stale."""
+    raw = _RENDER_VERSION + "|" + ",".join(sorted(skipped_keys))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def render_metadata_value(key: str, val: str) -> Optional[str]:
+    """Format a single metadata value, handling JSON strings."""
+    human_key = key.replace("_", " ").title()
+
+    # Check if it's a JSON string (list or dict)
+    if isinstance(val, str) and val.strip().startswith(("[", "{")):
+        try:
+            parsed = json.loads(val)
+            if isinstance(parsed, list):
+                formatted_val = ", ".join(map(str, parsed))
+            elif isinstance(parsed, dict):
+                formatted_val = ", ".join(
+                    [
+                        f"{k.replace('_', ' ').title()}: {v}"
+                        for k, v in parsed.items()
+                    ]
+                )
+            else:
+                formatted_val = str(parsed)
+            return f"**{human_key}:** {formatted_val}"
+        except json.JSONDecodeError:
+            # Fallback for invalid JSON
+            return f"**{human_key}:** {val}"
+
+    # Regular value
+    return f"**{human_key}:** {val}"
+
+
+def render_metadata(metadata: dict, skipped_keys: Iterable[str]) -> list[str]:
+    """Extract and format all metadata dynamically."""
+    skipped = set(skipped_keys) | _INTERNAL_KEYS
+    details = []
+    for key, val in metadata.items():
+        # Skip internal/empty keys
+        if not val or key in skipped:
+            continue
+
+        formatted = render_metadata_value(key, val)
+        if formatted:
+            details.append(formatted)
+
+    return details
+
+
+def render_document(content: str, metadata: dict, skipped_keys: Iterable[str]) -> str:
+    """Markdown body of one result (everything below its '### Result N' heading)."""
+    body = f"{content.strip()}\n"
+    details = render_metadata(metadata, skipped_keys)
+    if details:
+        body += "\n" + "\n".join([f"- {d}" for d in details])
+    return body
+
+
+def stored_rendering(metadata: dict, signature: str) -> Optional[str]:
+    """The pre-rendered body, if present and built with the current rules."""
+    if metadata.get(RENDER_SIGNATURE_KEY) != signature:
+        return None
+    return metadata.get(RENDERED_MARKDOWN_KEY)
+
+
+def with_rendering(content: str, metadata: dict, skipped_keys: Iterable[str]) -> dict:
+    """Copy of metadata carrying the pre-rendered body and its signature."""
+    skipped_keys = list(skipped_keys)
+    clean = {k: v for k, v in metadata.items() if k not in _INTERNAL_KEYS}
+    return {
+        **clean,
+        RENDERED_MARKDOWN_KEY: render_document(content, clean, skipped_keys),
+        RENDER_SIGNATURE_KEY: render_signature(skipped_keys),
+    }
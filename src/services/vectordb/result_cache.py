@@ -0,0 +1,127 @@
+"""
+Semantic cache of formatted knowledge-base results.
+
+Paraphrased questions ("what do you offer" / "what services do you provide")
+land close together in embedding space, so a new query whose embedding is
+within ``max_distance`` (cosine) of a cached one reuses that query's formatted
+markdown instead of running Chroma and the formatter again. Entries are tied
+to the KB collection version and dropped wholesale when it changes.
+
+With hybrid retrieval the BM25 half ranks on the literal query terms, so two
+close paraphrases naming different places ("Kolkata office address" /
+"Singapore office address") retrieve different chunks. Callers then pass the
+query's BM25 token set as `terms`, and only entries with the same set match.
+"""
+
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional
+
+import numpy as np
+
+from src.core.config import settings
+
+
+class SemanticResultCache:
+    """Bounded LRU+TTL cache matched by cosine distance between query embeddings."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        max_distance: float = 0.08,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.version: Optional[str] = None
+        # entry id → (expires_at, k, unit vector, formatted results, BM25 terms)
+        self._entries: OrderedDict[
+            int, tuple[float, int, np.ndarray, str, Optional[FrozenSet[str]]]
+        ] = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: list[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def _sync_version(self, version: str) -> None:
+        """Invalidate everything when the KB collection has been rebuilt."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def lookup(
+        self,
+        embedding: list[float],
+        k: int,
+        version: str,
+        terms: Optional[FrozenSet[str]] = None,
+    ) -> Optional[str]:
+        self._sync_version(version)
+        now = time.monotonic()
+        for entry_id in [i for i, e in self._entries.items() if e[0] < now]:
+            del self._entries[entry_id]
+
+        candidates = [(i, e) for i, e in self._entries.items() if e[1] == k and e[4] == terms]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        query = self._unit(embedding)
+        matrix = np.stack([e[2] for _, e in candidates])
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        if 1.0 - float(similarities[best]) > self.max_distance:
+            self.misses += 1
+            return None
+
+        entry_id, entry = candidates[best]
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        return entry[3]
+
+    def store(
+        self,
+        embedding: list[float],
+        k: int,
+        version: str,
+        results: str,
+        terms: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        self._sync_version(version)
+        self._entries[self._next_id] = (
+            time.monotonic() + self.ttl,
+            k,
+            self._unit(embedding),
+            results,
+            terms,
+        )
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_result_cache: Optional[SemanticResultCache] = None
+
+
+def get_result_cache() -> SemanticResultCache:
+    """Return the singleton SemanticResultCache for this process."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = SemanticResultCache(
+            max_entries=settings.KB_RESULT_CACHE_SIZE,
+            ttl=settings.KB_RESULT_CACHE_TTL,
+            max_distance=settings.KB_RESULT_CACHE_MAX_DISTANCE,
+        )
+    return _result_cache
@@ -0,0 +1,102 @@
+"""
+Versioned KB snapshots that running workers swap to without a restart.
+
+A snapshot is a complete copy of a built KB directory (Chroma collection,
+kb_version marker, quantized export) under ``<KB_SNAPSHOT_DIR>/<name>``, and
+is never modified once published. ``CURRENT`` holds the name of the live
+snapshot and is replaced atomically, so a reader sees either the old or the
+new name. Workers poll it, load the new snapshot in the background and swap
+to it (see VectorStoreService.refresh_snapshot); publishing never writes to a
+directory a worker has open.
+"""
+
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+
+
+def _is_snapshot(root: str, name: str) -> bool:
+    # Staging copies and the pointer's temp file start with a dot
+    return not name.startswith(".") and os.path.isdir(os.path.join(root, name))
+
+
+def current_snapshot(root: str) -> Optional[str]:
+    """Name of the live snapshot, or None if nothing has been published."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    if not name or not _is_snapshot(root, name):
+        return None
+    return name
+
+
+def current_snapshot_dir(root: str) -> Optional[str]:
+    """Directory of the live snapshot, or None if nothing has been published."""
+    name = current_snapshot(root)
+    return os.path.join(root, name) if name else None
+
+
+def list_snapshots(root: str) -> list[str]:
+    """Published snapshot names, oldest first."""
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+    return sorted(name for name in names if _is_snapshot(root, name))
+
+
+def activate_snapshot(root: str, name: str) -> None:
+    """Point CURRENT at an existing snapshot (publish, or roll back)."""
+    if not _is_snapshot(root, name):
+        raise FileNotFoundError(f"No KB snapshot {name!r} in {root}")
+    staging = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(staging, "w", encoding="utf-8") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(staging, os.path.join(root, CURRENT_FILE))
+
+
+def prune_snapshots(root: str, keep: int) -> list[str]:
+    """Delete all but the newest `keep` snapshots; the live one is always kept."""
+    current = current_snapshot(root)
+    names = list_snapshots(root)
+    removed = []
+    for name in names[: max(len(names) - keep, 0)]:
+        if name == current:
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        removed.append(name)
+    return removed
+
+
+def publish_snapshot(source_dir: str, root: str, version: str, keep: int = 3) -> str:
+    """Copy a built KB directory into a new snapshot and make it the live one.
+
+    Names sort by publish time (``20260101T120000Z-<version>``). The copy is
+    staged under a dot-name and renamed into place before CURRENT moves, so
+    workers never see a partial snapshot. Returns the snapshot name.
+    """
+    name = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{version}"
+    target = os.path.join(root, name)
+    if os.path.exists(target):
+        raise FileExistsError(f"KB snapshot {name!r} already exists")
+
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f".{name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(source_dir, staging)
+    os.rename(staging, target)
+    activate_snapshot(root, name)
+
+    removed = prune_snapshots(root, keep)
+    logger.info(f"Published KB snapshot {name} (pruned {len(removed)} old)")
+    return name
@@ -1,32 +1,472 @@
 import logging
 import asyncio
-from langchain_openai import OpenAIEmbeddings
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+import numpy as np
 from langchain_chroma import Chroma
 from src.core.config import settings
+from src.services.vectordb.bm25 import BM25Index, reciprocal_rank_fusion
+from langchain_core.documents import Document
+from src.services.vectordb.corpus import load_corpus
+from langchain_core.embeddings import Embeddings
+from src.services.vectordb.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.services.vectordb.embeddings import (
+    OPENAI_EMBEDDING_MODEL,
+    build_embeddings,
+    collection_for_backend,
+)
+from src.services.vectordb.numpy_index import NumpyIndex
+from src.services.vectordb.quantized_index import QuantizedIndex, read_export_version
+from src.services.vectordb.snapshots import current_snapshot_dir
 
 logger = logging.getLogger(__name__)
 
+KB_PERSIST_DIRECTORY = f"{settings.BASE_DIR}/src/services/vectordb/chroma_db"
+KB_COLLECTION_NAME = "company_knowledge"
+KB_EMBEDDING_MODEL = OPENAI_EMBEDDING_MODEL
+
+# Written by the KB build; its contents identify the current collection version
+KB_VERSION_FILE = "kb_version"
+
+
+def version_file_name(collection_name: str) -> str:
+    """kb_version marker for a collection (the default collection keeps the bare name)."""
+    if collection_name == KB_COLLECTION_NAME:
+        return KB_VERSION_FILE
+    return f"{KB_VERSION_FILE}.{collection_name}"
+
+
+def mmap_directory_name(collection_name: str) -> str:
+    """Default quantized-export directory, next to the collection it mirrors."""
+    if collection_name == KB_COLLECTION_NAME:
+        return "quantized"
+    return f"quantized.{collection_name}"
+
+# Search backends selectable via settings.KB_SEARCH_BACKEND
+BACKEND_CHROMA = "chroma"
+BACKEND_NUMPY = "numpy"
+BACKEND_MMAP = "mmap"
+
+
+@dataclass
+class KBIndexes:
+    """In-process indexes built from one load of the collection."""
+
+    documents: list[Document]
+    vector: NumpyIndex | QuantizedIndex
+    lexical: BM25Index
+    rows: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.rows:
+            self.rows = {doc.id: i for i, doc in enumerate(self.documents) if doc.id}
+
+
+@dataclass(eq=False)
+class KBSnapshot:
+    """One opened KB directory. Searches lease it so a swap never closes it under them."""
+
+    directory: str
+    vectorstore: Chroma
+    leases: int = 0
+    retired: bool = False
+
+
+# In-process indexes shared by every VectorStoreService in this worker process,
+# keyed by (persist directory, collection, version) so a rebuilt KB reloads.
+# A failed load is remembered as None so searches don't retry it every turn.
+# The snapshot watcher and background loads write it too: every access holds
+# _kb_indexes_lock. _kb_loading holds the keys a background thread is building.
+_kb_indexes: dict[tuple[str, str, str], KBIndexes | None] = {}
+_kb_loading: set[tuple[str, str, str]] = set()
+_kb_indexes_lock = threading.Lock()
+
+
+def reset_kb_indexes() -> None:
+    """Drop the loaded in-process indexes; the next search reloads them."""
+    with _kb_indexes_lock:
+        _kb_indexes.clear()
+
+
 class VectorStoreService:
-    def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            api_key=settings.OPENAI_API_KEY
+    def __init__(
+        self,
+        persist_directory: str | None = None,
+        embeddings: Embeddings | None = None,
+        collection_name: str | None = None,
+        embedding_backend: str | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        backend: str | None = None,
+        hybrid: bool | None = None,
+        mmap_directory: str | None = None,
+    ):
+        # Every argument defaults to the production setup; overrides exist for
+        # offline tooling (scripts/bench_retrieval.py) and a stub embedder.
+        self.embedding_backend = embedding_backend or settings.KB_EMBEDDING_BACKEND
+        self.embeddings = embeddings or build_embeddings(self.embedding_backend)
+        self.collection_name = collection_name or collection_for_backend(
+            KB_COLLECTION_NAME, self.embedding_backend
+        )
+        self.embedding_cache = (
+            embedding_cache if embedding_cache is not None else get_embedding_cache()
+        )
+        self.backend = backend or settings.KB_SEARCH_BACKEND
+        self.hybrid = settings.KB_HYBRID_ENABLED if hybrid is None else hybrid
+        self._mmap_directory = mmap_directory or settings.KB_MMAP_DIR
+
+        # An explicit directory pins the service to it; otherwise serve the
+        # published snapshot (see snapshots.py), or chroma_db until there is one
+        self.snapshot_root = None if persist_directory else settings.KB_SNAPSHOT_DIR or None
+        directory = persist_directory or (
+            self.snapshot_root and current_snapshot_dir(self.snapshot_root)
+        ) or KB_PERSIST_DIRECTORY
+        self._lock = threading.Lock()
+        self._snapshot = self._open_snapshot(directory)
+        self._rejected: set[str] = set()
+        # directory → kb_version, re-read by the watcher rather than per search
+        self._versions: dict[str, str] = {}
+        self._watcher: threading.Thread | None = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def persist_directory(self) -> str:
+        return self._snapshot.directory
+
+    @property
+    def vectorstore(self) -> Chroma:
+        return self._snapshot.vectorstore
+
+    @property
+    def mmap_directory(self) -> str:
+        return self._mmap_directory_for(self._snapshot.directory)
+
+    def _mmap_directory_for(self, directory: str) -> str:
+        return self._mmap_directory or os.path.join(
+            directory, mmap_directory_name(self.collection_name)
         )
-        self.vectorstore = Chroma(
-            persist_directory=f"{settings.BASE_DIR}/src/services/vectordb/chroma_db",
-            embedding_function=self.embeddings,
-            collection_name="company_knowledge"
+
+    @property
+    def _needs_indexes(self) -> bool:
+        return self.backend in (BACKEND_NUMPY, BACKEND_MMAP) or self.hybrid
+
+    def prewarm(self) -> None:
+        """Load the in-process indexes up front (called from the worker's prewarm)."""
+        if self._needs_indexes:
+            with self._lease() as snapshot:
+                self._load_indexes(snapshot)
+
+    # ── Snapshots ──────────────────────────────────────────────────────────
+
+    def _open_snapshot(self, directory: str) -> KBSnapshot:
+        return KBSnapshot(
+            directory=directory,
+            vectorstore=Chroma(
+                persist_directory=directory,
+                embedding_function=self.embeddings,
+                collection_name=self.collection_name,
+            ),
         )
 
-    async def search(self, query: str, k: int = 5):
+    @contextmanager
+    def _lease(self) -> Iterator[KBSnapshot]:
+        """Pin the live snapshot for one search; a swap meanwhile doesn't affect it."""
+        with self._lock:
+            snapshot = self._snapshot
+            snapshot.leases += 1
+        try:
+            yield snapshot
+        finally:
+            with self._lock:
+                snapshot.leases -= 1
+                release = snapshot.retired and snapshot.leases == 0
+            if release:
+                self._release_snapshot(snapshot)
+
+    def _release_snapshot(self, snapshot: KBSnapshot) -> None:
+        """Free a swapped-out snapshot once its last search has finished."""
+        with _kb_indexes_lock:
+            for key in [key for key in list(_kb_indexes) if key[0] == snapshot.directory]:
+                _kb_indexes.pop(key, None)
+        self._versions.pop(snapshot.directory, None)
+        client = getattr(snapshot.vectorstore, "_client", None)
+        try:
+            if client is not None:
+                client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close KB snapshot {snapshot.directory}: {e}")
+        logger.info(f"Released KB snapshot {snapshot.directory}")
+
+    def refresh_snapshot(self) -> bool:
+        """Load the published snapshot if it changed and swap to it. Blocking.
+
+        The new snapshot is opened and its in-process indexes built before the
+        swap, so the first search on it is warm. Searches already running keep
+        the snapshot they leased; it is released when the last one finishes.
+        A snapshot that fails to load stays rejected and the old one serves on.
+        """
+        if self.snapshot_root is None:
+            return False
+        directory = current_snapshot_dir(self.snapshot_root)
+        if directory is None or directory == self._snapshot.directory or directory in self._rejected:
+            return False
+
+        logger.info(f"Loading KB snapshot {directory}")
+        snapshot = None
+        try:
+            snapshot = self._open_snapshot(directory)
+            if self._needs_indexes:
+                loaded = self._load_indexes(snapshot) is not None
+            else:
+                loaded = bool(snapshot.vectorstore.get(limit=1)["ids"])
+        except Exception as e:
+            logger.error(f"❌ Failed to open KB snapshot {directory}: {e}")
+            loaded = False
+        if not loaded:
+            logger.error(f"❌ KB snapshot {directory} is unusable, keeping {self._snapshot.directory}")
+            self._rejected.add(directory)
+            if snapshot is not None:
+                self._release_snapshot(snapshot)
+            return False
+
+        with self._lock:
+            old, self._snapshot = self._snapshot, snapshot
+            old.retired = True
+            release = old.leases == 0
+        if release:
+            self._release_snapshot(old)
+        logger.info(f"✅ Swapped to KB snapshot {directory} (version {self._version(directory)})")
+        return True
+
+    def refresh_version(self) -> bool:
+        """Re-read the live directory's kb_version marker. Blocking.
+
+        After an in-place rebuild (ingest_kb without --publish) the new
+        version's indexes are built before searches see the new version, so
+        they keep using the previous indexes until then.
+        """
+        with self._lease() as snapshot:
+            directory = snapshot.directory
+            version = self._read_version(directory)
+            if version == self._versions.get(directory):
+                return False
+            logger.info(f"KB in {directory} changed to version {version}")
+            if self._needs_indexes:
+                self._load_indexes(snapshot, version)
+            self._versions[directory] = version
+        return True
+
+    def watch_snapshots(self, interval: float) -> None:
+        """Poll for newly published snapshots and in-place rebuilds from a daemon thread."""
+        if self._watcher is not None:
+            return
+
+        def _run() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh_snapshot()
+                    self.refresh_version()
+                except Exception as e:
+                    logger.error(f"❌ KB snapshot refresh failed: {e}")
+
+        self._watcher = threading.Thread(target=_run, name="kb-snapshot-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+
+    # ── In-process indexes ─────────────────────────────────────────────────
+
+    def _get_indexes(self, snapshot: KBSnapshot) -> KBIndexes | None:
+        """Return the snapshot's in-process indexes, or None to fall back to Chroma only.
+
+        Called on the event loop, so it never builds them: missing indexes are
+        loaded on a background thread and Chroma serves until they are ready.
+        """
+        key = (snapshot.directory, self.collection_name, self._version(snapshot.directory))
+        with _kb_indexes_lock:
+            if key in _kb_indexes:
+                return _kb_indexes[key]
+            if key in _kb_loading:
+                return None
+            _kb_loading.add(key)
+        threading.Thread(
+            target=self._load_indexes, args=(snapshot, key[2]), name="kb-index-load", daemon=True
+        ).start()
+        return None
+
+    def _load_indexes(self, snapshot: KBSnapshot, version: str | None = None) -> KBIndexes | None:
+        """Build the snapshot's in-process indexes for `version` (default: current). Blocking."""
+        version = version or self._version(snapshot.directory)
+        key = (snapshot.directory, self.collection_name, version)
+        with _kb_indexes_lock:
+            if key in _kb_indexes:
+                _kb_loading.discard(key)
+                return _kb_indexes[key]
+        indexes = None
+        try:
+            indexes = self._build_indexes(snapshot, version)
+        finally:
+            with _kb_indexes_lock:
+                _kb_loading.discard(key)
+                # A snapshot swapped out and released meanwhile must not come back
+                if not snapshot.retired:
+                    _kb_indexes[key] = indexes
+                    # The directory was rebuilt in place: drop its previous version
+                    for stale in [k for k in list(_kb_indexes) if k[:2] == key[:2] and k != key]:
+                        _kb_indexes.pop(stale, None)
+        return indexes
+
+    def _build_indexes(self, snapshot: KBSnapshot, version: str) -> KBIndexes | None:
+        indexes = None
+        try:
+            vector = (
+                self._open_mmap_index(snapshot.directory, version)
+                if self.backend == BACKEND_MMAP
+                else None
+            )
+            if vector is None:
+                vector = NumpyIndex(load_corpus(snapshot.vectorstore))
+            if len(vector):
+                indexes = KBIndexes(
+                    documents=vector.documents,
+                    vector=vector,
+                    lexical=BM25Index(vector.documents),
+                )
+                logger.info(
+                    f"✅ Loaded in-process KB indexes ({type(vector).__name__}) with {len(vector)} chunks"
+                )
+            else:
+                logger.warning("KB collection is empty, using Chroma search only")
+        except Exception as e:
+            logger.error(f"❌ Failed to load in-process KB indexes, using Chroma: {e}")
+        return indexes
+
+    def _open_mmap_index(self, directory: str, version: str) -> QuantizedIndex | None:
+        """Map the quantized export if it matches the collection version."""
+        mmap_directory = self._mmap_directory_for(directory)
+        export_version = read_export_version(mmap_directory)
+        if export_version is None:
+            logger.warning(f"No quantized KB export in {mmap_directory}, loading from Chroma")
+            return None
+        if export_version != version:
+            logger.warning(
+                f"Quantized KB export is stale ({export_version} != {version}), loading from Chroma"
+            )
+            return None
+        return QuantizedIndex(mmap_directory, rescore=settings.KB_MMAP_RESCORE)
+
+    def collection_version(self) -> str:
+        """Identify the live collection so caches can tell when it was rebuilt or swapped."""
+        return self._version(self._snapshot.directory)
+
+    def _version(self, directory: str) -> str:
+        """kb_version of a directory: read once, then kept current by refresh_version()."""
+        version = self._versions.get(directory)
+        if version is None:
+            version = self._versions[directory] = self._read_version(directory)
+        return version
+
+    def _read_version(self, directory: str) -> str:
+        marker = os.path.join(directory, version_file_name(self.collection_name))
+        try:
+            with open(marker, encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+        # No marker: fall back to the Chroma SQLite file's mtime + size
+        try:
+            stat = os.stat(os.path.join(directory, "chroma.sqlite3"))
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except OSError:
+            return "unknown"
+
+    async def embed_query(self, query: str) -> list[float]:
+        """Embed a query, skipping the OpenAI round trip for repeated questions."""
+        model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        vector = self.embedding_cache.get(model, query)
+        if vector is not None:
+            logger.debug("Embedding cache hit for: %s", query)
+            return vector
+
+        vector = await self.embeddings.aembed_query(query)
+        self.embedding_cache.set(model, query, vector)
+        return vector
+
+    async def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed several queries, sending every cache miss in one batched request."""
+        model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        vectors: list[list[float] | None] = [self.embedding_cache.get(model, q) for q in queries]
+
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            fresh = await self.embeddings.aembed_documents([queries[i] for i in misses])
+            for i, vector in zip(misses, fresh):
+                vectors[i] = vector
+                self.embedding_cache.set(model, queries[i], vector)
+        return vectors
+
+    async def search_by_vector(self, embedding: list[float], k: int = 5):
+        with self._lease() as snapshot:
+            return await self._search_by_vector(snapshot, embedding, k)
+
+    async def _search_by_vector(self, snapshot: KBSnapshot, embedding: list[float], k: int):
+        if self.backend in (BACKEND_NUMPY, BACKEND_MMAP):
+            indexes = self._get_indexes(snapshot)
+            if indexes is not None:
+                # Sub-millisecond for the KB's size — cheaper than a thread hop
+                return indexes.vector.search(embedding, k=k)
+
         # Run synchronous Chroma search in a thread
         results = await asyncio.to_thread(
-            self.vectorstore.similarity_search, 
-            query=query, 
+            snapshot.vectorstore.similarity_search_by_vector,
+            embedding=embedding,
             k=k
         )
         return results
 
+    async def search(self, query: str, k: int = 5, embedding: list[float] | None = None):
+        """Top-k chunks for a query: vector search, fused with BM25 when hybrid is on."""
+        if embedding is None:
+            embedding = await self.embed_query(query)
+
+        with self._lease() as snapshot:
+            indexes = self._get_indexes(snapshot) if self.hybrid else None
+            if indexes is None:
+                return await self._search_by_vector(snapshot, embedding, k)
+
+            # Over-fetch from both rankings so fusion has candidates to reorder
+            fetch_k = max(k * settings.KB_HYBRID_FETCH_MULTIPLIER, k)
+            vector_hits = await self._search_by_vector(snapshot, embedding, fetch_k)
+            lexical_hits = indexes.lexical.search(query, k=fetch_k)
+        return reciprocal_rank_fusion(
+            [
+                (vector_hits, settings.KB_HYBRID_VECTOR_WEIGHT),
+                (lexical_hits, settings.KB_HYBRID_BM25_WEIGHT),
+            ],
+            k=k,
+            rrf_k=settings.KB_HYBRID_RRF_K,
+        )
+
+    def document_vectors(self, documents: list[Document]) -> np.ndarray | None:
+        """Stored vectors for search results, or None if any isn't in the in-process index."""
+        if not self._needs_indexes:
+            return None
+        with self._lease() as snapshot:
+            indexes = self._get_indexes(snapshot)
+        if indexes is None:
+            return None
+        rows = [indexes.rows.get(doc.id) for doc in documents]
+        if any(row is None for row in rows):
+            return None
+        return indexes.vector.vectors(rows)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Hit/miss counters of the process-wide query-embedding cache."""
+        return self.embedding_cache.stats()
+
 
 # Remove the global instance to avoid issues during Docker build when API keys are not present
 # vector_store = VectorStoreService()
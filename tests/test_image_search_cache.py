@@ -0,0 +1,49 @@
+import unittest
+
+from src.services.search.image_cache import ImageSearchCache
+from src.services.search.searxng_svc import SearXNGService
+
+IMAGES = [f"https://img.example/{i}.jpg" for i in range(5)]
+
+
+class FakeSearXNG(SearXNGService):
+    """SearXNGService answering image searches from a fixed result list."""
+
+    def __init__(self, images: list[str] = IMAGES) -> None:
+        super().__init__(image_cache=ImageSearchCache(disk_path=None))
+        self.images = images
+        self.requests = 0
+
+    async def _get_json(self, url, params, timeout):
+        self.requests += 1
+        return {"results": [{"img_src": url} for url in self.images]}
+
+
+class SearchImagesCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.service = FakeSearXNG()
+
+    async def asyncTearDown(self) -> None:
+        await self.service.close()
+
+    async def test_small_limit_does_not_shrink_later_lookups(self) -> None:
+        self.assertEqual(await self.service.search_images("Kolkata office", limit=1), IMAGES[:1])
+        self.assertEqual(await self.service.search_images("kolkata office", limit=3), IMAGES[:3])
+        self.assertEqual(self.service.requests, 1)
+
+    async def test_short_cached_entry_is_refetched(self) -> None:
+        self.service.image_cache.set("kolkata office", IMAGES[:1])
+        self.assertEqual(await self.service.search_images("kolkata office", limit=3), IMAGES[:3])
+        self.assertEqual(self.service.requests, 1)
+        self.assertEqual(self.service.image_cache.get("kolkata office"), IMAGES)
+
+    async def test_query_with_few_images_is_served_from_cache(self) -> None:
+        await self.service.close()
+        self.service = FakeSearXNG(images=IMAGES[:2])
+        self.assertEqual(await self.service.search_images("bagdogra", limit=3), IMAGES[:2])
+        self.assertEqual(await self.service.search_images("bagdogra", limit=3), IMAGES[:2])
+        self.assertEqual(self.service.requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
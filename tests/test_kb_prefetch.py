@@ -0,0 +1,40 @@
+import asyncio
+import logging
+import unittest
+
+from src.agents.indusnet.helpers.prefetch import KBPrefetchController
+
+
+class KBPrefetchTurnTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.fetched: list[str] = []
+        self.prefetch = KBPrefetchController(self._fetch, logging.getLogger("test"))
+
+    async def asyncTearDown(self) -> None:
+        self.prefetch.stop()
+
+    async def _fetch(self, text: str) -> str:
+        self.fetched.append(text)
+        return f"chunks for: {text}"
+
+    async def _say(self, transcript: str) -> None:
+        self.prefetch.on_transcript(transcript, is_final=True)
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    async def test_current_turn_is_served(self) -> None:
+        await self._say("AI services in healthcare")
+        self.assertEqual(
+            await self.prefetch.take("AI services for healthcare"),
+            "chunks for: AI services in healthcare",
+        )
+
+    async def test_earlier_turn_is_not_served(self) -> None:
+        await self._say("AI services in healthcare")
+        await self._say("what about retail?")
+        self.assertIsNone(await self.prefetch.take("AI services for retail"))
+        self.assertIn("AI services in healthcare", self.fetched)
+
+
+if __name__ == "__main__":
+    unittest.main()